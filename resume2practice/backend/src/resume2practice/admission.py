@@ -0,0 +1,166 @@
+"""Admission control for workflow runs.
+
+At most `max_concurrent` runs execute at once. Further requests wait in a bounded queue ordered by
+priority: resuming a session a user is waiting on comes before starting a new analysis, and both
+come before batch work. A full queue makes room for a request by shedding the newest waiter of a
+lower priority. A request is shed right away with `Overloaded` (HTTP 429 + `Retry-After`)
+when the queue is full or when its expected wait would exceed the latency SLO. The expected wait is
+estimated from the requests queued ahead of it and a moving average of run durations.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+ADMISSION_QUEUE_SIZE = int(os.environ.get("ADMISSION_QUEUE_SIZE", "256"))
+ADMISSION_WAIT_SLO_SECONDS = float(os.environ.get("ADMISSION_WAIT_SLO_SECONDS", "30"))
+# Assumed run duration until real runs have been measured
+ADMISSION_INITIAL_RUN_SECONDS = float(os.environ.get("ADMISSION_INITIAL_RUN_SECONDS", "20"))
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first"""
+    INTERACTIVE = 0  # resuming a session the user is waiting on
+    NEW = 1          # starting a new analysis
+    BATCH = 2        # offline or bulk work
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of queued"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionController:
+    """Caps concurrent runs and queues the rest by priority, shedding what would miss the SLO"""
+
+    def __init__(self,
+                 max_concurrent: int,
+                 max_queue: int = ADMISSION_QUEUE_SIZE,
+                 wait_slo_seconds: float = ADMISSION_WAIT_SLO_SECONDS,
+                 initial_run_seconds: float = ADMISSION_INITIAL_RUN_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.wait_slo_seconds = wait_slo_seconds
+        self._run_seconds = initial_run_seconds
+        self._active = 0
+        # (priority, arrival order, future) - the future is resolved when a slot is handed over
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._admitted = {priority.name.lower(): 0 for priority in Priority}
+        self._shed = {priority.name.lower(): 0 for priority in Priority}
+
+    def estimated_wait(self, priority: Priority) -> float:
+        """Seconds a request of `priority` arriving now is expected to wait for a slot"""
+        # Requests only queue while every slot is taken, so a free slot means nobody is waiting
+        if self._active < self.max_concurrent:
+            return 0.0
+        ahead = sum(1 for waiter in self._waiters if waiter[0] <= priority and not waiter[2].done())
+        # With every slot busy, one slot frees up every run_seconds / max_concurrent on average
+        return (ahead + 1) * self._run_seconds / self.max_concurrent
+
+    def would_shed(self, priority: Priority) -> Optional[Overloaded]:
+        """The `Overloaded` a request of `priority` arriving now would be shed with, or None.
+
+        Has no side effects: a request that would make room in a full queue by displacing a lower
+        priority waiter is not shed, but nothing is displaced until it actually queues.
+        """
+        wait = self.estimated_wait(priority)
+        if wait == 0.0:
+            return None
+        waiting = [waiter for waiter in self._waiters if not waiter[2].done()]
+        if len(waiting) >= self.max_queue and max(waiting, key=lambda waiter: (waiter[0], waiter[1]))[0] <= priority:
+            return Overloaded("Server is at capacity and its queue is full. Please retry later.", wait)
+        if wait > self.wait_slo_seconds:
+            return Overloaded(f"Server is busy (expected wait {wait:.0f}s). Please retry later.", wait)
+        return None
+
+    def check(self, priority: Priority) -> None:
+        """Raises `Overloaded` (and counts the request as shed) if a request of `priority` would be shed.
+
+        For rejecting a request before it commits to a response; displacing waiters is left to `acquire`.
+        """
+        overloaded = self.would_shed(priority)
+        if overloaded is not None:
+            self._shed[priority.name.lower()] += 1
+            raise overloaded
+
+    def _make_room(self, priority: Priority) -> None:
+        """Sheds this request, or displaces the newest waiter of the lowest priority below it, as needed"""
+        self.check(priority)
+        waiting = [waiter for waiter in self._waiters if not waiter[2].done()]
+        if self._active >= self.max_concurrent and len(waiting) >= self.max_queue:
+            lowest = max(waiting, key=lambda waiter: (waiter[0], waiter[1]))
+            self._shed[Priority(lowest[0]).name.lower()] += 1
+            lowest[2].set_exception(Overloaded(
+                "Request was displaced by higher priority work. Please retry later.", self.estimated_wait(priority)
+            ))
+
+    async def acquire(self, priority: Priority) -> None:
+        """Waits for a run slot; raises `Overloaded` instead if the request should be shed"""
+        self._make_room(priority)
+        if self._active < self.max_concurrent:
+            self._active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (int(priority), next(self._order), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was handed over just as the request went away; pass it on
+                    self.release()
+                raise
+        self._admitted[priority.name.lower()] += 1
+
+    def release(self) -> None:
+        """Hands the slot to the highest priority waiter, or frees it"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority) -> AsyncIterator[None]:
+        """Holds a run slot for the duration of the block and records how long the run took"""
+        await self.acquire(priority)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._run_seconds = 0.8 * self._run_seconds + 0.2 * (time.monotonic() - start)
+            self.release()
+
+    def stats(self) -> Dict[str, object]:
+        queued = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[Priority(priority).name.lower()] += 1
+        return {
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": sum(queued.values()),
+            "queued": queued,
+            "max_queue": self.max_queue,
+            "admitted": dict(self._admitted),
+            "shed": dict(self._shed),
+            "avg_run_seconds": round(self._run_seconds, 3),
+            "estimated_wait_seconds": round(self.estimated_wait(Priority.NEW), 3)
+        }
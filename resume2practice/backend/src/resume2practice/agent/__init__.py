@@ -1,20 +1,57 @@
 import logging 
 import asyncio 
+import copy
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 try:
     from resume2practice.models.factory import model_factory
+    from resume2practice.agent.error import AgentExecutionError, DeadlineExceeded
+    from resume2practice.agent.streaming import IncrementalJSONParser, message_text
+    from resume2practice.agent.repair import coerce_value, raw_output_text, repair_json, validate_repaired
 except ImportError:
     logger.error("Unable to import custom module")
     raise
 
 from abc import ABC, abstractmethod
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any, Callable
+from contextlib import asynccontextmanager
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import RunnableLambda
+from functools import lru_cache
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Optional, List, Dict, Any, Callable, AsyncIterator, Tuple
+
+# Rough conversion used to estimate tokens from generated text
+CHARS_PER_TOKEN = 4
+# Structured output methods whose raw response text is the JSON document
+TEXT_STRUCTURED_OUTPUT_METHODS = ("json_schema", "json_mode")
+
+
+@lru_cache(maxsize=None)
+def _value_adapter(annotation: Any) -> TypeAdapter:
+    """Cached validator for a single streamed value (a model field or a list item)"""
+    return TypeAdapter(annotation)
+
+
+class LLMCall:
+    """Output produced by one tracked language model call"""
+    def __init__(self):
+        self.output_chars = 0
+
+    def record(self, output: Any) -> Any:
+        """Counts a complete response (a model or text) and returns it"""
+        text = output.model_dump_json() if isinstance(output, BaseModel) else str(output)
+        self.output_chars += len(text)
+        return output
 
 class BaseAgent(ABC):
-    """The base class used for implementing agents."""
+    """The base class used for implementing agents.
+
+    The language model is resolved (importing its vendor SDK) and the chain is built on first use,
+    so constructing agents is cheap. Call `warmup()` to do this work ahead of time.
+    """
     def __init__(self,
                 vendor: Optional[str] = None, 
                 model_id: Optional[str] = None, 
@@ -23,7 +60,9 @@ class BaseAgent(ABC):
                 tools: Optional[List[Callable[..., Any]]] = None,
                 response_format: BaseModel = None,
                 settings: Optional[Dict[str, Any]] = None):
-        self._llm: Any = model_factory.get_model(vendor=vendor, model_id=model_id, settings=settings)
+        self._llm: Any = None
+        self._chat_model: Any = None
+        self._structured_method: str = "json_mode"
         self._model_id: str = model_id
         self._vendor: str = vendor
         self._role: str = role
@@ -31,6 +70,56 @@ class BaseAgent(ABC):
         self._tools: Optional[List[Callable[..., Any]]] = tools or []
         self._response_format = response_format
         self._settings: Optional[Dict[str, Any]] = settings or {}
+        self._stream_agent: Any = None
+        self._initialized: bool = False
+        self._init_lock = threading.Lock()
+        self.call_stats: Dict[str, int] = {
+            "started": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "deadline_exceeded": 0,
+            "output_tokens": 0,
+            "estimated_tokens_saved": 0,
+            "structured_outputs": 0,
+            "structured_repaired": 0,
+            "structured_failed": 0
+        }
+
+    def _ensure_initialized(self) -> None:
+        """Resolves the language model and builds the chain the first time the agent is used"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._llm = model_factory.get_model(vendor=self._vendor, model_id=self._model_id, settings=self._settings)
+            self._chat_model = self._llm
+            self._structured_method = model_factory.structured_output_method(self._vendor)
+            self.init_agent()
+            self._initialized = True
+
+    def with_model(self, vendor: str, model_id: str, settings: Optional[Dict[str, Any]] = None) -> "BaseAgent":
+        """A copy of this agent that uses another model; its chain is built on first use.
+
+        The copy shares `call_stats` with this agent, so its calls show up in the same metrics.
+        """
+        agent = copy.copy(self)
+        agent._vendor = vendor
+        agent._model_id = model_id
+        agent._settings = settings if settings is not None else self._settings
+        agent._llm = None
+        agent._chat_model = None
+        # Chains of the subclasses are rebuilt by `init_agent` when they are unset
+        agent._agent = None
+        agent._stream_agent = None
+        agent._initialized = False
+        agent._init_lock = threading.Lock()
+        return agent
+
+    async def warmup(self) -> None:
+        """Initializes the agent ahead of its first request (off the event loop, since it may import vendor SDKs)"""
+        if not self._initialized:
+            await asyncio.to_thread(self._ensure_initialized)
 
     @abstractmethod
     def init_agent(self, *args, **kwargs) -> None:
@@ -43,7 +132,122 @@ class BaseAgent(ABC):
         pass
     
     @abstractmethod
-    async def ainvoke(self, context: Optional[Dict[str, Any] | str]) -> Any:
-        """Invokes the language model or agent workflow (async)"""
+    async def ainvoke(self, context: Optional[Dict[str, Any] | str], deadline: Optional[float] = None) -> Any:
+        """Invokes the language model or agent workflow (async), giving up once `deadline` (`time.monotonic()`) passes"""
         return await asyncio.to_thread(self.invoke, context)
+
+    @asynccontextmanager
+    async def _llm_call(self, deadline: Optional[float] = None) -> AsyncIterator[LLMCall]:
+        """Tracks one language model call and aborts it once `deadline` (a `time.monotonic()` value) passes.
+
+        Calls that are cancelled (the client went away) or run out of time are counted, together with
+        the output tokens they were expected to produce but no longer will.
+        """
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"{self.__class__.__name__}: no time left for the request")
+        call = LLMCall()
+        self.call_stats["started"] += 1
+        try:
+            async with asyncio.timeout(remaining):
+                yield call
+        except TimeoutError:
+            self._record_aborted("deadline_exceeded", call)
+            raise DeadlineExceeded(f"{self.__class__.__name__}: the request deadline passed during the call")
+        except asyncio.CancelledError:
+            self._record_aborted("cancelled", call)
+            raise
+        self.call_stats["completed"] += 1
+        self.call_stats["output_tokens"] += call.output_chars // CHARS_PER_TOKEN
+
+    def _record_aborted(self, reason: str, call: LLMCall) -> None:
+        self.call_stats[reason] += 1
+        completed = self.call_stats["completed"]
+        if completed:
+            # Expect an aborted call to have produced an average response
+            expected = self.call_stats["output_tokens"] // completed
+            self.call_stats["estimated_tokens_saved"] += max(0, expected - call.output_chars // CHARS_PER_TOKEN)
+
+    def _structured(self, schema: Any) -> Any:
+        """`with_structured_output` in the vendor's structured output method, followed by a local repair
+        of near-valid output so that it does not fail the call"""
+        structured_llm = self._chat_model.with_structured_output(schema, method=self._structured_method, include_raw=True)
+        return structured_llm | RunnableLambda(lambda output: self._parse_structured(schema, output))
+
+    def _parse_structured(self, schema: Any, output: Dict[str, Any]) -> Any:
+        """Returns the parsed response, or the response repaired locally when it did not parse or validate"""
+        self.call_stats["structured_outputs"] += 1
+        parsed = output.get("parsed")
+        if output.get("parsing_error") is None and parsed is not None:
+            if isinstance(parsed, BaseModel):
+                return parsed
+            try:
+                return schema.model_validate(parsed)
+            except ValueError:
+                pass
+        try:
+            result = validate_repaired(schema, repair_json(raw_output_text(output["raw"])))
+        except ValueError as ex:
+            self.call_stats["structured_failed"] += 1
+            raise OutputParserException(f"Could not repair the {schema.__name__} response: {str(ex)}")
+        self.call_stats["structured_repaired"] += 1
+        logger.info(f"{self.__class__.__name__}: repaired a malformed {schema.__name__} response")
+        return result
+
+    def _validate_streamed(self, value: Any, annotation: Any) -> Any:
+        """Validates a value taken from streamed structured output, repairing it locally if needed"""
+        try:
+            return _value_adapter(annotation).validate_python(value)
+        except ValidationError:
+            pass
+        try:
+            result = coerce_value(value, annotation)
+        except ValueError:
+            self.call_stats["structured_failed"] += 1
+            raise
+        self.call_stats["structured_repaired"] += 1
+        return result
+
+    def _raw_output(self, schema: Any) -> Any:
+        """Returns a model step whose raw text is the JSON document for `schema`, so that it can be streamed.
+
+        Text-based structured output methods keep the vendor's schema or JSON-mode binding. With tool
+        calling the document is not in the text, so the plain chat model is used; the role prompts
+        describe the schema.
+        """
+        if schema is None or self._structured_method not in TEXT_STRUCTURED_OUTPUT_METHODS:
+            return self._chat_model
+        structured_llm = self._chat_model.with_structured_output(schema, method=self._structured_method)
+        return getattr(structured_llm, "first", None) or self._chat_model
+
+    async def astream_json(self,
+                           context: Dict[str, Any],
+                           max_depth: int = 2,
+                           deadline: Optional[float] = None) -> AsyncIterator[Tuple[tuple, Any]]:
+        """Streams the model output and yields `(path, value)` for each JSON value as soon as it closes.
+
+        The complete document is yielded last with the empty path `()`.
+        """
+        self._ensure_initialized()
+        if self._stream_agent is None:
+            raise AgentExecutionError(f"{self.__class__.__name__} does not support streaming")
+        parser = IncrementalJSONParser(max_depth=max_depth)
+        try:
+            async with self._llm_call(deadline) as call:
+                async for chunk in self._stream_agent.astream(context):
+                    text = message_text(chunk)
+                    call.output_chars += len(text)
+                    for event in parser.feed(text):
+                        yield event
+        except DeadlineExceeded:
+            raise
+        except Exception as ex:
+            raise AgentExecutionError(
+                f"An exception occurred while trying to stream the following context: {context}\n{(str(ex))}"
+            )
+        self.call_stats["structured_outputs"] += 1
+        for event in parser.close():
+            yield event
+        if not parser.done:
+            raise AgentExecutionError("The streamed response ended before the JSON document was complete")
     
@@ -0,0 +1,157 @@
+"""Micro-batching of profiling requests into multi-document language model calls.
+
+The profiler system prompts are long compared to a single resume or job description, and they are
+paid for on every call. With batching enabled, requests that arrive within a short window (or until
+`max_items` have been collected) are sent together as one prompt. Each document is wrapped in a
+`<document index="N">` tag, and the model answers with one profile per document. The profiles are
+then handed back to the waiting callers. This way, concurrent sessions share one system prompt and
+one request instead of paying for their own.
+
+A profile that is missing or does not validate is generated again with a regular single-document
+call, so a bad batch answer only costs the items it got wrong.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, create_model
+
+from resume2practice.agent.repair import repair_json, validate_repaired
+from resume2practice.agent.roles import PROFILE_BATCH
+from resume2practice.agent.streaming import message_text
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects submitted items for up to `window_ms` (or `max_items`) and processes them together.
+
+    `process` receives the items of a batch and returns one result per item, in order; a result that
+    is an exception is raised to the caller of that item only.
+    """
+
+    def __init__(self,
+                 process: Callable[[List[Any]], Awaitable[List[Any]]],
+                 window_ms: float = 50,
+                 max_items: int = 8):
+        self.process = process
+        self.window_ms = window_ms
+        self.max_items = max(1, int(max_items))
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches = 0
+        self._items = 0
+        self._largest = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Adds `item` to the next batch and returns its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that went away while waiting are left out of the batch
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        self._pending = []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[tuple]) -> None:
+        self._batches += 1
+        self._items += len(batch)
+        self._largest = max(self._largest, len(batch))
+        try:
+            results = await self.process([item for item, _ in batch])
+        except Exception as ex:
+            results = [ex] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "largest_batch": self._largest,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0
+        }
+
+
+def profile_batch_model(response_format: Type[BaseModel]) -> Type[BaseModel]:
+    """Response schema of a batch: `{"profiles": [<response_format>, ...]}`"""
+    return create_model(f"{response_format.__name__}Batch", profiles=(List[response_format], ...))
+
+
+def profile_batch_chain(role: str, model: Any) -> Any:
+    """Chain that profiles the documents in `{documents}` with one call of `model`, answering JSON text"""
+    prompt = ChatPromptTemplate.from_messages([
+        SystemMessage(content=role),
+        SystemMessage(content=PROFILE_BATCH),
+        ("human", "{documents}")
+    ])
+    return prompt | model
+
+
+def format_documents(documents: List[str]) -> str:
+    return "\n".join(
+        f'<document index="{index}">\n{document}\n</document>' for index, document in enumerate(documents)
+    )
+
+
+def parse_profiles(text: str, response_format: Type[BaseModel], count: int) -> List[Any]:
+    """Splits a batch answer into `count` profiles; entries that are missing or invalid are exceptions"""
+    try:
+        profiles = repair_json(text)["profiles"]
+        if not isinstance(profiles, list):
+            raise TypeError("`profiles` is not a list")
+    except (ValueError, KeyError, TypeError) as ex:
+        return [ValueError(f"Unreadable batch answer: {str(ex)}")] * count
+    results: List[Any] = []
+    for index in range(count):
+        if index >= len(profiles):
+            results.append(ValueError(f"Batch answer has no profile for document {index}"))
+            continue
+        try:
+            results.append(validate_repaired(response_format, profiles[index]))
+        except ValueError as ex:
+            results.append(ex)
+    return results
+
+
+async def aprofile_batch(batch_agent: Any,
+                         single: Callable[[Any], Awaitable[Any]],
+                         response_format: Type[BaseModel],
+                         input_key: str,
+                         contexts: List[Dict[str, Any] | str]) -> List[Any]:
+    """Profiles `contexts` (documents, or dicts holding one under `input_key`) with one batch call,
+    redoing the items it got wrong with `single`"""
+    if len(contexts) == 1:
+        return [await single(contexts[0])]
+    documents = [context if isinstance(context, str) else context[input_key] for context in contexts]
+    try:
+        answer = await batch_agent.ainvoke({"documents": format_documents(documents)})
+        results = parse_profiles(message_text(answer), response_format, len(contexts))
+    except Exception as ex:
+        logger.warning(f"Batch of {len(contexts)} profiles failed, profiling them one by one: {str(ex)}")
+        results = [ex] * len(contexts)
+    retry = [index for index, result in enumerate(results) if isinstance(result, Exception)]
+    if retry:
+        if len(retry) < len(contexts):
+            logger.info(f"Re-profiling {len(retry)} of {len(contexts)} documents the batch answer got wrong")
+        retried = await asyncio.gather(*[single(contexts[index]) for index in retry], return_exceptions=True)
+        for index, result in zip(retry, retried):
+            results[index] = result
+    return results
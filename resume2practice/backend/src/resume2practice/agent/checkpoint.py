@@ -0,0 +1,200 @@
+"""Checkpoint stores for the workflow's interrupt/resume state.
+
+- `memory`: LangGraph's in-process `MemorySaver`. `/resume` only works on the process that handled
+  `/analyze`, so this is limited to a single worker.
+- `sqlite`: a SQLite database file in WAL mode shared by every worker process (and every container
+  mounting the same volume on one host), so any worker can resume any `thread_id`. Requires the
+  `langgraph-checkpoint-sqlite` package.
+
+Use `open_checkpointer()` to open the store selected by the environment.
+
+Both stores serialize with `CompressedSerializer`: LangGraph's default msgpack encoding, compressed
+with zstd (or zlib where the `zstandard` package is missing) primed with a shared dictionary of the
+keys and vocabulary that recur in every session's checkpoints. Short resumes and job descriptions
+compress poorly on their own; the dictionary gives them a head start. Smaller checkpoints let a
+worker hold more paused sessions. `CHECKPOINT_COMPRESSION=none` turns compression off. Checkpoints
+are readable whatever the setting, since the type tag of each value names its codec.
+"""
+import logging
+import os
+import re
+import zlib
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+CHECKPOINT_STORE = os.environ.get("CHECKPOINT_STORE", "memory")
+CHECKPOINT_PATH = os.environ.get("CHECKPOINT_PATH", "checkpoints.sqlite3")
+# Seconds a writer waits for another process's write lock before failing
+CHECKPOINT_BUSY_TIMEOUT = float(os.environ.get("CHECKPOINT_BUSY_TIMEOUT", "30"))
+# `zstd`, `zlib` or `none`; zstd falls back to zlib when the `zstandard` package (a requirement, and
+# needed by every worker reading the same store) is not installed
+CHECKPOINT_COMPRESSION = os.environ.get("CHECKPOINT_COMPRESSION", "zstd")
+
+# Values shorter than this are stored uncompressed
+_MIN_COMPRESS_BYTES = 64
+
+# Vocabulary of the shared dictionary. Each dictionary version is needed to read every checkpoint
+# written with it, so none may ever change: add a new version instead. Strings that recur most go last.
+_VOCABULARY_V1 = (
+    "Summary Experience Education Skills Certifications Projects Languages Awards Volunteer References "
+    "Professional Experience Work History Technical Skills Core Competencies Bachelor of Science Master of "
+    "Science Bachelor of Arts MBA PhD University College Institute GPA Dean's List graduated with honors "
+    "Senior Software Engineer Staff Engineer Principal Engineer Engineering Manager Product Manager "
+    "Data Scientist Data Engineer Machine Learning Engineer DevOps Engineer Site Reliability Engineer "
+    "Full Stack Developer Frontend Developer Backend Developer Business Analyst Project Manager Intern "
+    "Python Java JavaScript TypeScript Go Rust C++ C# SQL PostgreSQL MySQL MongoDB Redis Kafka Spark "
+    "Airflow dbt Snowflake AWS GCP Azure Docker Kubernetes Terraform CI/CD Git Linux REST APIs GraphQL "
+    "React Node.js Django Flask FastAPI Spring microservices distributed systems cloud infrastructure "
+    "machine learning deep learning data pipelines analytics dashboards Tableau Excel Agile Scrum Jira "
+    "stakeholders cross-functional teams collaborated with led a team of mentored junior engineers "
+    "designed and implemented developed and maintained built scalable improved performance by reduced "
+    "costs by increased revenue by managed a budget of delivered projects on time owned end-to-end "
+    "responsible for communication skills problem-solving attention to detail leadership ownership "
+    "About the role About us What you will do What you'll do Responsibilities Requirements Qualifications "
+    "Required qualifications Preferred qualifications Nice to have Bonus points Benefits Compensation "
+    "We are looking for a We're looking for You will years of experience with 3+ years 5+ years "
+    "strong experience in proficiency in familiarity with hands-on experience excellent written and "
+    "verbal communication ability to work independently fast-paced environment equal opportunity "
+    "employer remote hybrid on-site full-time part-time contract salary range health insurance 401(k) "
+    "paid time off "
+)
+
+
+# Keys of the workflow state and profiles, and of LangGraph's checkpoint structure and the graph's
+# nodes and channels, as they were when each dictionary version was made. These are literals on
+# purpose: deriving them from the schema would change the dictionary whenever the schema changes.
+_KEYS_V1 = (
+    b"__interrupt__ __pregel_tasks __start__ branch:to:job_description_profiler "
+    b"branch:to:resume_profiler branch:to:scorecard_generator branch:to:task_generator career_level "
+    b"channel_values channel_versions education evaluation_criteria gap_analysis hard_requirements id "
+    b"industry input job_description job_description_profile job_description_profiler job_title loop "
+    b"name nice_to_haves opportunity_for_growth parents pending_sends questions readiness_score "
+    b"responsibilities resume resume_profile resume_profiler scorecard scorecard_generator skills "
+    b"soft_requirements source step strengths summary task_data task_description task_generator "
+    b"task_list task_summary task_type tasks ts updated_channels v versions_seen weaknesses"
+)
+# Adds the intake step (`scorecard_intake`, its join and branch channels) and `intake_questions` and
+# `additional_context` to version 1
+_KEYS_V2 = (
+    b"__input__ __interrupt__ __pregel_tasks __start__ additional_context "
+    b"branch:to:job_description_profiler branch:to:resume_profiler branch:to:scorecard_generator "
+    b"branch:to:scorecard_intake branch:to:task_generator career_level channel_values channel_versions "
+    b"education evaluation_criteria gap_analysis hard_requirements id industry input intake_questions "
+    b"job_description job_description_profile job_description_profiler job_title "
+    b"join:resume_profiler+job_description_profiler:scorecard_intake loop name nice_to_haves "
+    b"opportunity_for_growth parents pending_sends questions readiness_score responsibilities resume "
+    b"resume_profile resume_profiler scorecard scorecard_generator scorecard_intake skills "
+    b"soft_requirements source step strengths summary task_data task_description task_generator "
+    b"task_list task_summary task_type tasks ts updated_channels v versions_seen weaknesses"
+)
+
+# Version -> dictionary. Values are written with the latest version; older ones are kept to read the
+# checkpoints written with them (codec `zstd1`, `zlib1`, ...)
+_DICTIONARIES = {
+    1: _VOCABULARY_V1.encode() + _KEYS_V1,
+    2: _VOCABULARY_V1.encode() + _KEYS_V2
+}
+_DICTIONARY_VERSION = max(_DICTIONARIES)
+_CODEC = re.compile(r"(zstd|zlib)([0-9]+)")
+
+
+def _zstd_codec(dictionary: bytes) -> Optional[Tuple[Any, Any]]:
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    shared = zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+    return (zstandard.ZstdCompressor(level=3, dict_data=shared, write_content_size=True),
+            zstandard.ZstdDecompressor(dict_data=shared))
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Checkpoint serializer that compresses the output of another serializer with a shared dictionary.
+
+    The codec and dictionary version are appended to the type tag (`msgpack+zstd2`), so values are
+    read back with the codec and dictionary they were written with, and values written without
+    compression are read as they are.
+    """
+
+    def __init__(self, compression: str = CHECKPOINT_COMPRESSION, serde: Optional[SerializerProtocol] = None):
+        self.serde = serde or JsonPlusSerializer()
+        self._zstd = {version: _zstd_codec(dictionary) for version, dictionary in _DICTIONARIES.items()}
+        if compression == "zstd" and self._zstd[_DICTIONARY_VERSION] is None:
+            logger.warning("The zstandard package is not installed; compressing checkpoints with zlib")
+            compression = "zlib"
+        if compression not in ("zstd", "zlib", "none"):
+            raise ValueError(f"Unsupported checkpoint compression: {compression}")
+        self.compression = compression
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.serde.loads(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if self.compression == "none" or len(data) < _MIN_COMPRESS_BYTES:
+            return type_, data
+        version = _DICTIONARY_VERSION
+        if self.compression == "zstd":
+            return f"{type_}+zstd{version}", self._zstd[version][0].compress(data)
+        compressor = zlib.compressobj(level=6, zdict=_DICTIONARIES[version])
+        return f"{type_}+zlib{version}", compressor.compress(data) + compressor.flush()
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if "+" not in type_:
+            return self.serde.loads_typed(data)
+        type_, codec = type_.rsplit("+", 1)
+        match = _CODEC.fullmatch(codec)
+        if match is None or int(match.group(2)) not in _DICTIONARIES:
+            raise ValueError(f"Unsupported checkpoint codec: {codec}")
+        method, version = match.group(1), int(match.group(2))
+        if method == "zstd":
+            if self._zstd[version] is None:
+                raise ValueError("Reading this checkpoint requires the zstandard package")
+            payload = self._zstd[version][1].decompress(payload)
+        else:
+            decompressor = zlib.decompressobj(zdict=_DICTIONARIES[version])
+            payload = decompressor.decompress(payload) + decompressor.flush()
+        return self.serde.loads_typed((type_, payload))
+
+
+@asynccontextmanager
+async def open_checkpointer(store: str = CHECKPOINT_STORE,
+                            path: str = CHECKPOINT_PATH,
+                            compression: str = CHECKPOINT_COMPRESSION) -> AsyncIterator[Any]:
+    """Opens the checkpoint store and closes it on exit"""
+    serde = CompressedSerializer(compression)
+    if store == "memory":
+        yield MemorySaver(serde=serde)
+        return
+    if store != "sqlite":
+        raise ValueError(f"Unsupported checkpoint store: {store}")
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as ie:
+        raise ImportError(
+            f"CHECKPOINT_STORE=sqlite requires the langgraph-checkpoint-sqlite package: {str(ie)}"
+        )
+    connection = await aiosqlite.connect(path, timeout=CHECKPOINT_BUSY_TIMEOUT)
+    try:
+        # WAL lets readers in other workers proceed while one worker writes
+        await connection.execute("PRAGMA journal_mode=WAL")
+        await connection.execute("PRAGMA synchronous=NORMAL")
+        checkpointer = AsyncSqliteSaver(connection, serde=serde)
+        await checkpointer.setup()
+        logger.info(f"Using SQLite checkpoint store at {path}")
+        yield checkpointer
+    finally:
+        await connection.close()
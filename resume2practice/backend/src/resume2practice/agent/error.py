@@ -1,2 +1,14 @@
 class AgentExecutionError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class DeadlineExceeded(AgentExecutionError):
+    """Raised when a request's deadline leaves too little time to start or finish a step"""
+    pass
+
+class ThreadNotFound(AgentExecutionError):
+    """Raised when a `thread_id` has no stored state"""
+    pass
+
+class ForkError(AgentExecutionError):
+    """Raised when a thread's state cannot be forked at the requested step"""
+    pass
@@ -1,20 +1,38 @@
 from uuid import uuid4
 from langgraph.graph import StateGraph, END, START
-from langgraph.types import interrupt, Command
+from langgraph.types import interrupt
 from langgraph.checkpoint.memory import MemorySaver
-from resume2practice.models.schema import TaskGeneratorState
+from langgraph.config import get_stream_writer
+from langchain_core.runnables import RunnableConfig
+from resume2practice.models.schema import TaskGeneratorState, Scorecard, TaskList
 from resume2practice.agent.nodes import (
   ResumeProfiler,
   JobDescriptionProfiler,
   ScorecardGenerator,
   TaskGenerator
 )
-from resume2practice.agent.error import AgentExecutionError
-from typing import Optional, Dict, Any
+from resume2practice.agent import BaseAgent
+from resume2practice.agent.error import AgentExecutionError, DeadlineExceeded, ForkError, ThreadNotFound
+from resume2practice.agent.intake import IntakePolicy
+from resume2practice.agent.state import BlobStore, input_digest, is_released
+from resume2practice.serialization import dumps
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
+from contextlib import asynccontextmanager, nullcontext
+import asyncio
 import logging
+import time
+import weakref
 
 logger = logging.getLogger(__name__)
 
+# Steps a thread can be forked at -> the step whose output the fork's state stands in for
+FORK_POINTS = {
+  "scorecard_generator": "scorecard_intake",
+  "task_generator": "scorecard_generator"
+}
+# Steps that call a language model
+LLM_NODES = ("resume_profiler", "job_description_profiler", "scorecard_intake", "scorecard_generator", "task_generator")
+
 class Resume2Practice:
   def __init__(self, 
                resume_profiler_chain: ResumeProfiler,
@@ -22,7 +40,13 @@ class Resume2Practice:
                scorecard_generator_chain: ScorecardGenerator,
                task_generator_chain: TaskGenerator,
                config: Optional[Dict[str, Any]] = None, 
-               checkpointer: Optional[Any] = None):
+               checkpointer: Optional[Any] = None,
+               max_concurrent_runs: Optional[int] = 64,
+               min_node_seconds: float = 1.0,
+               slim_state: bool = False,
+               durability: str = "async",
+               blob_store: Optional[BlobStore] = None,
+               intake_policy: Optional[IntakePolicy] = None):
     if config is None:
       config = {
           "configurable": {
@@ -36,77 +60,271 @@ class Resume2Practice:
     self.task_generator = task_generator_chain
     self.checkpointer = checkpointer if checkpointer else MemorySaver()
     self.graph = None
+    # Runs on one thread are serialized (the checkpointer keeps a single history per thread), runs on
+    # different threads proceed concurrently up to `max_concurrent_runs`. None leaves runs unbounded
+    # here, for callers that cap them before they reach the graph (the API's admission control)
+    self.max_concurrent_runs = max_concurrent_runs
+    self._run_slots = asyncio.Semaphore(max_concurrent_runs) if max_concurrent_runs is not None else nullcontext()
+    self._thread_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    self._active_runs = 0
+    self._peak_runs = 0
+    # A node is skipped instead of started when less than this is left before the run's deadline
+    self.min_node_seconds = min_node_seconds
+    self._skipped_nodes = 0
+    # With a slim state the raw inputs are replaced by digests once profiled
+    self.slim_state = slim_state
+    self.blob_store = blob_store
+    # When checkpoints are written: after every step ("async" in the background, "sync" before the
+    # next step starts) or only where a run stops, at the interrupt or the end ("exit")
+    if durability not in ("sync", "async", "exit"):
+      raise ValueError(f"Unsupported checkpoint durability: {durability}")
+    self.durability = durability
+    # Which intake questions are asked; with none left the run does not pause for the candidate
+    self.intake_policy = intake_policy if intake_policy else IntakePolicy()
+    self._skipped_intakes = 0
+    # Completed executions of each step, to check that every step runs once per session
+    self._node_runs: Dict[str, int] = {node: 0 for node in LLM_NODES}
+    # Copies of the agents with another model, requested per run as `configurable.__model`
+    self._model_overrides: Dict[Tuple[str, str, str], BaseAgent] = {}
     self.build_graph()
 
-  async def resume_profiler_node(self, state: TaskGeneratorState, config: Optional[Dict[str, Any]] = None):
+  def _deadline(self, node: str, config: RunnableConfig) -> Optional[float]:
+    """Returns the run's deadline (`time.monotonic()`), set as `configurable.__deadline`, if it leaves enough time for `node`"""
+    deadline = ((config or {}).get("configurable") or {}).get("__deadline")
+    if deadline is not None and deadline - time.monotonic() < self.min_node_seconds:
+      self._skipped_nodes += 1
+      raise DeadlineExceeded(f"Skipped {node}: not enough time left before the request deadline")
+    return deadline
+
+  def _agent(self, agent: BaseAgent, config: RunnableConfig) -> BaseAgent:
+    """`agent`, or its copy with the model set for this run as `configurable.__model` (`{"vendor", "model_id"}`)"""
+    model = ((config or {}).get("configurable") or {}).get("__model")
+    if not model:
+      return agent
+    key = (type(agent).__name__, model["vendor"], model["model_id"])
+    if key not in self._model_overrides:
+      self._model_overrides[key] = agent.with_model(model["vendor"], model["model_id"])
+    return self._model_overrides[key]
+
+  def _raw_input(self, state: TaskGeneratorState, key: str, profile_key: str) -> Optional[str]:
+    """The raw input `key` to profile, or None if it was already profiled and released"""
+    value = state[key]
+    if not is_released(value):
+      return value
+    if state.get(profile_key) is not None:
+      return None
+    text = self.blob_store.get(value) if self.blob_store else None
+    if text is None:
+      raise AgentExecutionError(f"The {key} was released from the state before it was profiled")
+    return text
+
+  def _release(self, text: str) -> str:
+    """Digest reference that replaces a profiled raw input in a slim state"""
+    return self.blob_store.put(text) if self.blob_store else input_digest(text)
+
+  async def resume_profiler_node(self, state: TaskGeneratorState, config: RunnableConfig):
     logger.info("Resume Profiler: Generating profile from resume...")
-    resume_profile = await self.resume_profiler_agent.ainvoke(state["resume"])
+    deadline = self._deadline("resume_profiler", config)
+    resume = self._raw_input(state, "resume", "resume_profile")
+    if resume is None:
+      # Released after an earlier run of this step; its profile is already in the state
+      return {}
+    resume_profile = await self.resume_profiler_agent.ainvoke(resume, deadline=deadline)
     logger.info("Resume Profiler: Resume profile complete!")
-    return Command(
-        update={"resume_profile": resume_profile.model_dump_json()}, goto="job_description_profiler"
-    )
+    update = {"resume_profile": resume_profile.model_dump()}
+    if self.slim_state:
+      update["resume"] = self._release(resume)
+    self._node_runs["resume_profiler"] += 1
+    return update
 
-  async def job_description_profiler_node(self, state: TaskGeneratorState, config: Optional[Dict[str, Any]] = None):
+  async def job_description_profiler_node(self, state: TaskGeneratorState, config: RunnableConfig):
     logger.info("Job Description Profiler: Generating profile from job description..")
-    job_description_profile = await self.job_description_profiler.ainvoke(state["job_description"])
+    deadline = self._deadline("job_description_profiler", config)
+    job_description = self._raw_input(state, "job_description", "job_description_profile")
+    if job_description is None:
+      # Released after an earlier run of this step; its profile is already in the state
+      return {}
+    job_description_profile = await self.job_description_profiler.ainvoke(job_description, deadline=deadline)
     logger.info("Job Description Profiler: Job description profile complete!")
-    return Command(
-        update={"job_description_profile": job_description_profile.model_dump_json()}, goto="scorecard_generator"
-    )
+    update = {"job_description_profile": job_description_profile.model_dump()}
+    if self.slim_state:
+      update["job_description"] = self._release(job_description)
+    self._node_runs["job_description_profiler"] += 1
+    return update
 
-  async def scorecard_generator_node(self, state: TaskGeneratorState, config: Optional[Dict[str, Any]] = None):
-    logger.info("Scorecard Generator: Generating scorecard...")
-    context = {
-        "resume_profile": state["resume_profile"],
-        "job_description_profile": state["job_description_profile"]
+  def _profiles_context(self, state: TaskGeneratorState) -> Dict[str, str]:
+    # Profiles are kept as dicts in state and rendered as JSON only for the prompt
+    return {
+        "resume_profile": dumps(state["resume_profile"]),
+        "job_description_profile": dumps(state["job_description_profile"])
     }
-    # Generate list of initial questions to help fill in the blanks
-    precheck_list = await self.scorecard_generator.intake.ainvoke(context)
-    added_context = interrupt(precheck_list.model_dump_json())
+
+  async def scorecard_intake_node(self, state: TaskGeneratorState, config: RunnableConfig):
+    logger.info("Scorecard Intake: Generating intake questions...")
+    deadline = self._deadline("scorecard_intake", config)
+    scorecard_generator = self._agent(self.scorecard_generator, config)
+    # The questions are generated in a step of their own, so resuming from the interrupt in the
+    # scorecard step does not generate them again
+    precheck_list = await scorecard_generator.ainvoke_intake(self._profiles_context(state), deadline=deadline)
+    questions = self.intake_policy.select(precheck_list.questions, state["resume_profile"])
+    if not questions:
+      # Nothing worth a round trip to the candidate: the scorecard step carries on without pausing
+      logger.info("Scorecard Intake: No intake questions left to ask, continuing")
+      self._skipped_intakes += 1
+    self._node_runs["scorecard_intake"] += 1
+    return {"intake_questions": questions}
+
+  async def scorecard_generator_node(self, state: TaskGeneratorState, config: RunnableConfig):
+    logger.info("Scorecard Generator: Generating scorecard...")
+    context = self._profiles_context(state)
+    deadline = self._deadline("scorecard_generator", config)
+    scorecard_generator = self._agent(self.scorecard_generator, config)
+    # A forked thread already has the answers; otherwise ask the intake questions, if any are left
+    added_context = state.get("additional_context")
+    if added_context is None:
+      questions = state.get("intake_questions") or []
+      added_context = interrupt({"questions": questions}) if questions else ""
     logger.info(f"Added context: {added_context}")
     context.update({"additional_context": added_context})
-    scorecard = await self.scorecard_generator.ainvoke(context)
+    # Stream each scorecard field out as soon as it has been generated
+    writer = get_stream_writer()
+    fields = {}
+    async for field, value in scorecard_generator.astream_fields(context, deadline=deadline):
+      writer({"scorecard": {field: value}})
+      fields[field] = value
+    scorecard = Scorecard.model_validate(fields)
     logger.info("Scorecard Generator: Scorecard generated!")
-    return Command(
-        update={"scorecard": scorecard.model_dump_json()}, goto="task_generator"
-    )
+    self._node_runs["scorecard_generator"] += 1
+    return {"scorecard": scorecard.model_dump(), "additional_context": added_context}
 
-  async def task_generator_node(self, state: TaskGeneratorState, config: Optional[Dict[str, Any]] = None):
+  async def task_generator_node(self, state: TaskGeneratorState, config: RunnableConfig):
     logger.info("Task Generator: Creating tasks...")
     context = {
-        "job_description_profile": state["job_description_profile"],
-        "scorecard": state["scorecard"]
+        "job_description_profile": dumps(state["job_description_profile"]),
+        "scorecard": dumps(state["scorecard"])
     }
-    task_list = await self.task_generator.ainvoke(context)
+    # Stream each task out as soon as it has been generated
+    writer = get_stream_writer()
+    tasks = []
+    deadline = self._deadline("task_generator", config)
+    async for task in self._agent(self.task_generator, config).astream_tasks(context, deadline=deadline):
+      writer({"task": task.model_dump()})
+      tasks.append(task)
+    task_list = TaskList(tasks=tasks)
     logger.info("Task Generator: Tasks created!")
-    return Command(
-        update={"task_list": task_list.model_dump_json()}, goto=END
-    )
+    self._node_runs["task_generator"] += 1
+    return {"task_list": task_list.model_dump()}
 
 
   def build_graph(self) -> None:
     graph = StateGraph(TaskGeneratorState)
     graph.add_node("resume_profiler", self.resume_profiler_node)
     graph.add_node("job_description_profiler", self.job_description_profiler_node)
+    graph.add_node("scorecard_intake", self.scorecard_intake_node)
     graph.add_node("scorecard_generator", self.scorecard_generator_node)
     graph.add_node("task_generator", self.task_generator_node)
+    # The profilers run in parallel; the intake waits for both (a join, not one run per branch)
     graph.add_edge(START, "resume_profiler")
     graph.add_edge(START, "job_description_profiler")
-    graph.add_edge("resume_profiler", "scorecard_generator")
-    graph.add_edge("job_description_profiler", "scorecard_generator")
+    graph.add_edge(["resume_profiler", "job_description_profiler"], "scorecard_intake")
+    graph.add_edge("scorecard_intake", "scorecard_generator")
     graph.add_edge("scorecard_generator", "task_generator")
     graph.add_edge("task_generator", END)
     self.graph = graph.compile(checkpointer=self.checkpointer)
 
+  async def afork(self,
+                  source_config: Dict[str, Any],
+                  fork_config: Dict[str, Any],
+                  node: str,
+                  additional_context: Optional[str] = None) -> None:
+    """Seeds a new thread with the state of an existing one, ready to run again from `node`.
+
+    The fork reuses the stored profiles (and for `task_generator` the scorecard), so running it
+    repeats none of the earlier LLM calls. `additional_context` replaces the intake answers when
+    forking at `scorecard_generator`; without it the source thread's answers are used.
+    """
+    if node not in FORK_POINTS:
+      raise ForkError(f"Cannot fork at `{node}`; choose one of {', '.join(FORK_POINTS)}")
+    values = (await self.graph.aget_state(source_config)).values
+    if not values:
+      raise ThreadNotFound(f"No stored state for thread `{source_config['configurable']['thread_id']}`")
+    if node == "task_generator" and additional_context is not None:
+      raise ForkError("New intake answers only apply when forking at `scorecard_generator`")
+    keys = ["resume", "job_description", "resume_profile", "job_description_profile", "additional_context"]
+    if node == "task_generator":
+      keys.append("scorecard")
+    seeded = {key: values[key] for key in keys if values.get(key) is not None}
+    if additional_context is not None:
+      seeded["additional_context"] = additional_context
+    missing = [key for key in keys if key not in seeded]
+    if missing:
+      raise ForkError(f"The thread cannot be forked at `{node}` before it has its {', '.join(missing)}")
+    if (await self.graph.aget_state(fork_config)).values:
+      raise ForkError(f"Thread `{fork_config['configurable']['thread_id']}` already exists")
+    await self.graph.aupdate_state(fork_config, seeded, as_node=FORK_POINTS[node])
+
+  async def warmup(self) -> None:
+    """Resolves every agent's model and builds its chain concurrently"""
+    await asyncio.gather(
+      self.resume_profiler_agent.warmup(),
+      self.job_description_profiler.warmup(),
+      self.scorecard_generator.warmup(),
+      self.task_generator.warmup()
+    )
+
+  @asynccontextmanager
+  async def _run_slot(self, config: Dict[str, Any]):
+    """Holds the thread's lock and, when runs are capped, one of the global run slots for the duration of a run"""
+    thread_id = config["configurable"]["thread_id"]
+    lock = self._thread_locks.get(thread_id)
+    if lock is None:
+      # Kept alive by the runs holding or waiting on it, dropped once the thread is idle
+      lock = asyncio.Lock()
+      self._thread_locks[thread_id] = lock
+    async with lock, self._run_slots:
+      self._active_runs += 1
+      self._peak_runs = max(self._peak_runs, self._active_runs)
+      try:
+        yield
+      finally:
+        self._active_runs -= 1
+
+  def run_stats(self) -> Dict[str, Any]:
+    """Graph runs in progress, the most seen at once, the configured cap and threads with pending runs"""
+    return {
+      "active": self._active_runs,
+      "peak": self._peak_runs,
+      "max": self.max_concurrent_runs,
+      "busy_threads": len(self._thread_locks)
+    }
+
+  def node_stats(self) -> Dict[str, int]:
+    """Completed executions of each language model step"""
+    return dict(self._node_runs)
+
+  def call_stats(self) -> Dict[str, int]:
+    """Language model calls of all agents (including cancelled ones and the output tokens that saved), skipped steps and intakes"""
+    totals = {"skipped_nodes": self._skipped_nodes, "skipped_intakes": self._skipped_intakes}
+    agents = [self.resume_profiler_agent, self.job_description_profiler, self.scorecard_generator, self.task_generator]
+    for agent in agents:
+      for name, value in agent.call_stats.items():
+        totals[name] = totals.get(name, 0) + value
+    return totals
+
+  def batch_stats(self) -> Dict[str, Any]:
+    """Multi-document calls made by the profilers that batch their calls"""
+    profilers = {"resume_profiler": self.resume_profiler_agent, "job_description_profiler": self.job_description_profiler}
+    return {name: agent.batcher.stats() for name, agent in profilers.items() if getattr(agent, "batcher", None)}
+
   def invoke(self, context: Dict[str, Any], config: Optional[Dict[str, Any]] = None):
     try:
       if config is None:
         config = self.config
-      return self.graph.invoke(context, config)
+      return self.graph.invoke(context, config, durability=self.durability)
     except Exception as e:
       raise AgentExecutionError(
         f"An exception occurred while trying to process the following context: {context}\n"
-        f"Config: {self.config}\n"
+        f"Config: {config}\n"
         f"Error Message: {str(e)}"
       )
   
@@ -114,11 +332,35 @@ class Resume2Practice:
     try:
       if config is None:
         config = self.config
-      result = await self.graph.ainvoke(context, self.config)
+      async with self._run_slot(config):
+        result = await self.graph.ainvoke(context, config, durability=self.durability)
       return result
+    except DeadlineExceeded:
+      raise
+    except Exception as e:
+      raise AgentExecutionError(
+        f"An exception occurred while trying to process the following context: {context}\n"
+        f"Config: {config}\n"
+        f"Error Message: {str(e)}"
+      )
+
+  async def astream(self, context: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> AsyncIterator[Tuple[str, Any]]:
+    """Runs the workflow and yields `(mode, chunk)` pairs.
+
+    `custom` chunks carry partial results (scorecard fields and tasks) as soon as they are generated,
+    `values` chunks carry the full state after each step (including the `__interrupt__` payload).
+    """
+    try:
+      if config is None:
+        config = self.config
+      async with self._run_slot(config):
+        async for mode, chunk in self.graph.astream(context, config, stream_mode=["custom", "values"], durability=self.durability):
+          yield mode, chunk
+    except DeadlineExceeded:
+      raise
     except Exception as e:
       raise AgentExecutionError(
         f"An exception occurred while trying to process the following context: {context}\n"
-        f"Config: {self.config}\n"
+        f"Config: {config}\n"
         f"Error Message: {str(e)}"
       )
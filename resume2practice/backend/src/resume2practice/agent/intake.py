@@ -0,0 +1,78 @@
+"""Adaptive intake: which of the scorecard agent's questions are worth a round trip to the candidate.
+
+Asking the intake questions pauses the run at an interrupt, and the session only finishes after the
+client has sent the answers back through `/resume`. `IntakePolicy` trims the questions first:
+
+- blank questions and repeats (ignoring case and punctuation) are dropped,
+- with `filter_answered`, a question is dropped when every one of its key terms (words other than
+  question phrasing such as "do you have experience with") already appears in the resume profile,
+  e.g. "Have you worked with Kubernetes?" for a resume that lists Kubernetes,
+- at most `max_questions` are kept, in the order the agent asked them.
+
+When no question is left the scorecard is generated right away with no additional context, so the
+run goes through to the task list without an interrupt and `/analyze` returns the final result.
+`INTAKE_MAX_QUESTIONS=0` never asks.
+"""
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+INTAKE_MAX_QUESTIONS = int(os.environ.get("INTAKE_MAX_QUESTIONS", "5"))
+INTAKE_FILTER_ANSWERED = os.environ.get("INTAKE_FILTER_ANSWERED", "true").lower() == "true"
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#]*")
+# Words that phrase a question rather than say what it is about
+_QUESTION_WORDS = frozenset(
+    "a an and any are as at be been by can could describe did do does example examples experience "
+    "experienced familiar familiarity for from had has have how in is it its knowledge level me more of "
+    "on or please proficiency proficient provide share skill skills some tell than that the this to used "
+    "using was were what when where which who whether with work worked working would years you your".split()
+)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _profile_words(profile: Optional[Dict[str, Any]]) -> Set[str]:
+    """Every word in the values of a profile"""
+    words: Set[str] = set()
+    for value in (profile or {}).values():
+        for text in value if isinstance(value, list) else [value]:
+            if isinstance(text, str):
+                words.update(_words(text))
+    return words
+
+
+def key_terms(question: str) -> Set[str]:
+    """The words of a question that say what it is about"""
+    return {word for word in _words(question) if word not in _QUESTION_WORDS and len(word) > 1}
+
+
+class IntakePolicy:
+    """Selects the intake questions to ask, if any"""
+
+    def __init__(self, max_questions: int = INTAKE_MAX_QUESTIONS, filter_answered: bool = INTAKE_FILTER_ANSWERED):
+        self.max_questions = max(0, max_questions)
+        self.filter_answered = filter_answered
+
+    def select(self, questions: Optional[Iterable[str]], resume_profile: Optional[Dict[str, Any]] = None) -> List[str]:
+        """The questions worth asking, at most `max_questions`; an empty list means the intake is skipped"""
+        questions = [question.strip() for question in questions or [] if isinstance(question, str)]
+        known = _profile_words(resume_profile) if self.filter_answered else set()
+        selected, seen = [], set()
+        for question in questions:
+            normalized = " ".join(_words(question))
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            terms = key_terms(question)
+            if known and terms and terms <= known:
+                logger.info(f"Intake: dropped a question the resume profile answers: {question}")
+                continue
+            selected.append(question)
+        return selected[:self.max_questions]
@@ -1,24 +1,33 @@
 from resume2practice.agent import BaseAgent
-from resume2practice.agent.error import AgentExecutionError
+from resume2practice.agent.error import AgentExecutionError, DeadlineExceeded
+from resume2practice.agent.batching import MicroBatcher, aprofile_batch, profile_batch_chain, profile_batch_model
 from resume2practice.agent.roles import (
     RESUME_PROFILER, 
     JOB_DESCRIPTION_PROFILER, 
     SCORECARD_INTAKE, 
     SCORECARD_GENERATOR, 
-    TASK_GENERATOR
+    TASK_GENERATOR,
+    TASK_GAP_GENERATOR
 )
 from resume2practice.models.schema import (
     ResumeProfile,
     JobDescriptionProfile,
     ScorecardIntake,
     Scorecard,
+    Task,
     TaskList
 )
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from typing_extensions import override
-from typing import Optional, Dict, List, Callable, Any
-from langchain.prompts import ChatPromptTemplate
+from typing import Optional, Dict, List, Callable, Any, AsyncIterator, Tuple
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import SystemMessage
+from contextlib import aclosing
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class ResumeProfiler(BaseAgent):
@@ -28,11 +37,15 @@ class ResumeProfiler(BaseAgent):
                 role: str = RESUME_PROFILER,
                 tools: Optional[List[Callable[..., Any]]] = None,
                 response_format: Optional[BaseModel] = ResumeProfile, 
-                settings: Optional[Dict[str, Any]] = None):
+                settings: Optional[Dict[str, Any]] = None,
+                batch_window_ms: float = 0,
+                batch_max_items: int = 8):
         super().__init__(vendor=vendor, model_id=model_id, role=role, tools=tools, settings=settings)
         self._agent = None
+        self._batch_agent = None
+        # With a batch window, concurrent calls are collected into multi-document calls
+        self.batcher = MicroBatcher(self._aprofile_batch, batch_window_ms, batch_max_items) if batch_window_ms > 0 else None
         self._response_format = response_format
-        self.init_agent()
         self.metadata = {}
 
     @override
@@ -41,16 +54,19 @@ class ResumeProfiler(BaseAgent):
             raise ValueError("Language model not initialized. Check model_factory")
         
         if self._response_format is not None:
-            self._llm = self._llm.with_structured_output(self._response_format, method="json_mode")
+            self._llm = self._structured(self._response_format)
         resume_profiler_prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content=self._role),
             ("human", "{resume}")
         ])
         if self._agent is None:
             self._agent = resume_profiler_prompt | self._llm
+        if self.batcher is not None and self._response_format is not None:
+            self._batch_agent = profile_batch_chain(self._role, self._raw_output(profile_batch_model(self._response_format)))
 
     @override
     def invoke(self, context: Dict[str, Any]) -> Any:
+        self._ensure_initialized()
         try:
             return self._agent.invoke(context)
         except Exception as ex:
@@ -59,15 +75,26 @@ class ResumeProfiler(BaseAgent):
             )
         
     @override
-    async def ainvoke(self, context: Dict[str, Any]) -> Any:
+    async def ainvoke(self, context: Dict[str, Any], deadline: Optional[float] = None) -> Any:
+        await self.warmup()
         try:
-            result = await self._agent.ainvoke(context)
+            async with self._llm_call(deadline) as call:
+                if self._batch_agent is not None:
+                    result = call.record(await self.batcher.submit(context))
+                else:
+                    result = call.record(await self._agent.ainvoke(context))
             return result
+        except DeadlineExceeded:
+            raise
         except Exception as ex:
             raise AgentExecutionError(
                 f"An exception occurred while trying to invoke the following context: {context}\n{(str(ex))}"
             )
-        
+
+    async def _aprofile_batch(self, contexts: List[Dict[str, Any] | str]) -> List[Any]:
+        return await aprofile_batch(self._batch_agent, self._agent.ainvoke, self._response_format, "resume", contexts)
+
+
 class JobDescriptionProfiler(BaseAgent):
     def __init__(self, 
                 vendor: Optional[str] = None, 
@@ -75,11 +102,15 @@ class JobDescriptionProfiler(BaseAgent):
                 role: str = JOB_DESCRIPTION_PROFILER,
                 tools: Optional[List[Callable[..., Any]]] = None,
                 response_format: Optional[BaseModel] = JobDescriptionProfile, 
-                settings: Optional[Dict[str, Any]] = None):
+                settings: Optional[Dict[str, Any]] = None,
+                batch_window_ms: float = 0,
+                batch_max_items: int = 8):
         super().__init__(vendor=vendor, model_id=model_id, role=role, tools=tools, settings=settings)
         self._agent = None
+        self._batch_agent = None
+        # With a batch window, concurrent calls are collected into multi-document calls
+        self.batcher = MicroBatcher(self._aprofile_batch, batch_window_ms, batch_max_items) if batch_window_ms > 0 else None
         self._response_format = response_format
-        self.init_agent()
         self.metadata = {}
 
     @override
@@ -88,16 +119,19 @@ class JobDescriptionProfiler(BaseAgent):
             raise ValueError("Language model not initialized. Check model_factory")
         
         if self._response_format is not None:
-            self._llm = self._llm.with_structured_output(self._response_format, method="json_mode")
+            self._llm = self._structured(self._response_format)
         jd_profiler_prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content=self._role),
             ("human", "{job_description}")
         ])
         if self._agent is None:
             self._agent = jd_profiler_prompt | self._llm
+        if self.batcher is not None and self._response_format is not None:
+            self._batch_agent = profile_batch_chain(self._role, self._raw_output(profile_batch_model(self._response_format)))
 
     @override
     def invoke(self, context: Dict[str, Any]) -> Any:
+        self._ensure_initialized()
         try:
             return self._agent.invoke(context)
         except Exception as ex:
@@ -106,15 +140,25 @@ class JobDescriptionProfiler(BaseAgent):
             )
         
     @override
-    async def ainvoke(self, context: Dict[str, Any]) -> Any:
+    async def ainvoke(self, context: Dict[str, Any], deadline: Optional[float] = None) -> Any:
+        await self.warmup()
         try:
-            result = await self._agent.ainvoke(context)
+            async with self._llm_call(deadline) as call:
+                if self._batch_agent is not None:
+                    result = call.record(await self.batcher.submit(context))
+                else:
+                    result = call.record(await self._agent.ainvoke(context))
             return result
+        except DeadlineExceeded:
+            raise
         except Exception as ex:
             raise AgentExecutionError(
                 f"An exception occurred while trying to invoke the following context: {context}\n{(str(ex))}"
             )
-        
+
+    async def _aprofile_batch(self, contexts: List[Dict[str, Any] | str]) -> List[Any]:
+        return await aprofile_batch(self._batch_agent, self._agent.ainvoke, self._response_format, "job_description", contexts)
+
 
 class ScorecardGenerator(BaseAgent):
     def __init__(self, 
@@ -126,10 +170,8 @@ class ScorecardGenerator(BaseAgent):
                 settings: Optional[Dict[str, Any]] = None):
         super().__init__(vendor=vendor, model_id=model_id, role=role, tools=tools, settings=settings)
         self._agent = None
-        self.intake = None
-        self._setup_intake()
+        self._intake = None
         self._response_format = response_format
-        self.init_agent()
         self.metadata = {}
 
     def _setup_intake(self) -> None:
@@ -138,24 +180,58 @@ class ScorecardGenerator(BaseAgent):
             SystemMessage(content=SCORECARD_INTAKE),
             ("human", "{resume_profile} {job_description_profile}")
         ])
-        self.intake = scorecard_precheck_prompt | self._llm.with_structured_output(ScorecardIntake)
+        self._intake = scorecard_precheck_prompt | self._structured(ScorecardIntake)
+
+    @property
+    def intake(self) -> Any:
+        """Chain that generates the intake questions asked before the scorecard is generated"""
+        self._ensure_initialized()
+        return self._intake
+
+    async def ainvoke_intake(self, context: Dict[str, Any], deadline: Optional[float] = None) -> ScorecardIntake:
+        """Generates the intake questions within the request's deadline"""
+        await self.warmup()
+        try:
+            async with self._llm_call(deadline) as call:
+                result = call.record(await self._intake.ainvoke(context))
+            return result
+        except DeadlineExceeded:
+            raise
+        except Exception as ex:
+            raise AgentExecutionError(
+                f"An exception occurred while trying to generate intake questions for the following context: {context}\n{(str(ex))}"
+            )
 
     @override
     def init_agent(self):
         if not self._llm:
             raise ValueError("Language model not initialized. Check model_factory")
         
+        self._setup_intake()
         if self._response_format is not None:
-            self._llm = self._llm.with_structured_output(self._response_format, method="json_mode")
+            self._llm = self._structured(self._response_format)
         scorecard_generator_prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content=self._role),
             ("human", "{resume_profile} {job_description_profile}")
         ])
         if self._agent is None:
             self._agent = scorecard_generator_prompt | self._llm
+            self._stream_agent = scorecard_generator_prompt | self._raw_output(self._response_format)
+
+    async def astream_fields(self, context: Dict[str, Any], deadline: Optional[float] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Yields `(field name, value)` for each scorecard field as soon as it has been generated and validated"""
+        fields = (self._response_format or Scorecard).model_fields
+        async for path, value in self.astream_json(context, max_depth=1, deadline=deadline):
+            if len(path) != 1 or path[0] not in fields:
+                continue
+            try:
+                yield path[0], self._validate_streamed(value, fields[path[0]].annotation)
+            except ValueError as ex:
+                raise AgentExecutionError(f"Invalid value generated for scorecard field `{path[0]}`: {str(ex)}")
 
     @override
     def invoke(self, context: Dict[str, Any]) -> Any:
+        self._ensure_initialized()
         try:
             return self._agent.invoke(context)
         except Exception as ex:
@@ -164,10 +240,14 @@ class ScorecardGenerator(BaseAgent):
             )
         
     @override
-    async def ainvoke(self, context: Dict[str, Any]) -> Any:
+    async def ainvoke(self, context: Dict[str, Any], deadline: Optional[float] = None) -> Any:
+        await self.warmup()
         try:
-            result = await self._agent.ainvoke(context)
+            async with self._llm_call(deadline) as call:
+                result = call.record(await self._agent.ainvoke(context))
             return result
+        except DeadlineExceeded:
+            raise
         except Exception as ex:
             raise AgentExecutionError(
                 f"An exception occurred while trying to invoke the following context: {context}\n{(str(ex))}"
@@ -181,29 +261,158 @@ class TaskGenerator(BaseAgent):
                 role: str = TASK_GENERATOR,
                 tools: Optional[List[Callable[..., Any]]] = None,
                 response_format: Optional[BaseModel] = TaskList, 
-                settings: Optional[Dict[str, Any]] = None):
+                settings: Optional[Dict[str, Any]] = None,
+                parallel: bool = False,
+                max_concurrency: int = 4):
         super().__init__(vendor=vendor, model_id=model_id, role=role, tools=tools, settings=settings)
         self._agent = None
+        self.gap_agent = None
+        self.parallel = parallel
+        self.max_concurrency = max(1, int(max_concurrency))
         self._response_format = response_format
-        self.init_agent()
         self.metadata = {}
 
+    def _setup_gap_agent(self) -> None:
+        """Sets up the chain that generates a single task for a single skill gap (used in parallel mode)"""
+        task_gap_prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content=TASK_GAP_GENERATOR),
+            ("human", "{job_description_profile}\nSkill gap: {gap}")
+        ])
+        self.gap_agent = task_gap_prompt | self._structured(Task)
+
     @override
     def init_agent(self):
         if not self._llm:
             raise ValueError("Language model not initialized. Check model_factory")
         
+        self._setup_gap_agent()
         if self._response_format is not None:
-            self._llm = self._llm.with_structured_output(self._response_format, method="json_mode")
+            self._llm = self._structured(self._response_format)
         task_generator_prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content=self._role),
             ("human", "{job_description_profile} {scorecard}")
         ])
         if self._agent is None:
             self._agent = task_generator_prompt | self._llm
+            self._stream_agent = task_generator_prompt | self._raw_output(self._response_format)
+
+    @staticmethod
+    def _get_gaps(context: Dict[str, Any]) -> List[str]:
+        """Returns the distinct skill gaps (scorecard weaknesses) the tasks should be generated for"""
+        scorecard = context.get("scorecard")
+        if isinstance(scorecard, str):
+            scorecard = json.loads(scorecard)
+        if isinstance(scorecard, Scorecard):
+            weaknesses = scorecard.weaknesses or []
+        else:
+            weaknesses = (scorecard or {}).get("weaknesses") or []
+        gaps = []
+        for weakness in weaknesses:
+            if weakness and weakness.strip() and weakness.strip() not in gaps:
+                gaps.append(weakness.strip())
+        return gaps
+
+    @staticmethod
+    def _task_key(task: Task) -> str:
+        """Normalized key used to de-duplicate tasks generated for overlapping gaps"""
+        return " ".join((task.task_summary or "").lower().split())
+
+    async def _agenerate_per_gap(self,
+                                 context: Dict[str, Any],
+                                 gaps: List[str],
+                                 deadline: Optional[float] = None) -> AsyncIterator[Tuple[int, Task]]:
+        """Generates one task per gap with bounded concurrency, yielding `(gap index, task)` in completion order.
+
+        Invalid and duplicate tasks are dropped. A failing gap is logged and skipped so that one bad
+        response does not discard the tasks generated for the other gaps.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def generate(index: int, gap: str) -> Tuple[int, Task]:
+            async with semaphore:
+                try:
+                    async with self._llm_call(deadline) as call:
+                        result = call.record(await self.gap_agent.ainvoke({
+                            "job_description_profile": context["job_description_profile"],
+                            "gap": gap
+                        }))
+                except DeadlineExceeded:
+                    raise
+                except Exception as ex:
+                    raise AgentExecutionError(
+                        f"An exception occurred while trying to generate a task for gap: {gap}\n{(str(ex))}"
+                    )
+            task = result if isinstance(result, Task) else Task.model_validate(result)
+            if not task.task_summary or not task.task_description:
+                raise ValueError(f"Incomplete task generated for gap: {gap}")
+            return index, task
+
+        pending = [asyncio.create_task(generate(index, gap)) for index, gap in enumerate(gaps)]
+        seen = set()
+        try:
+            for next_done in asyncio.as_completed(pending):
+                try:
+                    index, task = await next_done
+                except DeadlineExceeded:
+                    raise
+                except (ValidationError, ValueError, AgentExecutionError) as ex:
+                    logger.warning(f"Task Generator: Skipping gap after failed generation: {str(ex)}")
+                    continue
+                key = self._task_key(task)
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield index, task
+        finally:
+            for task in pending:
+                task.cancel()
+            # Let the cancelled generations unwind so none outlives the caller or leaks its LLM call
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def astream_tasks(self, context: Dict[str, Any], deadline: Optional[float] = None) -> AsyncIterator[Task]:
+        """Yields each task as soon as it is generated.
+
+        In parallel mode one task is generated per scorecard weakness. Otherwise (or when the
+        scorecard has no weaknesses) the single `TaskList` response is parsed incrementally and each
+        task is yielded as soon as its JSON object closes.
+        """
+        await self.warmup()
+        gaps = self._get_gaps(context) if self.parallel else []
+        if gaps:
+            yielded = 0
+            # Closed with this stream, so the unfinished generations are cancelled before the caller moves on
+            async with aclosing(self._agenerate_per_gap(context, gaps, deadline)) as generated:
+                async for _, task in generated:
+                    yielded += 1
+                    yield task
+            if not yielded:
+                raise AgentExecutionError(
+                    f"Unable to generate any tasks for the following gaps: {gaps}"
+                )
+            return
+        async for path, value in self.astream_json(context, max_depth=2, deadline=deadline):
+            if len(path) != 2 or path[0] != "tasks":
+                continue
+            try:
+                yield self._validate_streamed(value, Task)
+            except ValueError as ex:
+                raise AgentExecutionError(f"Invalid task generated at position {path[1]}: {str(ex)}")
+
+    async def _ainvoke_task_list(self, context: Dict[str, Any], deadline: Optional[float] = None) -> TaskList:
+        try:
+            async with self._llm_call(deadline) as call:
+                result = call.record(await self._agent.ainvoke(context))
+            return result
+        except DeadlineExceeded:
+            raise
+        except Exception as ex:
+            raise AgentExecutionError(
+                f"An exception occurred while trying to invoke the following context: {context}\n{(str(ex))}"
+            )
 
     @override
     def invoke(self, context: Dict[str, Any]) -> Any:
+        self._ensure_initialized()
         try:
             return self._agent.invoke(context)
         except Exception as ex:
@@ -212,12 +421,15 @@ class TaskGenerator(BaseAgent):
             )
         
     @override
-    async def ainvoke(self, context: Dict[str, Any]) -> Any:
-        try:
-            result = await self._agent.ainvoke(context)
-            return result
-        except Exception as ex:
+    async def ainvoke(self, context: Dict[str, Any], deadline: Optional[float] = None) -> Any:
+        await self.warmup()
+        gaps = self._get_gaps(context) if self.parallel else []
+        if not gaps:
+            return await self._ainvoke_task_list(context, deadline)
+        # Merge in gap order so the resulting list is stable regardless of completion order
+        results = [item async for item in self._agenerate_per_gap(context, gaps, deadline)]
+        if not results:
             raise AgentExecutionError(
-                f"An exception occurred while trying to invoke the following context: {context}\n{(str(ex))}"
+                f"Unable to generate any tasks for the following gaps: {gaps}"
             )
-    
\ No newline at end of file
+        return TaskList(tasks=[task for _, task in sorted(results, key=lambda item: item[0])])
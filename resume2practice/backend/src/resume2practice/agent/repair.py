@@ -0,0 +1,188 @@
+"""Local repair of near-valid JSON output from language models.
+
+A response that fails to parse is usually almost right. Common problems are a Markdown code fence or
+prose around the document, a trailing comma, or a document cut off by the output token limit.
+`repair_json` fixes these in one pass over the text, which is far cheaper than a retry round trip
+to the model:
+
+- anything before the first `{`/`[` and after the document is dropped (code fences, prose),
+- trailing commas before `}`/`]` are removed,
+- a truncated document is cut back to its last complete value and its open strings, lists and
+  objects are closed. Fields that were cut off are left out and take their model defaults.
+
+`validate_repaired` then validates the document against the expected model, coercing values of a
+near-miss type (a single string for a list, a list for a string, `"7.5/10"` for a number). Optional
+fields that still do not validate are dropped and take their defaults, as are missing ones.
+"""
+import json
+import re
+import typing
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from resume2practice.agent.streaming import message_text
+
+_CLOSE = {"{": "}", "[": "]"}
+# Strings (possibly unterminated), structural characters and runs of scalar characters
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*("?)|[{}\[\],:]|[^\s{}\[\],:"]+')
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_INVALID = object()
+_TRAILING_COMMA = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[}\]])')
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """Removes commas that directly precede a closing bracket, outside of strings"""
+    return _TRAILING_COMMA.sub(lambda match: match.group(1) or match.group(2), text)
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(_strip_trailing_commas(text))
+
+
+def _scan(text: str) -> Tuple[Optional[int], Tuple[str, ...], int]:
+    """Scans the document at the start of `text`.
+
+    Returns where the document ends (None if it is truncated), plus for a truncated document the
+    containers open at its last complete value and the position right after that value. Opening or
+    closing a container completes a value, so the containers open there are those still open at
+    the end.
+    """
+    stack: List[str] = []
+    # Whether each open object expects a key next
+    expect_key: List[bool] = []
+    safe = 0
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        char = token[0]
+        if char == '"':
+            if not match.group(1):
+                # Unterminated string: the text was cut off inside it
+                break
+            if not (stack and stack[-1] == "{" and expect_key[-1]):
+                safe = match.end()
+        elif char in "{[":
+            stack.append(char)
+            expect_key.append(char == "{")
+            safe = match.end()
+        elif char in "}]":
+            if not stack:
+                return match.start(), (), 0
+            stack.pop()
+            expect_key.pop()
+            if not stack:
+                return match.end(), (), 0
+            safe = match.end()
+        elif char == ",":
+            if stack and stack[-1] == "{":
+                expect_key[-1] = True
+        elif char == ":":
+            if stack and stack[-1] == "{":
+                expect_key[-1] = False
+        elif match.end() < len(text):
+            # A number or literal is only known to be complete once something follows it
+            safe = match.end()
+    return None, tuple(stack), safe
+
+
+def repair_json(text: str) -> Any:
+    """Parses near-valid JSON text, repairing it where needed; raises `ValueError` if it cannot"""
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise ValueError("No JSON document found")
+    text = text[min(starts):]
+    # Fast path: a complete document wrapped in a code fence or prose
+    candidate = text[:max(text.rfind("}"), text.rfind("]")) + 1]
+    try:
+        return _loads(candidate)
+    except ValueError:
+        pass
+    end, open_containers, cut = _scan(text)
+    if end is not None:
+        text = text[:end]
+    else:
+        # Truncated: keep everything up to the last complete value and close what is still open
+        text = text[:cut].rstrip().rstrip(",") + "".join(_CLOSE[char] for char in reversed(open_containers))
+    return _loads(text)
+
+
+def raw_output_text(message: Any) -> str:
+    """The JSON text of a raw model response: the arguments of its (possibly invalid) tool call or its text"""
+    for call in getattr(message, "invalid_tool_calls", None) or []:
+        if call.get("args"):
+            return call["args"]
+    for call in getattr(message, "tool_calls", None) or []:
+        return json.dumps(call.get("args", {}))
+    return message_text(message)
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _coerce(value: Any, annotation: Any) -> Any:
+    """`value` validated as `annotation`, coerced from a near-miss type if needed, or `_INVALID`"""
+    try:
+        return _adapter(annotation).validate_python(value)
+    except ValidationError:
+        pass
+    if typing.get_origin(annotation) is typing.Union:
+        for arg in typing.get_args(annotation):
+            if arg is not type(None) and (coerced := _coerce(value, arg)) is not _INVALID:
+                return coerced
+        return _INVALID
+    if value is None:
+        return _INVALID
+    if typing.get_origin(annotation) in (list, List):
+        (item,) = typing.get_args(annotation) or (Any,)
+        if isinstance(value, str) and item is str:
+            # A list written as one string, e.g. "Python, SQL"
+            values = [part.strip() for part in re.split(r"[\n;,]", value) if part.strip()]
+        else:
+            values = value if isinstance(value, list) else [value]
+        return [coerced for coerced in (_coerce(entry, item) for entry in values) if coerced is not _INVALID]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        try:
+            return validate_repaired(annotation, value)
+        except ValueError:
+            return _INVALID
+    if annotation is str:
+        if isinstance(value, list):
+            return "\n".join(str(entry) for entry in value)
+        return value if isinstance(value, str) else json.dumps(value)
+    if annotation in (int, float) and isinstance(value, str) and (number := _NUMBER.search(value)):
+        return annotation(float(number.group()))
+    return _INVALID
+
+
+def coerce_value(value: Any, annotation: Any) -> Any:
+    """Validates `value` as `annotation`, coercing it from a near-miss type; raises `ValueError` if it cannot"""
+    coerced = _coerce(value, annotation)
+    if coerced is _INVALID:
+        raise ValueError(f"{value!r} is not a valid {getattr(annotation, '__name__', annotation)}")
+    return coerced
+
+
+def validate_repaired(schema: Type[BaseModel], data: Any) -> BaseModel:
+    """Validates `data` as `schema`, coercing near-miss values and dropping invalid optional fields"""
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object for {schema.__name__}, got {type(data).__name__}")
+    try:
+        return schema.model_validate(data)
+    except ValidationError:
+        pass
+    fields = {}
+    for name, field in schema.model_fields.items():
+        if name not in data:
+            continue
+        value = _coerce(data[name], field.annotation)
+        if value is not _INVALID:
+            fields[name] = value
+        elif field.is_required():
+            raise ValueError(f"Invalid value for the required field `{name}` of {schema.__name__}")
+    return schema.model_validate(fields)
@@ -0,0 +1,66 @@
+"""Slimming of the workflow state once the raw inputs have been profiled.
+
+Only the profilers read the raw `resume` and `job_description` text; every later step works from
+the profiles. With state slimming on, each profiler replaces its input with a digest reference
+(`sha256:<hex>`) once its profile exists, so paused sessions and their checkpoints no longer carry
+the documents. When a `BlobStore` is configured the text is written there first, and the reference
+doubles as the pointer to read it back.
+"""
+import hashlib
+import logging
+import os
+from typing import Any, Optional
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+logger = logging.getLogger(__name__)
+
+DIGEST_PREFIX = "sha256:"
+
+_serde = JsonPlusSerializer()
+
+
+def input_digest(text: str) -> str:
+    """Digest reference of a raw input"""
+    return DIGEST_PREFIX + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_released(value: Any) -> bool:
+    """Whether a raw input field holds a digest reference instead of the text"""
+    return isinstance(value, str) and value.startswith(DIGEST_PREFIX) and len(value) == len(DIGEST_PREFIX) + 64
+
+
+def state_bytes(values: Any) -> int:
+    """Serialized size of a state snapshot's values, as the checkpointer would encode them"""
+    return len(_serde.dumps_typed(values)[1])
+
+
+class BlobStore:
+    """Content-addressed store of raw inputs: one file per digest in a directory"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, reference: str) -> str:
+        return os.path.join(self.path, reference[len(DIGEST_PREFIX):])
+
+    def put(self, text: str) -> str:
+        """Stores `text` and returns its digest reference"""
+        reference = input_digest(text)
+        file = self._file(reference)
+        if not os.path.exists(file):
+            # Written under a temporary name and renamed, so a reader never sees a partial file
+            temporary = f"{file}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as handle:
+                handle.write(text)
+            os.replace(temporary, file)
+        return reference
+
+    def get(self, reference: str) -> Optional[str]:
+        """The text of a digest reference, or None if it is not stored"""
+        try:
+            with open(self._file(reference), encoding="utf-8") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
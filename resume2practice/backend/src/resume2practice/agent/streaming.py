@@ -0,0 +1,183 @@
+"""Incremental JSON parsing for streamed structured output.
+
+Language models emit structured output token by token, but `with_structured_output` only hands
+back a result once the whole document has been generated and parsed. `IncrementalJSONParser`
+scans the text as it arrives and reports every value as soon as its closing brace, bracket or
+quote is seen, so callers can validate and surface individual fields and list items long before
+the model has finished the rest of the document.
+"""
+import json
+import logging
+from typing import Any, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+JSONPath = Tuple[Union[str, int], ...]
+
+_CLOSERS = {"}": "{", "]": "["}
+
+
+class _Frame:
+    """Parsing state for one open container (or the document root)"""
+    __slots__ = ("kind", "path", "key", "index", "expect_key", "value_start", "in_scalar")
+
+    def __init__(self, kind: Optional[str], path: JSONPath):
+        self.kind = kind
+        self.path = path
+        self.key: Optional[str] = None
+        self.index = 0
+        self.expect_key = kind == "{"
+        self.value_start: Optional[int] = None
+        self.in_scalar = False
+
+    def child_path(self) -> JSONPath:
+        if self.kind is None:
+            return self.path
+        return self.path + ((self.key,) if self.kind == "{" else (self.index,))
+
+
+class IncrementalJSONParser:
+    """Emits `(path, value)` for each JSON value as soon as it is complete.
+
+    Paths are tuples of object keys and list indexes relative to the document root, e.g.
+    `("tasks", 0)` for the first task of a `TaskList`. Only values up to `max_depth` levels deep are
+    decoded; the root document itself is reported with the empty path `()` once it closes.
+    Text before the root document (such as a Markdown code fence) and after it is ignored.
+
+    Example:
+        parser = IncrementalJSONParser(max_depth=2)
+        for chunk in chunks:
+            for path, value in parser.feed(chunk):
+                ...
+        parser.close()
+    """
+
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = [_Frame(None, ())]
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._key_start = 0
+        self._events: List[Tuple[JSONPath, Any]] = []
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[JSONPath, Any]]:
+        """Consumes the next chunk of text and returns the values completed by it"""
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        text = self._text
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            self._scan(text[i], i)
+        self._pos = len(text)
+        return self._flush()
+
+    def close(self) -> List[Tuple[JSONPath, Any]]:
+        """Flushes a trailing top-level scalar at the end of the stream"""
+        if not self.done:
+            self._end_scalar(len(self._text))
+        return self._flush()
+
+    def _flush(self) -> List[Tuple[JSONPath, Any]]:
+        events, self._events = self._events, []
+        return events
+
+    def _scan(self, char: str, i: int) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._end_string(i)
+            return
+
+        frame = self._stack[-1]
+        if frame.kind is None and frame.value_start is None and char not in "{[":
+            # Skip anything (code fences, prose) before the root document begins
+            return
+        if char == '"':
+            self._end_scalar(i)
+            self._in_string = True
+            self._string_is_key = frame.kind == "{" and frame.expect_key
+            if self._string_is_key:
+                self._key_start = i
+            else:
+                self._begin_value(i)
+        elif char in "{[":
+            self._end_scalar(i)
+            self._begin_value(i)
+            self._stack.append(_Frame(char, frame.child_path()))
+        elif char in _CLOSERS:
+            self._end_scalar(i)
+            if len(self._stack) > 1 and self._stack[-1].kind == _CLOSERS[char]:
+                self._stack.pop()
+                self._complete_value(i + 1)
+        elif char == ",":
+            self._end_scalar(i)
+            if frame.kind == "{":
+                frame.expect_key = True
+            elif frame.kind == "[":
+                frame.index += 1
+        elif char == ":":
+            if frame.kind == "{":
+                frame.expect_key = False
+        elif char.isspace():
+            self._end_scalar(i)
+        elif not frame.in_scalar:
+            self._begin_value(i)
+            frame.in_scalar = True
+
+    def _begin_value(self, i: int) -> None:
+        frame = self._stack[-1]
+        if frame.value_start is None:
+            frame.value_start = i
+
+    def _end_scalar(self, i: int) -> None:
+        if self._stack[-1].in_scalar:
+            self._complete_value(i)
+
+    def _end_string(self, i: int) -> None:
+        frame = self._stack[-1]
+        if self._string_is_key:
+            frame.key = json.loads(self._text[self._key_start:i + 1])
+        else:
+            self._complete_value(i + 1)
+
+    def _complete_value(self, end: int) -> None:
+        frame = self._stack[-1]
+        start = frame.value_start
+        frame.value_start = None
+        frame.in_scalar = False
+        if start is None:
+            return
+        path = frame.child_path()
+        if frame.kind is None:
+            self.done = True
+        if len(path) > self.max_depth:
+            return
+        try:
+            value = json.loads(self._text[start:end])
+        except json.JSONDecodeError as ex:
+            logger.debug(f"Skipping malformed value at {path}: {str(ex)}")
+            return
+        self._events.append((path, value))
+
+
+def message_text(chunk: Any) -> str:
+    """Returns the text content of a streamed message chunk"""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return ""
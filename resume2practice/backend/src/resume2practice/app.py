@@ -1,5 +1,5 @@
-from fastapi import FastAPI, UploadFile, File, Form, status, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, UploadFile, File, Form, Header, status, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager, AsyncExitStack
 from resume2practice.agent.nodes import (
@@ -9,37 +9,187 @@ from resume2practice.agent.nodes import (
   TaskGenerator
 )
 from resume2practice.agent.graphs import Resume2Practice
+from resume2practice.agent.checkpoint import open_checkpointer
+from resume2practice.agent.state import BlobStore
+from resume2practice.agent.error import AgentExecutionError, DeadlineExceeded, ForkError, ThreadNotFound
+from resume2practice.coalescing import RequestCoalescer, request_key
+from resume2practice.admission import AdmissionController, Overloaded, Priority
+from resume2practice.uploads import (
+  UPLOAD_MAX_BYTES,
+  UnsupportedUpload,
+  UploadLimitMiddleware,
+  UploadStore,
+  UploadTooLarge,
+  check_pdf_file
+)
+from resume2practice.results import ResultStore, etag_matches, http_date
+from resume2practice.profiling import (
+  PROFILING_ENABLED,
+  LoopLagMonitor,
+  MemorySnapshots,
+  ProfilingMiddleware,
+  SamplingProfiler,
+  authorized
+)
 from langgraph.types import Command
-from io import BytesIO
-from pypdf import PdfReader
+from resume2practice.models.factory import model_factory
+from resume2practice.models.schema import JobDescriptionProfile, ResumeProfile
+from resume2practice.serialization import dumps, dumps_bytes
+from datetime import date
 from typing import Optional, Dict, Any
-import json
+from uuid import uuid4
+import asyncio
+import hmac
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Time budget of a request unless the client sends `X-Request-Timeout` (seconds)
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get("REQUEST_TIMEOUT_SECONDS", "120"))
+# How often a running request checks whether its client has disconnected
+DISCONNECT_POLL_SECONDS = float(os.environ.get("DISCONNECT_POLL_SECONDS", "0.5"))
+# Models a fork may run with, as comma-separated `vendor:model_id` entries (none by default)
+FORK_MODELS = frozenset(
+    entry.strip().lower() for entry in os.environ.get("FORK_MODELS", "").split(",") if entry.strip()
+)
+# Bearer token of the admin endpoints (`GET /results` export, `POST /jobs`); they answer 404 without one
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN") or None
 
 # -- Configuration ------------------------------------------------------------------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    stack = AsyncExitStack()
+    # Interrupt state lives in the checkpoint store; with a shared store any worker can resume any thread
+    checkpointer = await stack.enter_async_context(open_checkpointer())
     # Set up agent to run alongside lifespan of server app
     resume_profiler_model = os.environ.get("RESUME_PROFILER_MODEL", os.environ.get("LLM_MODEL_ID", "gpt-4.1-mini"))
     resume_profiler_vendor = os.environ.get("RESUME_PROFILER_VENDOR", os.environ.get("LLM_VENDOR_ID", "openai"))
-    resume_profiler = ResumeProfiler(vendor=resume_profiler_vendor, model_id=resume_profiler_model)
+    # With a window > 0, concurrent profiling calls are sent together as multi-document calls
+    profile_batch_window_ms = float(os.environ.get("PROFILE_BATCH_WINDOW_MS", "0"))
+    profile_batch_max_items = int(os.environ.get("PROFILE_BATCH_MAX_ITEMS", "8"))
+    resume_profiler = ResumeProfiler(vendor=resume_profiler_vendor,
+                                     model_id=resume_profiler_model,
+                                     batch_window_ms=profile_batch_window_ms,
+                                     batch_max_items=profile_batch_max_items)
     job_description_model = os.environ.get("JOB_DESCRIPTION_PROFILER_MODEL", os.environ.get("LLM_MODEL_ID", "gpt-4.1-mini"))
     job_description_vendor = os.environ.get("JOB_DESCRIPTION_PROFILER_VENDOR", os.environ.get("LLM_VENDOR_ID", "openai"))
-    job_description_profiler = JobDescriptionProfiler(vendor=job_description_vendor, model_id=job_description_model)
+    job_description_profiler = JobDescriptionProfiler(vendor=job_description_vendor,
+                                                      model_id=job_description_model,
+                                                      batch_window_ms=profile_batch_window_ms,
+                                                      batch_max_items=profile_batch_max_items)
     scorecard_generator_model = os.environ.get("SCORECARD_GENERATOR_MODEL", os.environ.get("LLM_MODEL_ID", "gpt-4.1-mini"))
     scorecard_generator_vendor = os.environ.get("SCORECARD_GENERATOR_VENDOR", os.environ.get("LLM_VENDOR_ID", "openai"))
     scorecard_generator = ScorecardGenerator(vendor=scorecard_generator_vendor, model_id=scorecard_generator_model)
     task_generator_model = os.environ.get("TASK_GENERATOR_MODEL", os.environ.get("LLM_MODEL_ID", "gpt-4.1-mini"))
     task_generator_vendor = os.environ.get("TASK_GENERATOR_VENDOR", os.environ.get("LLM_VENDOR_ID", "openai"))
-    task_generator = TaskGenerator(vendor=task_generator_vendor, model_id=task_generator_model)
+    task_generator_parallel = os.environ.get("TASK_GENERATOR_PARALLEL", "false").lower() == "true"
+    task_generator_max_concurrency = int(os.environ.get("TASK_GENERATOR_MAX_CONCURRENCY", "4"))
+    task_generator = TaskGenerator(vendor=task_generator_vendor, 
+                                   model_id=task_generator_model,
+                                   parallel=task_generator_parallel,
+                                   max_concurrency=task_generator_max_concurrency)
+    max_concurrent_runs = int(os.environ.get("MAX_CONCURRENT_RUNS", "64"))
+    state_blob_dir = os.environ.get("STATE_BLOB_DIR")
     workflow = Resume2Practice(resume_profiler_chain=resume_profiler, 
                                job_description_profiler_chain=job_description_profiler, 
                                scorecard_generator_chain=scorecard_generator, 
-                               task_generator_chain=task_generator)
+                               task_generator_chain=task_generator,
+                               checkpointer=checkpointer,
+                               # Admission control owns the cap on runs; the graph only serializes runs per thread
+                               max_concurrent_runs=None,
+                               min_node_seconds=float(os.environ.get("NODE_MIN_BUDGET_SECONDS", "1")),
+                               slim_state=os.environ.get("STATE_SLIMMING", "false").lower() == "true",
+                               durability=os.environ.get("CHECKPOINT_DURABILITY", "async"),
+                               blob_store=BlobStore(state_blob_dir) if state_blob_dir else None)
     app.state.agent = workflow
+    app.state.coalescer = RequestCoalescer()
+    app.state.admission = AdmissionController(max_concurrent=max_concurrent_runs)
+    app.state.uploads = UploadStore()
+    app.state.results = ResultStore()
+    # The job-matching index (and numpy) is loaded on first use
+    app.state.job_index = None
+    app.state.job_index_lock = asyncio.Lock()
+    # Agents resolve their models lazily on first use. With WARMUP=true that work is done up front
+    # instead, and /health reports ready only once it has finished.
+    app.state.ready = os.environ.get("WARMUP", "false").lower() != "true"
+    app.state.warmup_error = None
+    app.state.warmup_timings = {}
+    warmup_task = None
+    if not app.state.ready:
+        warmup_task = asyncio.create_task(warmup(app))
+    lag_task = asyncio.create_task(loop_lag.run()) if PROFILING_ENABLED else None
     yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+    if lag_task is not None:
+        lag_task.cancel()
+    await model_factory.aclose()
+    await stack.aclose()
+
+async def warmup(app: FastAPI) -> None:
+    """Pre-resolves the models, primes caches and (optionally) pre-opens vendor connections"""
+    timings = app.state.warmup_timings
+    try:
+        start = time.perf_counter()
+        await app.state.agent.warmup()
+        timings["agents"] = time.perf_counter() - start
 
-app = FastAPI(lifespan=lifespan)
+        start = time.perf_counter()
+        await asyncio.to_thread(import_pdf_reader)
+        dumps({"warmup": [0.0, None, True]})
+        timings["caches"] = time.perf_counter() - start
+
+        if os.environ.get("WARMUP_CONNECTIONS", "false").lower() == "true":
+            start = time.perf_counter()
+            await model_factory.warmup_connections()
+            timings["connections"] = time.perf_counter() - start
+        app.state.ready = True
+        logger.info(f"Warm-up complete: {timings}")
+    except Exception as ex:
+        app.state.warmup_error = str(ex)
+        logger.error(f"Warm-up failed: {str(ex)}")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered in a single pass with the fastest available encoder"""
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+class ClientDisconnected(Exception):
+    """Raised when the client went away before its request finished"""
+    pass
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Profiling is off (and its middleware not installed) unless PROFILING_TOKEN or PROFILING_SAMPLE_RATE is set
+profiler = SamplingProfiler()
+loop_lag = LoopLagMonitor(profiler)
+memory_snapshots = MemorySnapshots()
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+# Multipart /analyze bodies are parsed before the handler runs, so oversized ones are refused up front
+app.add_middleware(UploadLimitMiddleware, max_bytes=2 * UPLOAD_MAX_BYTES + 64 * 1024, paths=("/analyze",))
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, ex: Overloaded):
+    return FastJSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(ex)},
+        headers={"Retry-After": ex.retry_after_header}
+    )
+
+@app.exception_handler(ClientDisconnected)
+async def disconnected_handler(request: Request, ex: Exception):
+    # Nobody is listening; 499 (client closed request) only shows up in access logs
+    return Response(status_code=499)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_handler(request: Request, ex: DeadlineExceeded):
+    return FastJSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": f"The request did not finish before its deadline: {str(ex)}"}
+    )
 
 frontend_url = os.environ.get("FRONTEND_CLIENT_URL", "http://frontend:8888")
 app.add_middleware(
@@ -51,55 +201,222 @@ app.add_middleware(
 )
 
 # -- Helper functions ---------------------------
-def extract_text_from_pdf(pdf: bytes) -> str:
-    reader = PdfReader(BytesIO(pdf))
+def import_pdf_reader() -> Any:
+    """Imports pypdf on first use to keep it off the startup path"""
+    from pypdf import PdfReader
+    return PdfReader
+
+def idempotency_key(endpoint: str, thread_id: str, payload: Any, header: Optional[str]) -> str:
+    """Key under which duplicates of a request are coalesced and replayed"""
+    if header:
+        return request_key(endpoint, header)
+    return request_key(endpoint, thread_id, payload)
+
+def request_priority(default: Priority, header: Optional[str]) -> Priority:
+    """Priority of a request; clients can demote their own work with `X-Request-Priority: batch`"""
+    if header is not None and header.lower() == "batch":
+        return Priority.BATCH
+    return default
+
+def request_deadline(header: Optional[str]) -> float:
+    """Absolute deadline (`time.monotonic()`) of a request from its `X-Request-Timeout` header"""
+    try:
+        budget = float(header) if header else REQUEST_TIMEOUT_SECONDS
+    except ValueError:
+        raise HTTPException(status_code=400, detail="`X-Request-Timeout` must be a number of seconds")
+    return time.monotonic() + budget
+
+async def cancel_on_disconnect(request: Request, awaitable: Any) -> Any:
+    """Awaits `awaitable`, cancelling it (and the LLM calls it is waiting on) if the client goes away first"""
+    work = asyncio.ensure_future(awaitable)
+    async def watch():
+        while not await request.is_disconnected():
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+    watcher = asyncio.ensure_future(watch())
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        work.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if not work.done():
+        work.cancel()
+        logger.info(f"Client disconnected from {request.url.path}; cancelled its run")
+        raise ClientDisconnected()
+    return work.result()
+
+async def job_index() -> Any:
+    """The job-matching index, opened on first use"""
+    async with app.state.job_index_lock:
+        if app.state.job_index is None:
+            from resume2practice.matching import JobIndex
+            app.state.job_index = await asyncio.to_thread(JobIndex)
+    return app.state.job_index
+
+async def gather_bounded(awaitables: Any, limit: int) -> Any:
+    """Awaits `awaitables` concurrently, at most `limit` at a time"""
+    semaphore = asyncio.Semaphore(max(1, limit))
+    async def bounded(awaitable):
+        async with semaphore:
+            return await awaitable
+    return await asyncio.gather(*[bounded(awaitable) for awaitable in awaitables])
+
+async def store_result(thread_id: str, state: Dict[str, Any], source_thread_id: Optional[str] = None) -> None:
+    """Writes a finished run's result to the result store; a failed write is logged, not raised"""
+    try:
+        await asyncio.to_thread(app.state.results.save, thread_id, state, source_thread_id)
+    except Exception as ex:
+        logger.error(f"Could not store the result of thread {thread_id}: {str(ex)}")
+
+def require_profiling_token(authorization: Optional[str]) -> None:
+    """Hides the profiling endpoints from requests without the profiling token"""
+    if not authorized(authorization):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+def require_admin_token(authorization: Optional[str]) -> None:
+    """Hides the admin endpoints from requests without the admin token, and all of them while none is set"""
+    if ADMIN_TOKEN is None or not authorization or not authorization.startswith("Bearer ") \
+            or not hmac.compare_digest(authorization[len("Bearer "):].encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+def extract_text_from_pdf(pdf: Any) -> str:
+    """Text of a PDF given as a path or a binary file object"""
+    reader = import_pdf_reader()(pdf)
     pages = [
         page.extract_text() for page in reader.pages
     ]
     return "\n".join(pages)
 
+async def document_text(label: str, text: Optional[str], upload_id: Optional[str], file: Optional[UploadFile]) -> Optional[str]:
+    """Text of a document sent as text, as the id of a streamed upload or as a multipart PDF file"""
+    if upload_id is not None:
+        path = app.state.uploads.path(upload_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail=f"Unknown or expired {label} upload `{upload_id}`")
+        source = path
+    elif file is not None:
+        try:
+            # Clients label PDFs inconsistently, so the signature decides rather than the part's type.
+            # Starlette has spooled the file to disk; check it there instead of reading it into memory
+            check_pdf_file(file.file)
+        except UploadTooLarge as ex:
+            raise HTTPException(status_code=413, detail=str(ex))
+        except UnsupportedUpload:
+            raise HTTPException(status_code=400, detail=f"Only PDF files are allowed for {label} upload")
+        source = file.file
+    else:
+        return text
+    try:
+        # pypdf is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(extract_text_from_pdf, source)
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(ex)}")
+
 # -- Routes --------------------------------
 @app.get("/health")
 async def health():
-    """Get the health status of the server"""
-    return JSONResponse(
-        content={"status": "ok"}
+    """Get the health status of the server (503 until the optional warm-up has finished)"""
+    if app.state.warmup_error is not None:
+        return FastJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "error", "detail": app.state.warmup_error}
+        )
+    if not app.state.ready:
+        return FastJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up"}
+        )
+    return FastJSONResponse(
+        content={"status": "ok", "warmup": app.state.warmup_timings}
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """Get runtime metrics of the server"""
+    return FastJSONResponse(
+        content={
+            "admission": app.state.admission.stats(),
+            "graph_runs": app.state.agent.run_stats(),
+            "graph_nodes": app.state.agent.node_stats(),
+            "requests": app.state.coalescer.stats(),
+            "llm_calls": app.state.agent.call_stats(),
+            "profile_batches": app.state.agent.batch_stats(),
+            "http_pools": model_factory.http_pool_stats(),
+            **({"event_loop_lag": loop_lag.stats()} if PROFILING_ENABLED else {})
+        }
     )
 
+@app.get("/debug/profiles")
+async def list_profiles(authorization: Optional[str] = Header(None)):
+    """Lists the profiles of sampled requests written by this worker, newest first"""
+    require_profiling_token(authorization)
+    return FastJSONResponse(content={"profiles": list(reversed(profiler.recent))})
+
+@app.get("/debug/profiles/{name}")
+async def get_profile(name: str, authorization: Optional[str] = Header(None)):
+    """Downloads a profile as collapsed stacks (flame graph input)"""
+    require_profiling_token(authorization)
+    path = os.path.join(profiler.directory, os.path.basename(name))
+    if not name.endswith(".collapsed") or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return FileResponse(path, media_type="text/plain")
+
+@app.get("/debug/memory")
+async def memory_snapshot(top: int = 20, authorization: Optional[str] = Header(None)):
+    """Top allocation sites and their growth since the last call; the first call starts tracemalloc"""
+    require_profiling_token(authorization)
+    return FastJSONResponse(content=await asyncio.to_thread(memory_snapshots.snapshot, top))
+
+@app.delete("/debug/memory")
+async def stop_memory_tracing(authorization: Optional[str] = Header(None)):
+    """Stops tracemalloc, which slows down every allocation while it runs"""
+    require_profiling_token(authorization)
+    return FastJSONResponse(content=memory_snapshots.stop())
+
+@app.post("/uploads")
+async def upload(request: Request):
+    """Streams a PDF document (the raw request body) to disk and returns its `upload_id` for /analyze.
+
+    The body is checked for the PDF signature and the size limit as it arrives and is never held in
+    memory as a whole. Uploads are content-addressed: the id is the document's SHA-256 digest.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in ("application/pdf", "application/x-pdf", "application/octet-stream"):
+        raise HTTPException(status_code=415, detail="Send the PDF document as an `application/pdf` request body")
+    length = request.headers.get("content-length")
+    try:
+        result = await app.state.uploads.save(request.stream(), int(length) if length and length.isdigit() else None)
+    except UploadTooLarge as ex:
+        raise HTTPException(status_code=413, detail=str(ex))
+    except UnsupportedUpload as ex:
+        raise HTTPException(status_code=415, detail=str(ex))
+    return FastJSONResponse(status_code=status.HTTP_201_CREATED, content=result)
+
 @app.post("/analyze")
 async def analyze(
+    request: Request,
     thread_id: str = Form(...),
     job_description_text: Optional[str] = Form(None),
     job_description_file: Optional[UploadFile] = File(None),
     resume_text: Optional[str] = Form(None),
-    resume_file: Optional[UploadFile] = File(None)
+    resume_file: Optional[UploadFile] = File(None),
+    resume_upload_id: Optional[str] = Form(None),
+    job_description_upload_id: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key"),
+    priority_header: Optional[str] = Header(None, alias="X-Request-Priority"),
+    timeout_header: Optional[str] = Header(None, alias="X-Request-Timeout")
     ):
-    # -- Extract content from request payload
-    # Handle uploaded resumes
-    resume_content = ""
-    if resume_file is not None:
-        if resume_file.content_type != "application/pdf":
-            raise HTTPException(status_code=400, detail="Only PDF files are allowed for resume upload.")
-        try:
-            pdf_content = await resume_file.read()
-            resume_content = extract_text_from_pdf(pdf_content)
-        except Exception as ex:
-            raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(ex)}")
-    else:
-        resume_content = resume_text
-    
-    # Handle uploaded job descriptions
-    job_description_content = ""
-    if job_description_file is not None:
-        if job_description_file.content_type != "application/pdf":
-            raise HTTPException(status_code=400, detail="Only PDF files are allowed for job description upload")
-        try:
-            pdf_content = await job_description_file.read()
-            job_description_content = extract_text_from_pdf(pdf_content)
-        except Exception as ex:
-            raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(ex)}")
-    else:
-        job_description_content = job_description_text
+    # -- Extract content from request payload: text, an upload id (see /uploads) or a multipart file
+    resume_content = await document_text("resume", resume_text, resume_upload_id, resume_file)
+    job_description_content = await document_text(
+        "job description", job_description_text, job_description_upload_id, job_description_file
+    )
+
+    # The stored result of the session is indexed by this job (by default the job description digest)
+    if job_id:
+        await asyncio.to_thread(app.state.results.assign_job, thread_id, job_id)
 
     # -- Send payload to agent for initial response
     context = {
@@ -108,39 +425,306 @@ async def analyze(
     }
     config = {
         "configurable": {
-            "thread_id": thread_id
+            "thread_id": thread_id,
+            "__deadline": request_deadline(timeout_header)
         }
     }
-    response = await app.state.agent.ainvoke(context=context, config=config)
+    priority = request_priority(Priority.NEW, priority_header)
 
-    # Return the state of the interrupt
-    return JSONResponse(content=json.loads(response["__interrupt__"][0].value))
+    async def run_analysis():
+        async with app.state.admission.admit(priority):
+            response = await app.state.agent.ainvoke(context=context, config=config)
+        if "__interrupt__" in response:
+            return response["__interrupt__"][0].value
+        # The intake had nothing to ask, so the run went through to the end
+        await store_result(thread_id, response)
+        return {"questions": [], "scorecard": response["scorecard"], "task_list": response["task_list"]}
+
+    # Duplicates (double submits, retries) share the run instead of starting another one
+    key = idempotency_key("analyze", thread_id, context, idempotency_key_header)
+    interrupt_value = await cancel_on_disconnect(request, app.state.coalescer.run(key, run_analysis))
+
+    # Return the intake questions of the interrupt, or the final result when nothing was asked
+    return FastJSONResponse(content=interrupt_value)
 
 @app.post("/resume")
-async def resume(data: Dict[str, Any]):
+async def resume(request: Request,
+                 data: Dict[str, Any],
+                 idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key"),
+                 priority_header: Optional[str] = Header(None, alias="X-Request-Priority"),
+                 timeout_header: Optional[str] = Header(None, alias="X-Request-Timeout")):
     """Resumes the AI workflow from where it left off"""
     try:
         config = {
             "configurable": {
-                "thread_id": data["thread_id"]
+                "thread_id": data["thread_id"],
+                "__deadline": request_deadline(timeout_header)
             }
         }
-    except IndexError:
+    except KeyError:
         raise HTTPException(status_code=400, detail="Missing `thread_id` - cannot resume")
+    priority = request_priority(Priority.INTERACTIVE, priority_header)
+
+    async def run_resume():
+        async with app.state.admission.admit(priority):
+            result = await app.state.agent.ainvoke(
+                context=Command(resume=data.get("response", "")), 
+                config=config
+            )
+        await store_result(data["thread_id"], result)
+        return {
+            "scorecard": result["scorecard"],
+            "task_list": result["task_list"]
+        }
+
     try:
-        result = await app.state.agent.ainvoke(
-            context=Command(resume=data.get("response", "")), 
-            config=config
+        key = idempotency_key("resume", data["thread_id"], data.get("response", ""), idempotency_key_header)
+        final_result = await cancel_on_disconnect(request, app.state.coalescer.run(key, run_resume))
+
+        return FastJSONResponse(content=final_result)
+    except (Overloaded, DeadlineExceeded, ClientDisconnected):
+        raise
+    except Exception as ex:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Unable to finish request due to the following exception: {str(ex)}"
         )
 
-        final_result = {
+@app.post("/fork")
+async def fork(request: Request,
+               data: Dict[str, Any],
+               idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key"),
+               priority_header: Optional[str] = Header(None, alias="X-Request-Priority"),
+               timeout_header: Optional[str] = Header(None, alias="X-Request-Timeout")):
+    """Re-runs a session from its scorecard or tasks on a new thread, reusing its stored profiles.
+
+    `from` is `scorecard_generator` (the default) or `task_generator`. `response` replaces the intake
+    answers when re-scoring, and `model` (`{"vendor": ..., "model_id": ...}`) runs the re-generated
+    steps with another model. The source thread is left as it is; the fork gets `fork_thread_id` or a
+    new id, returned with its `scorecard` and `task_list`.
+    """
+    if "thread_id" not in data:
+        raise HTTPException(status_code=400, detail="Missing `thread_id` - cannot fork")
+    model = data.get("model")
+    if model is not None and not (isinstance(model, dict) and model.get("vendor") and model.get("model_id")):
+        raise HTTPException(status_code=400, detail="`model` must have a `vendor` and a `model_id`")
+    # Only configured models: each one is built and cached once, and costs what its vendor charges
+    if model is not None and f"{model['vendor']}:{model['model_id']}".lower() not in FORK_MODELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model `{model['vendor']}:{model['model_id']}` is not available for forks; "
+                   f"allowed: {', '.join(sorted(FORK_MODELS)) or 'none'}"
+        )
+    node = data.get("from", "scorecard_generator")
+    fork_thread_id = data.get("fork_thread_id") or str(uuid4())
+    source_config = {"configurable": {"thread_id": data["thread_id"]}}
+    config = {
+        "configurable": {
+            "thread_id": fork_thread_id,
+            "__deadline": request_deadline(timeout_header),
+            "__model": model
+        }
+    }
+    priority = request_priority(Priority.NEW, priority_header)
+
+    async def run_fork():
+        async with app.state.admission.admit(priority):
+            await app.state.agent.afork(source_config, config, node, data.get("response"))
+            result = await app.state.agent.ainvoke(context=None, config=config)
+        await store_result(fork_thread_id, result, data["thread_id"])
+        return {
+            "thread_id": fork_thread_id,
             "scorecard": result["scorecard"],
             "task_list": result["task_list"]
         }
 
-        return JSONResponse(content=final_result)
+    try:
+        key = idempotency_key("fork", data["thread_id"], data, idempotency_key_header)
+        final_result = await cancel_on_disconnect(request, app.state.coalescer.run(key, run_fork))
+        return FastJSONResponse(content=final_result)
+    except ThreadNotFound as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
+    except ForkError as ex:
+        raise HTTPException(status_code=409, detail=str(ex))
+    except (Overloaded, DeadlineExceeded, ClientDisconnected):
+        raise
     except Exception as ex:
         raise HTTPException(
             status_code=500, 
             detail=f"Unable to finish request due to the following exception: {str(ex)}"
         )
+
+@app.get("/results/{thread_id}")
+async def get_result(thread_id: str, if_none_match: Optional[str] = Header(None, alias="If-None-Match")):
+    """The stored result of a finished session, with an `ETag` for conditional requests"""
+    stored = await asyncio.to_thread(app.state.results.get, thread_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"No result stored for thread `{thread_id}`")
+    body, etag, updated_at = stored
+    headers = {"ETag": etag, "Last-Modified": http_date(updated_at), "Cache-Control": "private, no-cache"}
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/results")
+async def export_results(job_id: Optional[str] = None,
+                         since: Optional[date] = None,
+                         until: Optional[date] = None,
+                         limit: int = 100,
+                         cursor: Optional[str] = None,
+                         authorization: Optional[str] = Header(None)):
+    """Exports stored results as newline-delimited JSON, oldest first, one page at a time.
+
+    Filters by `job_id` and by creation date (`since` / `until`, inclusive). While there are more
+    results, `X-Next-Cursor` holds the `cursor` of the next page. Results hold the candidates'
+    profiles, so the export needs the admin token.
+    """
+    require_admin_token(authorization)
+    try:
+        documents, next_cursor = await asyncio.to_thread(app.state.results.export, job_id, since, until, limit, cursor)
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    content = b"".join(document + b"\n" for document in documents)
+    return Response(content=content, media_type="application/x-ndjson", headers=headers)
+
+@app.post("/jobs")
+async def add_jobs(data: Dict[str, Any],
+                   timeout_header: Optional[str] = Header(None, alias="X-Request-Timeout"),
+                   authorization: Optional[str] = Header(None)):
+    """Adds jobs to the job-matching index, replacing jobs with the same `job_id`.
+
+    `jobs` is a list of `{"job_id": ..., "profile": {...}}` (a `JobDescriptionProfile`) or
+    `{"job_id": ..., "job_description": "..."}`, which is profiled first. Needs the admin token;
+    profiling runs as batch work under admission control.
+    """
+    from resume2practice.matching import MATCH_SCORE_CONCURRENCY
+    require_admin_token(authorization)
+    jobs = data.get("jobs")
+    if not isinstance(jobs, list) or not all(isinstance(job, dict) and job.get("job_id") and ("profile" in job or "job_description" in job) for job in jobs):
+        raise HTTPException(status_code=400, detail="`jobs` must be a list of objects with a `job_id` and a `profile` or `job_description`")
+    deadline = request_deadline(timeout_header)
+
+    async def profile(job: Dict[str, Any]) -> Dict[str, Any]:
+        if "profile" in job:
+            return JobDescriptionProfile.model_validate(job["profile"]).model_dump()
+        result = await app.state.agent.job_description_profiler.ainvoke(job["job_description"], deadline=deadline)
+        return result.model_dump()
+
+    try:
+        if any("profile" not in job for job in jobs):
+            async with app.state.admission.admit(Priority.BATCH):
+                profiles = await gather_bounded([profile(job) for job in jobs], MATCH_SCORE_CONCURRENCY)
+        else:
+            profiles = await gather_bounded([profile(job) for job in jobs], MATCH_SCORE_CONCURRENCY)
+    except (ValueError, TypeError) as ex:
+        raise HTTPException(status_code=400, detail=f"Invalid job profile: {str(ex)}")
+    index = await job_index()
+    total = await asyncio.to_thread(index.add, [(str(job["job_id"]), profile) for job, profile in zip(jobs, profiles)])
+    return FastJSONResponse(content={"added": len(jobs), "jobs": total})
+
+@app.post("/match")
+async def match_jobs(request: Request,
+                     data: Dict[str, Any],
+                     priority_header: Optional[str] = Header(None, alias="X-Request-Priority"),
+                     timeout_header: Optional[str] = Header(None, alias="X-Request-Timeout")):
+    """Finds the indexed jobs that best fit a resume, and scores the best of them with the scorecard agent.
+
+    The resume is a `resume_profile`, the profile stored for a session's `thread_id`, or `resume` text.
+    The index returns a `shortlist` of `k` jobs (default 20) without any LLM call; the first `score`
+    of them (default 5) are then scored and returned as `scored`, best readiness first.
+    """
+    from resume2practice.matching import MATCH_SCORE_CONCURRENCY, score_matches
+    try:
+        k, score = int(data.get("k", 20)), int(data.get("score", 5))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="`k` and `score` must be integers")
+    deadline = request_deadline(timeout_header)
+    if "resume_profile" in data:
+        resume_profile = ResumeProfile.model_validate(data["resume_profile"]).model_dump()
+    elif "thread_id" in data:
+        values = (await app.state.agent.graph.aget_state({"configurable": {"thread_id": data["thread_id"]}})).values
+        resume_profile = values.get("resume_profile")
+        if resume_profile is None:
+            raise HTTPException(status_code=404, detail=f"No resume profile stored for thread `{data['thread_id']}`")
+    elif "resume" in data:
+        resume_profile = (await app.state.agent.resume_profiler_agent.ainvoke(data["resume"], deadline=deadline)).model_dump()
+    else:
+        raise HTTPException(status_code=400, detail="Send a `resume_profile`, a `thread_id` or `resume` text")
+
+    index = await job_index()
+    shortlist = index.search(resume_profile, k)
+    scored = []
+    if score > 0 and shortlist:
+        async def run_scoring():
+            async with app.state.admission.admit(request_priority(Priority.NEW, priority_header)):
+                return await score_matches(app.state.agent.scorecard_generator, index, resume_profile,
+                                           shortlist[:score], MATCH_SCORE_CONCURRENCY, deadline)
+        scored = await cancel_on_disconnect(request, run_scoring())
+    return FastJSONResponse(content={"shortlist": shortlist, "scored": scored})
+
+@app.post("/resume/stream")
+async def resume_stream(data: Dict[str, Any],
+                        idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key"),
+                        priority_header: Optional[str] = Header(None, alias="X-Request-Priority"),
+                        timeout_header: Optional[str] = Header(None, alias="X-Request-Timeout")):
+    """Resumes the AI workflow and streams results as newline-delimited JSON.
+
+    Each scorecard field (`{"scorecard": {...}}`) and each task (`{"task": {...}}`) is sent as soon as
+    it has been generated, followed by the final `{"result": {...}}` (or an `{"error": ...}`) line.
+    Duplicates of a running or recently finished resume (also via `/resume`) only get the final line.
+    """
+    if "thread_id" not in data:
+        raise HTTPException(status_code=400, detail="Missing `thread_id` - cannot resume")
+    # Starlette cancels the stream (and with it the run) when the client disconnects
+    config = {
+        "configurable": {
+            "thread_id": data["thread_id"],
+            "__deadline": request_deadline(timeout_header)
+        }
+    }
+
+    key = idempotency_key("resume", data["thread_id"], data.get("response", ""), idempotency_key_header)
+    priority = request_priority(Priority.INTERACTIVE, priority_header)
+    # Shed before the 200 status line is sent; the slot itself is taken (and any lower priority waiter
+    # displaced) once streaming starts
+    if not app.state.coalescer.has(key):
+        app.state.admission.check(priority)
+
+    async def events():
+        shared = app.state.coalescer.join(key)
+        if shared is not None:
+            try:
+                final_result = await asyncio.shield(shared)
+                yield dumps({"result": final_result}) + "\n"
+            except Exception as ex:
+                yield dumps({"error": f"Unable to finish request due to the following exception: {str(ex)}"}) + "\n"
+            return
+        run = app.state.coalescer.lead(key)
+        state = {}
+        try:
+            async with app.state.admission.admit(priority):
+                async for mode, chunk in app.state.agent.astream(
+                    context=Command(resume=data.get("response", "")),
+                    config=config
+                ):
+                    if mode == "custom":
+                        yield dumps(chunk) + "\n"
+                    else:
+                        state = chunk
+            await store_result(data["thread_id"], state)
+            final_result = {
+                "scorecard": state.get("scorecard"),
+                "task_list": state.get("task_list")
+            }
+            run.set_result(final_result)
+            yield dumps({"result": final_result}) + "\n"
+        except Exception as ex:
+            run.set_exception(ex)
+            yield dumps({"error": f"Unable to finish request due to the following exception: {str(ex)}"}) + "\n"
+        finally:
+            if not run.done():
+                # The client went away mid-stream; duplicates waiting on this run have to retry
+                run.set_exception(AgentExecutionError("The resumed run was interrupted before it finished"))
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
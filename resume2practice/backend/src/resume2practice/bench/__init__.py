@@ -0,0 +1,30 @@
+"""Benchmarks and load tools. Run each module with `python -m resume2practice.bench.<name>`.
+
+Importing the package registers the offline `stub` vendor (`ENABLE_STUB_VENDOR`) for the benchmarks
+that run the workflow in process, and for the backend workers they start. `stub_workflow()` builds
+the workflow they run; the tests under `backend/tests` use it too.
+"""
+import os
+from typing import Any
+
+os.environ.setdefault("ENABLE_STUB_VENDOR", "1")
+
+
+def stub_workflow(**options: Any) -> Any:
+    """A `Resume2Practice` whose agents all use the stub model; `options` go to its constructor"""
+    from resume2practice.agent.graphs import Resume2Practice
+    from resume2practice.agent.nodes import (
+        ResumeProfiler,
+        JobDescriptionProfiler,
+        ScorecardGenerator,
+        TaskGenerator
+    )
+
+    stub = {"vendor": "stub", "model_id": "stub"}
+    return Resume2Practice(
+        resume_profiler_chain=ResumeProfiler(**stub),
+        job_description_profiler_chain=JobDescriptionProfiler(**stub),
+        scorecard_generator_chain=ScorecardGenerator(**stub),
+        task_generator_chain=TaskGenerator(**stub),
+        **options
+    )
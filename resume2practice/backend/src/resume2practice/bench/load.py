@@ -0,0 +1,266 @@
+"""Load generator for a running backend: replays sessions over HTTP and reports latency percentiles.
+
+Each session follows the flow of the frontend: `POST /analyze` with a resume and a job description,
+then, if the backend asked intake questions, `POST /resume` (or `/resume/stream` with `--stream`) with
+answers to them, formatted as the frontend sends them. A session the backend finished without
+questions (see `INTAKE_MAX_QUESTIONS`) ends after `/analyze`.
+
+Sessions come from a JSONL corpus, one object per line with `resume` and `job_description` text and
+optionally `answers` (a list, or one string used for every question) and `job_id`. The corpus is
+cycled through as often as needed. Without `--corpus` the documents of `bench.checkpoints` are used.
+
+Two ways to apply load:
+
+- closed loop (`--concurrency N`, the default): N sessions in flight at all times, each starting as
+  soon as another ends. Measures the throughput the backend sustains.
+- open loop (`--rate R`): sessions start at R per second on average (Poisson arrivals) whatever the
+  backend's state, as real users would. Shows how latency and errors grow past capacity.
+
+The run ends after `--sessions` sessions or `--duration` seconds, whichever comes first. The report is
+one JSON document (stdout, or `--output`): throughput, p50/p95/p99 latency per endpoint and of whole
+sessions, and the errors per endpoint by status code or exception type. Shed requests (429) are
+errors too, so a run past capacity shows them.
+
+Against a backend started with the stub model everything runs offline:
+
+    ENABLE_STUB_VENDOR=1 LLM_VENDOR_ID=stub LLM_MODEL_ID=stub fastapi run resume2practice/app.py --port 5000
+    python -m resume2practice.bench.load --url http://127.0.0.1:5000 --concurrency 32 --sessions 500
+
+Exits non-zero when the backend is not healthy or no session completed.
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import random
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+import httpx
+
+from resume2practice.bench.checkpoints import JOB_DESCRIPTIONS, RESUMES
+
+DEFAULT_ANSWER = "I have done this in my current role and can share details in an interview."
+
+
+def load_corpus(path: Optional[str]) -> List[Dict[str, Any]]:
+    """Sessions of a JSONL corpus, or pairs of the built-in documents"""
+    if path is None:
+        return [{"resume": resume, "job_description": job_description}
+                for resume, job_description in zip(RESUMES, itertools.cycle(JOB_DESCRIPTIONS))]
+    sessions = []
+    with open(path) as handle:
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            entry.setdefault("resume", entry.get("resume_text"))
+            entry.setdefault("job_description", entry.get("job_description_text"))
+            if not entry["resume"] or not entry["job_description"]:
+                raise ValueError(f"{path}:{number}: a session needs `resume` and `job_description` text")
+            sessions.append(entry)
+    if not sessions:
+        raise ValueError(f"{path}: the corpus is empty")
+    return sessions
+
+
+def format_answers(questions: List[str], answers: Any) -> str:
+    """The `/resume` response text for a session's questions, in the frontend's format"""
+    if isinstance(answers, str) or answers is None:
+        answers = [answers or DEFAULT_ANSWER] * len(questions)
+    return "".join(
+        f"Q: {question}\nA: {answer}\n\n"
+        for question, answer in zip(questions, itertools.chain(answers, itertools.repeat(DEFAULT_ANSWER)))
+    )
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+        "p50_ms": at(0.5),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1] * 1000, 1)
+    }
+
+
+class RequestFailed(Exception):
+    """A request of a session failed; the session stops there"""
+
+    def __init__(self, endpoint: str, reason: str):
+        super().__init__(f"{endpoint}: {reason}")
+        self.endpoint = endpoint
+        self.reason = reason
+
+
+class LoadGenerator:
+    """Runs sessions against a backend and records the latency and outcome of every request"""
+
+    def __init__(self, client: httpx.AsyncClient, url: str, corpus: List[Dict[str, Any]], stream: bool = False):
+        self.client = client
+        self.url = url.rstrip("/")
+        self.stream = stream
+        self._corpus: Iterator[Dict[str, Any]] = itertools.cycle(corpus)
+        self.latencies: Dict[str, List[float]] = collections.defaultdict(list)
+        self.errors: Dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+        self.sessions = collections.Counter()
+        self.session_latencies: List[float] = []
+
+    async def _request(self, endpoint: str, send: Any) -> Any:
+        """Sends one request, records its latency, and returns its parsed body or raises RequestFailed"""
+        start = time.perf_counter()
+        try:
+            response = await send()
+            if self.stream and endpoint == "/resume/stream" and response.status_code == 200:
+                body = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+                error = next((event["error"] for event in body if "error" in event), None)
+                if error is not None:
+                    raise RequestFailed(endpoint, "stream error")
+                body = next((event["result"] for event in body if "result" in event), None)
+            elif response.status_code == 200:
+                body = response.json()
+            else:
+                raise RequestFailed(endpoint, str(response.status_code))
+        except httpx.HTTPError as ex:
+            raise RequestFailed(endpoint, type(ex).__name__) from ex
+        except ValueError as ex:
+            raise RequestFailed(endpoint, "invalid body") from ex
+        finally:
+            self.latencies[endpoint].append(time.perf_counter() - start)
+        return body
+
+    async def session(self) -> None:
+        entry = next(self._corpus)
+        thread_id = str(uuid4())
+        form = {"thread_id": thread_id, "resume_text": entry["resume"], "job_description_text": entry["job_description"]}
+        if entry.get("job_id"):
+            form["job_id"] = entry["job_id"]
+        start = time.perf_counter()
+        self.sessions["started"] += 1
+        try:
+            analysis = await self._request("/analyze", lambda: self.client.post(f"{self.url}/analyze", data=form))
+            questions = analysis.get("questions") or []
+            if analysis.get("scorecard") is not None:
+                # The backend had nothing to ask and finished the session in one request
+                self.sessions["without_intake"] += 1
+            else:
+                endpoint = "/resume/stream" if self.stream else "/resume"
+                payload = {"thread_id": thread_id, "response": format_answers(questions, entry.get("answers"))}
+                result = await self._request(endpoint, lambda: self.client.post(f"{self.url}{endpoint}", json=payload))
+                if not result or result.get("scorecard") is None:
+                    raise RequestFailed(endpoint, "no result")
+        except RequestFailed as ex:
+            self.sessions["failed"] += 1
+            self.errors[ex.endpoint][ex.reason] += 1
+            return
+        self.sessions["completed"] += 1
+        self.session_latencies.append(time.perf_counter() - start)
+
+    async def closed_loop(self, concurrency: int, sessions: int, deadline: float) -> None:
+        remaining = itertools.count()
+
+        async def worker() -> None:
+            while next(remaining) < sessions and time.monotonic() < deadline:
+                await self.session()
+
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+    async def open_loop(self, rate: float, sessions: int, deadline: float) -> None:
+        running = set()
+        for _ in range(sessions):
+            if time.monotonic() >= deadline:
+                break
+            task = asyncio.create_task(self.session())
+            running.add(task)
+            task.add_done_callback(running.discard)
+            await asyncio.sleep(random.expovariate(rate))
+        if running:
+            await asyncio.gather(*running)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        requests = sum(len(values) for values in self.latencies.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "sessions": dict(self.sessions),
+            "throughput": {
+                "sessions_per_s": round(self.sessions["completed"] / elapsed, 2) if elapsed else 0.0,
+                "requests_per_s": round(requests / elapsed, 2) if elapsed else 0.0
+            },
+            "endpoints": {
+                endpoint: {**percentiles(values), "errors": sum(self.errors[endpoint].values())}
+                for endpoint, values in self.latencies.items()
+            },
+            "session_latency": percentiles(self.session_latencies),
+            "errors": {endpoint: dict(reasons) for endpoint, reasons in self.errors.items() if reasons}
+        }
+
+
+async def run(args: argparse.Namespace) -> int:
+    corpus = load_corpus(args.corpus)
+    limits = httpx.Limits(max_connections=args.max_connections)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        try:
+            health = await client.get(f"{args.url.rstrip('/')}/health")
+        except httpx.HTTPError as ex:
+            print(f"The backend at {args.url} is not reachable: {ex!r}", file=sys.stderr)
+            return 1
+        if health.status_code != 200:
+            print(f"The backend at {args.url} is not ready: {health.status_code} {health.text}", file=sys.stderr)
+            return 1
+        generator = LoadGenerator(client, args.url, corpus, stream=args.stream)
+        start = time.perf_counter()
+        deadline = time.monotonic() + args.duration if args.duration else float("inf")
+        if args.rate:
+            await generator.open_loop(args.rate, args.sessions, deadline)
+        else:
+            await generator.closed_loop(args.concurrency, args.sessions, deadline)
+        elapsed = time.perf_counter() - start
+    report = {
+        "config": {
+            "url": args.url,
+            "mode": "open" if args.rate else "closed",
+            "concurrency": None if args.rate else args.concurrency,
+            "rate": args.rate,
+            "stream": args.stream,
+            "corpus": args.corpus or "built-in",
+            "corpus_sessions": len(corpus)
+        },
+        **generator.report(elapsed)
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    return 0 if generator.sessions["completed"] else 1
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay analyze/resume sessions against a running backend.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="backend base URL")
+    parser.add_argument("--corpus", help="JSONL file of sessions (default: built-in documents)")
+    parser.add_argument("--sessions", type=int, default=200, help="sessions to run")
+    parser.add_argument("--duration", type=float, default=0, help="stop starting sessions after this many seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="sessions in flight (closed loop)")
+    parser.add_argument("--rate", type=float, default=0, help="session arrivals per second (open loop)")
+    parser.add_argument("--stream", action="store_true", help="resume through /resume/stream")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--max-connections", type=int, default=256, help="HTTP connection pool size")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
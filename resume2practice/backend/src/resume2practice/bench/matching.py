@@ -0,0 +1,113 @@
+"""Job-matching index: build time, query latency and shortlist quality on synthetic job profiles.
+
+Generates job profiles from a handful of role families, each with its own skill pool, adds them to
+a fresh index in batches (incremental additions), then queries it with resume profiles drawn from
+known jobs. Reports add throughput, query latency percentiles and how often the job a resume was
+drawn from, and the resume's role family, make the shortlist. Re-opens the index from disk to check
+that it returns the same results.
+
+Usage: python -m resume2practice.bench.matching [jobs] [queries] [k]
+"""
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+from resume2practice.matching import JobIndex
+
+FAMILIES = {
+    "Backend Engineer": "go java python postgres kafka grpc kubernetes microservices redis distributed-systems api-design",
+    "Data Scientist": "python statistics pandas scikit-learn experimentation sql forecasting causal-inference r modeling",
+    "Frontend Engineer": "react typescript javascript css accessibility webpack graphql design-systems testing browser",
+    "DevOps Engineer": "terraform kubernetes aws ci/cd monitoring prometheus linux ansible incident-response networking",
+    "Product Designer": "figma prototyping usability-testing research wireframes interaction-design accessibility journeys",
+    "Data Engineer": "spark airflow dbt snowflake sql python kafka pipelines warehousing orchestration",
+    "Security Engineer": "threat-modeling penetration-testing siem iam cryptography soc2 vulnerability-management cloud-security",
+    "Product Manager": "roadmaps discovery stakeholders metrics experimentation prioritization go-to-market analytics"
+}
+INDUSTRIES = ["Fintech", "Healthcare", "Retail", "Logistics", "Media", "Education", "Insurance", "Gaming"]
+LEVELS = ["Junior", "Mid-level", "Senior", "Staff"]
+
+
+def job_profile(rng: random.Random, family: str) -> Dict[str, Any]:
+    skills = FAMILIES[family].split()
+    level, industry = rng.choice(LEVELS), rng.choice(INDUSTRIES)
+    picks = rng.sample(skills, 6)
+    return {
+        "job_title": f"{level} {family}",
+        "summary": f"{industry} company hiring a {family.lower()} to work on {picks[0]} and {picks[1]}.",
+        "responsibilities": [f"Own {skill} work for the {industry.lower()} platform" for skill in picks[:3]],
+        "industry": industry,
+        "hard_requirements": [f"Experience with {skill}" for skill in picks[:4]],
+        "soft_requirements": ["Clear communication", "Ownership"],
+        "nice_to_haves": [f"Exposure to {skill}" for skill in picks[4:]],
+        "career_level": level
+    }
+
+
+def resume_profile(rng: random.Random, job: Dict[str, Any], family: str) -> Dict[str, Any]:
+    """A resume that fits `job`: most of its required skills plus some others of the family"""
+    skills = [requirement.split()[-1] for requirement in job["hard_requirements"]][:3]
+    skills += rng.sample(FAMILIES[family].split(), 3)
+    return {
+        "name": "Candidate",
+        "summary": f"{job['career_level']} {family.lower()} with {job['industry'].lower()} experience.",
+        "skills": skills,
+        "education": "B.S. Computer Science",
+        "career_level": job["career_level"]
+    }
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(jobs: int, queries: int, k: int) -> int:
+    rng = random.Random(7)
+    corpus: List[Tuple[str, Dict[str, Any], str]] = []
+    for ordinal in range(jobs):
+        family = rng.choice(list(FAMILIES))
+        corpus.append((f"job-{ordinal:06d}", job_profile(rng, family), family))
+
+    with tempfile.TemporaryDirectory() as path:
+        index = JobIndex(path)
+        start = time.perf_counter()
+        batch = 500
+        for offset in range(0, jobs, batch):
+            index.add((job_id, profile) for job_id, profile, _ in corpus[offset:offset + batch])
+        build = time.perf_counter() - start
+
+        latencies: List[float] = []
+        found = family_hits = family_total = 0
+        samples = [rng.choice(corpus) for _ in range(queries)]
+        results = []
+        for job_id, profile, family in samples:
+            resume = resume_profile(rng, profile, family)
+            start = time.perf_counter()
+            shortlist = index.search(resume, k)
+            latencies.append(time.perf_counter() - start)
+            results.append((resume, shortlist))
+            # The source job is one of many similar ones, so only check that it ranks among them
+            found += any(match["job_id"] == job_id for match in shortlist)
+            family_hits += sum(match["job_title"].endswith(family) for match in shortlist)
+            family_total += len(shortlist)
+
+        reopened = JobIndex(path)
+        stable = all(reopened.search(resume, k) == shortlist for resume, shortlist in results[:50])
+
+    print(f"jobs:              {jobs} (added in batches of {batch} in {build:.2f}s, {jobs / build:.0f} jobs/s)")
+    print(f"query latency:     p50 {_percentile(latencies, 0.5) * 1000:.2f}ms"
+          f"  p95 {_percentile(latencies, 0.95) * 1000:.2f}ms  max {max(latencies) * 1000:.2f}ms")
+    print(f"shortlist (k={k}):  source job found {found / queries:.0%},"
+          f" same role family {family_hits / max(family_total, 1):.0%}")
+    print(f"reopened index:    {'same results' if stable else 'DIFFERENT RESULTS'}")
+    return 0 if stable else 1
+
+
+if __name__ == "__main__":
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    sys.exit(main(jobs, queries, k))
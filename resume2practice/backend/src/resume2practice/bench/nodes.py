@@ -0,0 +1,93 @@
+"""Executions of each workflow step and language model calls per session.
+
+Runs concurrent sessions with the stub model and reports the completed executions of each step
+(`Resume2Practice.node_stats()`) and the language model calls of all agents per session, for:
+
+- sessions that answer the intake questions (`/analyze` then `/resume`),
+- sessions whose intake has nothing to ask (`INTAKE_MAX_QUESTIONS=0`), which finish in one run,
+- the same with state slimming,
+- forks of finished sessions at `scorecard_generator` and `task_generator`, which should run only
+  the steps from the fork point on.
+
+That every step runs exactly once per session is checked by `tests/test_nodes.py`.
+
+Usage: python -m resume2practice.bench.nodes [sessions]
+"""
+import asyncio
+import sys
+from typing import Any, Dict
+from uuid import uuid4
+
+from langgraph.types import Command
+
+from resume2practice.agent.graphs import LLM_NODES
+from resume2practice.agent.intake import IntakePolicy
+from resume2practice.bench import stub_workflow
+from resume2practice.bench.checkpoints import JOB_DESCRIPTIONS, RESUMES
+
+
+def build(slim_state: bool = False, max_questions: int = 5) -> Any:
+    return stub_workflow(slim_state=slim_state, intake_policy=IntakePolicy(max_questions=max_questions))
+
+
+def llm_calls(workflow: Any) -> Dict[str, int]:
+    agents = {
+        "resume_profiler": workflow.resume_profiler_agent,
+        "job_description_profiler": workflow.job_description_profiler,
+        "scorecard_generator": workflow.scorecard_generator,
+        "task_generator": workflow.task_generator
+    }
+    return {name: agent.call_stats["started"] for name, agent in agents.items()}
+
+
+async def session(workflow: Any, index: int) -> Dict[str, Any]:
+    config = {"configurable": {"thread_id": str(uuid4())}}
+    context = {"resume": RESUMES[index % len(RESUMES)], "job_description": JOB_DESCRIPTIONS[index % len(JOB_DESCRIPTIONS)]}
+    state = await workflow.ainvoke(context=context, config=config)
+    if "__interrupt__" in state:
+        state = await workflow.ainvoke(context=Command(resume="I have done this before."), config=config)
+    if state.get("task_list") is None:
+        raise AssertionError(f"session {index} did not finish")
+    return config
+
+
+LABELS = {"resume_profiler": "resume", "job_description_profiler": "job", "scorecard_intake": "intake",
+          "scorecard_generator": "scorecard", "task_generator": "tasks"}
+
+
+def report(name: str, runs: Dict[str, int], calls: int, sessions: int) -> None:
+    print(f"{name:<28} " + " ".join(f"{runs[node] / sessions:>9.2f}" for node in LLM_NODES) + f" {calls / sessions:>9.2f}")
+
+
+async def main(sessions: int) -> int:
+    print(f"sessions: {sessions}, executions per session of each step, and LLM calls per session")
+    print(f"{'':<28} " + " ".join(f"{LABELS[node]:>9}" for node in LLM_NODES) + f" {'LLM calls':>9}")
+
+    for name, workflow in (
+        ("with intake questions", build()),
+        ("without intake questions", build(max_questions=0)),
+        ("slim state, with intake", build(slim_state=True)),
+        ("slim state, without intake", build(slim_state=True, max_questions=0))
+    ):
+        await asyncio.gather(*[session(workflow, index) for index in range(sessions)])
+        report(name, workflow.node_stats(), sum(llm_calls(workflow).values()), sessions)
+
+    for node in ("scorecard_generator", "task_generator"):
+        workflow = build()
+        sources = await asyncio.gather(*[session(workflow, index) for index in range(sessions)])
+        runs, calls = workflow.node_stats(), sum(llm_calls(workflow).values())
+
+        async def fork(source: Dict[str, Any]) -> None:
+            config = {"configurable": {"thread_id": str(uuid4())}}
+            await workflow.afork(source, config, node)
+            await workflow.ainvoke(context=None, config=config)
+
+        await asyncio.gather(*[fork(source) for source in sources])
+        runs = {step: count - runs[step] for step, count in workflow.node_stats().items()}
+        report(f"fork at {node}", runs, sum(llm_calls(workflow).values()) - calls, sessions)
+    return 0
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sys.exit(asyncio.run(main(sessions)))
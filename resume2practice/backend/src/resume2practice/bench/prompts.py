@@ -0,0 +1,45 @@
+"""Token-count report of the role prompts in each schema style.
+
+Renders every system prompt from `agent/roles.py` with the `compact` and `verbose` schema
+descriptions and counts their tokens. Counts use `tiktoken` (`o200k_base`) when it is installed and
+its encoding can be loaded (it is downloaded on first use), and otherwise estimate four characters per
+token. The system prompt is sent with every call, so the difference is saved on each call of that
+role.
+
+Usage: python -m resume2practice.bench.prompts
+"""
+import sys
+from typing import Callable
+
+from resume2practice.agent import CHARS_PER_TOKEN
+from resume2practice.agent.roles import build_roles
+from resume2practice.models.prompt_schema import PROMPT_SCHEMA_STYLE
+
+
+def token_counter() -> tuple[str, Callable[[str], int]]:
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return "estimated (4 chars/token)", lambda text: len(text) // CHARS_PER_TOKEN
+    return "tiktoken o200k_base", lambda text: len(encoding.encode(text))
+
+
+def main() -> int:
+    method, count = token_counter()
+    compact, verbose = build_roles("compact"), build_roles("verbose")
+    print(f"tokens:        {method}")
+    print(f"active style:  {PROMPT_SCHEMA_STYLE}")
+    print(f"{'role':<26} {'compact':>8} {'verbose':>8} {'saved':>7}")
+    totals = [0, 0]
+    for name in compact:
+        small, large = count(compact[name]), count(verbose[name])
+        totals[0] += small
+        totals[1] += large
+        print(f"{name:<26} {small:>8} {large:>8} {1 - small / large:>7.0%}")
+    print(f"{'total':<26} {totals[0]:>8} {totals[1]:>8} {1 - totals[0] / totals[1]:>7.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
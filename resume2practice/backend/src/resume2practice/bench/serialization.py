@@ -0,0 +1,103 @@
+"""Per-request serialization cost: JSON-string payloads (before) vs native payloads (after).
+
+Replays the serialization work one session performs between the model output and the frontend:
+
+- before: every node stores `model_dump_json()` strings in state, `/analyze` re-parses the interrupt
+  string, `/resume` embeds JSON strings inside JSON and the frontend parses the nested strings again.
+- after: nodes store `model_dump()` dicts, prompts render them once, and every response is encoded
+  exactly once with the fast encoder and decoded once by the frontend.
+
+Usage: python -m resume2practice.bench.serialization [iterations]
+"""
+import json
+import sys
+import time
+from typing import Callable, Dict, Tuple
+
+from resume2practice.models.schema import (
+    ResumeProfile,
+    JobDescriptionProfile,
+    ScorecardIntake,
+    Scorecard,
+    Task,
+    TaskList
+)
+from resume2practice.serialization import dumps, dumps_bytes, loads
+
+
+def sample_outputs() -> Dict[str, object]:
+    """Model outputs of a typical session"""
+    sentence = "Designed and shipped data pipelines processing millions of events per day. "
+    return {
+        "resume_profile": ResumeProfile(
+            name="Jordan Doe", summary=sentence * 4, skills=[f"skill {i}" for i in range(25)],
+            education=sentence, career_level="Mid-level"
+        ),
+        "job_description_profile": JobDescriptionProfile(
+            job_title="Senior Data Engineer", summary=sentence * 4,
+            responsibilities=[sentence] * 8, industry="Fintech",
+            hard_requirements=[sentence] * 6, soft_requirements=[sentence] * 4,
+            nice_to_haves=[sentence] * 4, career_level="Senior"
+        ),
+        "intake": ScorecardIntake(questions=[f"Can you describe \"project\" {i}?" for i in range(5)]),
+        "scorecard": Scorecard(
+            gap_analysis=sentence * 6, strengths=[sentence] * 5, weaknesses=[sentence] * 5,
+            opportunity_for_growth=sentence * 3, readiness_score=6.5
+        ),
+        "task_list": TaskList(tasks=[
+            Task(task_summary=sentence, task_description=sentence * 5, task_type="Analysis",
+                 evaluation_criteria=sentence * 2, task_data="id,amount\n" + "1,2.50\n" * 40)
+            for _ in range(5)
+        ])
+    }
+
+
+def before(outputs: Dict[str, object]) -> int:
+    state = {key: model.model_dump_json() for key, model in outputs.items()}
+    # /analyze: parse the interrupt string, re-encode as the response body
+    analyze_body = json.dumps(json.loads(state["intake"])).encode("utf-8")
+    # /resume: JSON strings nested inside the JSON response
+    resume_body = json.dumps({"scorecard": state["scorecard"], "task_list": state["task_list"]}).encode("utf-8")
+    # frontend: parse the response, then each nested string
+    json.loads(analyze_body)
+    result = json.loads(resume_body)
+    json.loads(result["scorecard"])
+    json.loads(result["task_list"])
+    return len(analyze_body) + len(resume_body)
+
+
+def after(outputs: Dict[str, object]) -> int:
+    state = {key: model.model_dump() for key, model in outputs.items()}
+    # Prompts render the profiles and scorecard once
+    dumps(state["resume_profile"])
+    dumps(state["job_description_profile"])
+    dumps(state["job_description_profile"])
+    dumps(state["scorecard"])
+    analyze_body = dumps_bytes(state["intake"])
+    resume_body = dumps_bytes({"scorecard": state["scorecard"], "task_list": state["task_list"]})
+    loads(analyze_body)
+    loads(resume_body)
+    return len(analyze_body) + len(resume_body)
+
+
+def measure(fn: Callable[[Dict[str, object]], int], iterations: int) -> Tuple[float, int]:
+    """Returns (CPU microseconds per request, response bytes per request)"""
+    outputs = sample_outputs()
+    size = fn(outputs)
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(outputs)
+    return (time.process_time() - start) / iterations * 1e6, size
+
+
+def main(iterations: int = 2000) -> None:
+    before_us, before_bytes = measure(before, iterations)
+    after_us, after_bytes = measure(after, iterations)
+    print(f"{'':<8}{'CPU us/request':>16}{'bytes/request':>16}")
+    print(f"{'before':<8}{before_us:>16.1f}{before_bytes:>16}")
+    print(f"{'after':<8}{after_us:>16.1f}{after_bytes:>16}")
+    print(f"{'change':<8}{(after_us / before_us - 1) * 100:>15.1f}%{(after_bytes / before_bytes - 1) * 100:>15.1f}%")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,86 @@
+"""Multi-session throughput: many interleaved sessions on one workflow instance, with the stub model.
+
+Every session gets its own `thread_id` and runs `/analyze` then `/resume` (streamed for every other
+session) after a random think-time, so the analyze and resume phases of different sessions overlap.
+Reports throughput, latency percentiles and the peak number of concurrent graph runs. That sessions
+stay isolated from each other is checked by `tests/test_sessions.py`.
+
+Usage: python -m resume2practice.bench.sessions [sessions] [max_concurrent_runs] [latency_ms]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from resume2practice.bench import stub_workflow
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_session(workflow: Any, index: int, latencies: List[float]) -> None:
+    from langgraph.types import Command
+
+    config = {"configurable": {"thread_id": str(uuid4())}}
+    start = time.perf_counter()
+    await workflow.ainvoke(
+        context={"resume": f"Candidate {index:04d}\nExperienced engineer.", "job_description": f"Role {index:04d}\nBuild systems."},
+        config=config
+    )
+    await asyncio.sleep(random.uniform(0, 0.05))
+
+    command = Command(resume=f"Answers from candidate {index:04d}")
+    if index % 2:
+        await stream_resume(workflow, command, config)
+    else:
+        await workflow.ainvoke(context=command, config=config)
+    latencies.append(time.perf_counter() - start)
+
+
+async def stream_resume(workflow: Any, command: Any, config: Dict[str, Any]) -> Dict[str, Any]:
+    state: Dict[str, Any] = {}
+    async for mode, chunk in workflow.astream(context=command, config=config):
+        if mode == "values":
+            state = chunk
+    return state
+
+
+async def main(sessions: int, max_concurrent_runs: int) -> int:
+    workflow = stub_workflow(max_concurrent_runs=max_concurrent_runs)
+    await workflow.warmup()
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[run_session(workflow, index, latencies) for index in range(sessions)],
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - start
+    failures = [result for result in results if isinstance(result, Exception)]
+
+    stats = workflow.run_stats()
+    print(f"sessions:            {sessions} ({len(latencies)} completed, {len(failures)} failed)")
+    print(f"throughput:          {len(latencies) / elapsed:.1f} sessions/s ({elapsed:.2f}s total)")
+    if latencies:
+        print(f"session latency:     p50 {_percentile(latencies, 0.5) * 1000:.0f}ms"
+              f"  p95 {_percentile(latencies, 0.95) * 1000:.0f}ms"
+              f"  max {max(latencies) * 1000:.0f}ms")
+    print(f"concurrent runs:     peak {stats['peak']} (cap {stats['max']})")
+    for failure in failures[:5]:
+        print(f"failure: {failure!r}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    max_concurrent_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    # Read when the stub model is imported, so it must be set before `main` runs
+    if len(sys.argv) > 3:
+        os.environ["STUB_MODEL_LATENCY_MS"] = sys.argv[3]
+    os.environ.setdefault("STUB_MODEL_LATENCY_MS", "20")
+    sys.exit(asyncio.run(main(sessions, max_concurrent_runs)))
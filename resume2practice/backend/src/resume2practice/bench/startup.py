@@ -0,0 +1,90 @@
+"""Cold-start benchmark: time spent in each startup phase of the backend.
+
+Each run happens in a fresh interpreter so nothing is already imported. Phases:
+
+- imports: web framework, LangChain core, LangGraph and the application module
+- lifespan: constructing the workflow and its agents (lazy - no models are resolved)
+- first use: resolving the models (importing vendor SDKs) and building the chains, which happens on
+  the first request or during the opt-in warm-up (`WARMUP=true`)
+- pypdf: importing the PDF reader, deferred until the first upload
+
+A placeholder API key is set for the configured vendor when none is present; no requests are made.
+
+Usage: python -m resume2practice.bench.startup [runs]
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+
+def _child() -> None:
+    import asyncio
+    import importlib
+
+    timings: Dict[str, float] = {}
+
+    def timed(phase: str, fn) -> None:
+        start = time.perf_counter()
+        fn()
+        timings[phase] = time.perf_counter() - start
+
+    timed("import fastapi", lambda: importlib.import_module("fastapi"))
+    timed("import langchain_core", lambda: importlib.import_module("langchain_core.prompts"))
+    timed("import langgraph", lambda: importlib.import_module("langgraph.graph"))
+    timed("import resume2practice.app", lambda: importlib.import_module("resume2practice.app"))
+    app_module = sys.modules["resume2practice.app"]
+
+    async def run() -> None:
+        start = time.perf_counter()
+        async with app_module.lifespan(app_module.app):
+            timings["lifespan (construct agents)"] = time.perf_counter() - start
+            start = time.perf_counter()
+            try:
+                await app_module.app.state.agent.warmup()
+                timings["first use (resolve models, build chains)"] = time.perf_counter() - start
+            except Exception as ex:
+                timings["first use (resolve models, build chains)"] = float("nan")
+                print(f"first use failed: {str(ex)}", file=sys.stderr)
+
+    asyncio.run(run())
+    timed("import pypdf", lambda: importlib.import_module("pypdf"))
+    print(json.dumps(timings))
+
+
+def _placeholder_api_keys() -> Dict[str, str]:
+    from resume2practice.models import MODEL_VENDORS
+    env = dict(os.environ)
+    for vendor in MODEL_VENDORS:
+        if vendor.APIKey.value and not env.get(vendor.APIKey.value):
+            env[vendor.APIKey.value] = "startup-benchmark"
+    return env
+
+
+def main(runs: int = 5) -> None:
+    env = _placeholder_api_keys()
+    env["WARMUP"] = "false"
+    results: List[Dict[str, float]] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "resume2practice.bench.startup", "--child"],
+            env=env, capture_output=True, text=True, check=True
+        )
+        timings = json.loads(output.stdout.strip().splitlines()[-1])
+        timings["total (process)"] = time.perf_counter() - start
+        results.append(timings)
+
+    print(f"{'phase':<44}{'min ms':>10}{'median ms':>12}")
+    for phase in results[0]:
+        values = sorted(result[phase] * 1000 for result in results)
+        print(f"{phase:<44}{values[0]:>10.1f}{values[len(values) // 2]:>12.1f}")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        _child()
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
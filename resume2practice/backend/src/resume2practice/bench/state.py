@@ -0,0 +1,79 @@
+"""Per-thread state bytes with and without state slimming.
+
+Runs sessions with the stub model on an in-memory checkpointer, once with the full state and then
+with `slim_state` (optionally with a blob store, or checkpointing only on exit), and reports per thread:
+
+- the serialized state of a paused session (at the intake interrupt) and of a finished one,
+- the bytes and number of checkpoints kept by the checkpointer, and checkpoint writes per session.
+
+That slim sessions give the same results and release their raw inputs is checked by
+`tests/test_state.py`.
+
+Usage: python -m resume2practice.bench.state [sessions]
+"""
+import asyncio
+import sys
+import tempfile
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from resume2practice.agent.state import BlobStore, state_bytes
+from resume2practice.bench import stub_workflow
+from resume2practice.bench.checkpoints import JOB_DESCRIPTIONS, RESUMES, stored_values
+
+
+class CountingSaver(MemorySaver):
+    """In-memory checkpointer that counts checkpoint writes"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.puts = 0
+
+    async def aput(self, *args: Any, **kwargs: Any) -> Any:
+        self.puts += 1
+        return await super().aput(*args, **kwargs)
+
+
+async def run(sessions: int, slim_state: bool, blob_store: Optional[BlobStore], durability: str = "async") -> Dict[str, Any]:
+    saver = CountingSaver()
+    workflow = stub_workflow(checkpointer=saver, slim_state=slim_state, durability=durability, blob_store=blob_store)
+    paused = finished = 0
+    for index in range(sessions):
+        resume, job_description = RESUMES[index % len(RESUMES)], JOB_DESCRIPTIONS[index % len(JOB_DESCRIPTIONS)]
+        config = {"configurable": {"thread_id": str(uuid4())}}
+        await workflow.ainvoke(context={"resume": resume, "job_description": job_description}, config=config)
+        paused += state_bytes((await workflow.graph.aget_state(config)).values)
+        await workflow.ainvoke(context=Command(resume="I have led two migrations like this one."), config=config)
+        finished += state_bytes((await workflow.graph.aget_state(config)).values)
+    stored = [value for value in stored_values(saver) if value[0] != "empty"]
+    return {
+        "paused": paused / sessions,
+        "finished": finished / sessions,
+        "stored": sum(len(payload) for _, payload in stored) / sessions,
+        "checkpoints": sum(len(checkpoints) for namespaces in saver.storage.values() for checkpoints in namespaces.values()) / sessions,
+        "writes": saver.puts / sessions
+    }
+
+
+async def main(sessions: int) -> int:
+    with tempfile.TemporaryDirectory() as blob_dir:
+        modes = {
+            "full state": await run(sessions, False, None),
+            "slim": await run(sessions, True, None),
+            "slim + blob store": await run(sessions, True, BlobStore(blob_dir)),
+            "slim + exit": await run(sessions, True, None, durability="exit")
+        }
+    print(f"sessions: {sessions}, figures per thread (uncompressed msgpack)")
+    print(f"{'mode':<18} {'paused':>8} {'finished':>9} {'stored':>8} {'checkpoints':>12} {'writes':>7}")
+    for name, result in modes.items():
+        print(f"{name:<18} {result['paused']:>8.0f} {result['finished']:>9.0f} {result['stored']:>8.0f}"
+              f" {result['checkpoints']:>12.1f} {result['writes']:>7.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    sys.exit(asyncio.run(main(sessions)))
@@ -0,0 +1,134 @@
+"""Multi-worker throughput comparison with a shared SQLite checkpoint store.
+
+Starts backend worker processes on consecutive ports, all using the stub model and the same
+checkpoint database (`CHECKPOINT_STORE=sqlite`), and drives the same load over HTTP against 1 worker
+and against N workers. Each session is analyzed on worker `i % N` and resumed on worker
+`(i + 1) % N`, so no resume has thread affinity. Workers only add throughput while there are idle
+CPU cores for them. That a session resumes correctly on another worker is checked by
+`tests/test_workers.py`.
+
+Usage: python -m resume2practice.bench.workers [workers] [sessions] [concurrency] [latency_ms]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+from uuid import uuid4
+
+import httpx
+
+BASE_PORT = 5600
+# The directory holding the `resume2practice` package, where workers are started from
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def start_workers(count: int, directory: str, latency_ms: str, base_port: int = BASE_PORT) -> List[subprocess.Popen]:
+    env = dict(
+        os.environ,
+        ENABLE_STUB_VENDOR="1",
+        LLM_VENDOR_ID="stub",
+        LLM_MODEL_ID="stub",
+        STUB_MODEL_LATENCY_MS=latency_ms,
+        CHECKPOINT_STORE="sqlite",
+        CHECKPOINT_PATH=os.path.join(directory, "checkpoints.sqlite3"),
+        RESULT_STORE_PATH=os.path.join(directory, "results.sqlite3"),
+        UPLOAD_DIR=os.path.join(directory, "uploads")
+    )
+    return [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "resume2practice.app:app",
+             "--port", str(base_port + index), "--log-level", "warning"],
+            env=env,
+            cwd=SRC_DIR
+        )
+        for index in range(count)
+    ]
+
+
+async def wait_ready(client: httpx.AsyncClient, urls: List[str], processes: List[subprocess.Popen],
+                     timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    for url, process in zip(urls, processes):
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Worker at {url} exited with status {process.returncode}")
+            try:
+                if (await client.get(f"{url}/health")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Worker at {url} did not become ready")
+            await asyncio.sleep(0.2)
+
+
+async def run_session(client: httpx.AsyncClient, analyze_url: str, resume_url: str, index: int) -> Dict[str, Any]:
+    """Analyzes a session on one worker and resumes it on another; returns the final result"""
+    thread_id = str(uuid4())
+    response = await client.post(f"{analyze_url}/analyze", data={
+        "thread_id": thread_id,
+        "resume_text": f"Candidate {index:04d}\nExperienced engineer.",
+        "job_description_text": f"Role {index:04d}\nBuild systems."
+    })
+    response.raise_for_status()
+    response = await client.post(f"{resume_url}/resume", json={"thread_id": thread_id, "response": "answers"})
+    response.raise_for_status()
+    return response.json()
+
+
+async def load(urls: List[str], sessions: int, concurrency: int) -> Tuple[float, int]:
+    """Runs `sessions` sessions across the workers and returns (sessions per second, failures)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        async def bounded(index: int) -> None:
+            async with semaphore:
+                await run_session(client, urls[index % len(urls)], urls[(index + 1) % len(urls)], index)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[bounded(index) for index in range(sessions)], return_exceptions=True)
+        elapsed = time.perf_counter() - start
+    failures = [result for result in results if isinstance(result, Exception)]
+    for failure in failures[:3]:
+        print(f"  failure: {failure!r}")
+    return (sessions - len(failures)) / elapsed, len(failures)
+
+
+async def measure(workers: int, sessions: int, concurrency: int, latency_ms: str) -> Dict[str, Any]:
+    urls = [f"http://127.0.0.1:{BASE_PORT + index}" for index in range(workers)]
+    with tempfile.TemporaryDirectory() as directory:
+        processes = start_workers(workers, directory, latency_ms)
+        try:
+            async with httpx.AsyncClient(timeout=120) as client:
+                await wait_ready(client, urls, processes)
+            throughput, failures = await load(urls, sessions, concurrency)
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+    return {"workers": workers, "throughput": throughput, "failures": failures}
+
+
+async def main(workers: int, sessions: int, concurrency: int, latency_ms: str) -> int:
+    results = [
+        await measure(1, sessions, concurrency, latency_ms),
+        await measure(workers, sessions, concurrency, latency_ms)
+    ]
+    print(f"cpus:          {os.cpu_count()}")
+    print(f"{'workers':>8} {'sessions/s':>11} {'failures':>9}")
+    for result in results:
+        print(f"{result['workers']:>8} {result['throughput']:>11.1f} {result['failures']:>9}")
+    print(f"speedup:       {results[1]['throughput'] / results[0]['throughput']:.2f}x")
+    return 1 if any(result["failures"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    latency_ms = sys.argv[4] if len(sys.argv) > 4 else "20"
+    sys.exit(asyncio.run(main(workers, sessions, concurrency, latency_ms)))
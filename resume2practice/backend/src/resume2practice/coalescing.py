@@ -0,0 +1,124 @@
+"""Single-flight coalescing and replay of duplicate requests.
+
+Requests are keyed by what they would do (endpoint, `thread_id` and a digest of the payload) or by
+the client's `Idempotency-Key` header. While a run for a key is in flight, duplicates await that same
+run instead of starting another one. Once it has succeeded, its response is kept for
+`IDEMPOTENCY_TTL_SECONDS` and replayed to late duplicates. Failed runs are not kept, so a retry after
+an error runs again.
+
+The store is in-process: with several workers, duplicates are only caught on the worker that served
+the original request.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from resume2practice.serialization import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "1000"))
+
+
+def request_key(*parts: Any) -> str:
+    """Digest identifying a request by its endpoint, thread and payload"""
+    return hashlib.sha256(dumps_bytes(parts)).hexdigest()
+
+
+class RequestCoalescer:
+    """Shares one run between concurrent duplicates and replays its result to later ones"""
+
+    def __init__(self, ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Number of requests awaiting each in-flight run
+        self._waiters: Dict[str, int] = {}
+        # key -> (expiry time, result), oldest first
+        self._results: "OrderedDict[str, tuple]" = OrderedDict()
+        self._executed = 0
+        self._coalesced = 0
+        self._replayed = 0
+
+    def has(self, key: str) -> bool:
+        """Whether a run for `key` is in flight or its result is stored"""
+        stored = self._results.get(key)
+        return key in self._inflight or (stored is not None and time.monotonic() < stored[0])
+
+    def join(self, key: str) -> Optional[asyncio.Future]:
+        """Returns a future for the stored or in-flight result of `key`, or None if there is neither"""
+        stored = self._results.get(key)
+        if stored is not None:
+            expires_at, result = stored
+            if time.monotonic() < expires_at:
+                self._replayed += 1
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(result)
+                return future
+            del self._results[key]
+        future = self._inflight.get(key)
+        if future is not None:
+            self._coalesced += 1
+        return future
+
+    def lead(self, key: str, future: Optional[asyncio.Future] = None) -> asyncio.Future:
+        """Registers the run for `key`; its result is shared once `future` completes"""
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+        self._executed += 1
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the result of `fn()`, running it only if no run for `key` is stored or in flight.
+
+        The run is cancelled once every request awaiting it has been cancelled.
+        """
+        future = self.join(key)
+        if future is None:
+            future = self.lead(key, asyncio.ensure_future(fn()))
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            # Shielded so one disconnecting client does not cancel the run other duplicates are awaiting
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1 and not future.done():
+                future.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def _finish(self, key: str, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._results[key] = (time.monotonic() + self.ttl_seconds, future.result())
+        self._results.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._results:
+            key, (expires_at, _) = next(iter(self._results.items()))
+            if expires_at > now and len(self._results) <= self.max_entries:
+                break
+            del self._results[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executed": self._executed,
+            "coalesced": self._coalesced,
+            "replayed": self._replayed,
+            "in_flight": len(self._inflight),
+            "stored": len(self._results)
+        }
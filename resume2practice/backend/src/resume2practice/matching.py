@@ -0,0 +1,255 @@
+"""Local job-matching index: a BM25 shortlist of stored job profiles for a resume, before any LLM call.
+
+Scoring every open role with the scorecard agent costs one LLM call per role. `JobIndex` ranks all
+stored `JobDescriptionProfile`s against a `ResumeProfile` in a few milliseconds instead, so only a
+short list goes to the scorecard agent (`score_matches`, with bounded concurrency).
+
+Terms are hashed into `dim` buckets (no vocabulary to maintain), and each job is stored as its
+distinct term ids with their frequencies. The postings of all jobs live in flat arrays on disk that
+are memory-mapped, so workers share them through the page cache instead of each holding a copy. A
+query marks its terms in a lookup table, gathers the matching postings of every
+job at once and sums their BM25 weights per job with `np.bincount`.
+
+Adding jobs appends their postings and rewrites the small `meta.json`, which records how much of
+each file is committed: a crashed append is ignored and overwritten by the next one. Only the
+document frequencies are recomputed, from the postings. Re-adding a `job_id` replaces its earlier
+profile. Writers in different worker processes are serialized with a file lock, and readers pick
+up new jobs on their next query.
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from resume2practice.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+JOB_INDEX_PATH = os.environ.get("JOB_INDEX_PATH", "job_index")
+# Number of hash buckets for terms (a power of two)
+JOB_INDEX_DIM = int(os.environ.get("JOB_INDEX_DIM", str(2 ** 18)))
+MATCH_SCORE_CONCURRENCY = int(os.environ.get("MATCH_SCORE_CONCURRENCY", "4"))
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the their this to we with "
+    "will you your who what when where which while about into over under per via etc years year".split()
+)
+# Profile fields that are indexed and how many times their terms count
+_JOB_FIELDS = {
+    "job_title": 3, "hard_requirements": 2, "responsibilities": 1, "summary": 1,
+    "soft_requirements": 1, "nice_to_haves": 1, "industry": 1, "career_level": 1
+}
+_RESUME_FIELDS = {"skills": 2, "summary": 1, "education": 1, "career_level": 1}
+
+# Files of the index: postings (term id, frequency, job ordinal), job lengths and job records
+_ARRAYS = {"terms": np.uint32, "freqs": np.float32, "docs": np.uint32, "lengths": np.float32}
+
+
+def _field_terms(profile: Dict[str, Any], fields: Dict[str, int], dim: int) -> np.ndarray:
+    """Hashed term ids of the text fields of a profile, repeated by field weight"""
+    terms: List[int] = []
+    for field, weight in fields.items():
+        value = profile.get(field)
+        if not value:
+            continue
+        text = " ".join(value) if isinstance(value, list) else str(value)
+        ids = [zlib.crc32(word.encode()) & (dim - 1) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+        terms.extend(ids * weight)
+    return np.asarray(terms, dtype=np.uint32)
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Serializes writers across worker processes"""
+    with open(os.path.join(path, "lock"), "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class JobIndex:
+    """Persistent BM25 index of job description profiles, keyed by `job_id`"""
+
+    def __init__(self, path: str = JOB_INDEX_PATH, dim: int = JOB_INDEX_DIM):
+        if dim & (dim - 1):
+            raise ValueError(f"The job index dimension must be a power of two, got {dim}")
+        self.path = path
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def _meta_file(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    def _read_meta(self) -> Dict[str, int]:
+        try:
+            with open(self._meta_file()) as handle:
+                meta = json.load(handle)
+        except FileNotFoundError:
+            return {"dim": self.dim, "docs": 0, "postings": 0, "records_bytes": 0}
+        if meta["dim"] != self.dim:
+            raise ValueError(f"The job index at {self.path} was built with dimension {meta['dim']}, not {self.dim}")
+        return meta
+
+    def _map(self, name: str, length: int) -> np.ndarray:
+        if length == 0:
+            return np.zeros(0, dtype=_ARRAYS[name])
+        return np.memmap(os.path.join(self.path, f"{name}.bin"), dtype=_ARRAYS[name], mode="r", shape=(length,))
+
+    def _load(self, records: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Maps the committed part of the index and derives the ranking statistics.
+
+        `records` are the job records when they are already known, to save reading them back.
+        """
+        meta = self._read_meta()
+        arrays = {name: self._map(name, meta["docs"] if name == "lengths" else meta["postings"]) for name in _ARRAYS}
+        if records is None:
+            records = []
+        if meta["docs"] and len(records) != meta["docs"]:
+            with open(os.path.join(self.path, "jobs.jsonl"), "rb") as handle:
+                records = [json.loads(line) for line in handle.read(meta["records_bytes"]).splitlines()]
+        # A re-added job replaces its earlier version
+        positions = {record["job_id"]: ordinal for ordinal, record in enumerate(records)}
+        live = np.zeros(len(records), dtype=bool)
+        live[list(positions.values())] = True
+        count = int(live.sum())
+        # Each posting is a distinct term of one job, so counting postings gives document frequencies
+        df = np.bincount(arrays["terms"][live[arrays["docs"]]], minlength=self.dim) if count else np.zeros(self.dim)
+        idf = np.log1p((count - df + 0.5) / (df + 0.5)).astype(np.float32)
+        lengths = arrays["lengths"]
+        average = float(lengths[live].mean()) if count else 1.0
+        # Length normalization of each job: the part of the BM25 denominator that does not depend on the term
+        norms = (K1 * (1 - B + B * lengths / max(average, 1.0))).astype(np.float32)
+        self._arrays, self._records, self._positions = arrays, records, positions
+        self._live, self._idf, self._norms = live, idf, norms
+        self._version = os.stat(self._meta_file()).st_mtime_ns if os.path.exists(self._meta_file()) else None
+
+    def _refresh(self) -> None:
+        """Reloads the index when another process has added jobs"""
+        try:
+            version = os.stat(self._meta_file()).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if version != self._version:
+            with self._lock:
+                self._load()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, jobs: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Adds or replaces `(job_id, profile)` pairs and returns the number of jobs in the index"""
+        jobs = list(jobs)
+        if not jobs:
+            return len(self)
+        with self._lock, _file_lock(self.path):
+            meta = self._read_meta()
+            if meta["docs"] != len(self._records):
+                # Another process has added jobs since this one last loaded the index
+                self._load()
+            chunks: Dict[str, List[np.ndarray]] = {name: [] for name in _ARRAYS}
+            records, lines = [], []
+            for offset, (job_id, profile) in enumerate(jobs):
+                terms, counts = np.unique(_field_terms(profile, _JOB_FIELDS, self.dim), return_counts=True)
+                chunks["terms"].append(terms.astype(np.uint32))
+                chunks["freqs"].append(counts.astype(np.float32))
+                chunks["docs"].append(np.full(len(terms), meta["docs"] + offset, dtype=np.uint32))
+                chunks["lengths"].append(np.asarray([counts.sum()], dtype=np.float32))
+                record = {"job_id": job_id, "job_title": profile.get("job_title"), "profile": profile}
+                records.append(record)
+                lines.append(dumps(record) + "\n")
+            for name, dtype in _ARRAYS.items():
+                committed = (meta["docs"] if name == "lengths" else meta["postings"]) * np.dtype(dtype).itemsize
+                self._append(f"{name}.bin", committed, np.concatenate(chunks[name]).tobytes())
+            data = "".join(lines).encode("utf-8")
+            self._append("jobs.jsonl", meta["records_bytes"], data)
+            meta = {
+                "dim": self.dim,
+                "docs": meta["docs"] + len(jobs),
+                "postings": meta["postings"] + sum(len(chunk) for chunk in chunks["terms"]),
+                "records_bytes": meta["records_bytes"] + len(data)
+            }
+            # The new meta commits the appended data
+            temporary = f"{self._meta_file()}.{os.getpid()}.tmp"
+            with open(temporary, "w") as handle:
+                json.dump(meta, handle)
+            os.replace(temporary, self._meta_file())
+            self._load(self._records + records)
+        return len(self)
+
+    def _append(self, name: str, committed: int, data: bytes) -> None:
+        """Writes `data` after the first `committed` bytes of a file, dropping anything after them"""
+        file = os.path.join(self.path, name)
+        with open(file, "r+b" if os.path.exists(file) else "wb") as handle:
+            handle.seek(committed)
+            handle.truncate()
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def search(self, resume_profile: Dict[str, Any], k: int = 10) -> List[Dict[str, Any]]:
+        """The `k` jobs that best match a resume profile, best first, as `{"job_id", "job_title", "score"}`"""
+        self._refresh()
+        arrays, records, live, idf, norms = self._arrays, self._records, self._live, self._idf, self._norms
+        query = np.unique(_field_terms(resume_profile, _RESUME_FIELDS, self.dim))
+        if not len(records) or not len(query) or k <= 0:
+            return []
+        lookup = np.zeros(self.dim, dtype=bool)
+        lookup[query] = True
+        matched = lookup[arrays["terms"]]
+        terms, docs, freqs = arrays["terms"][matched], arrays["docs"][matched], arrays["freqs"][matched]
+        weights = idf[terms] * freqs * (K1 + 1) / (freqs + norms[docs])
+        scores = np.bincount(docs, weights=weights, minlength=len(records))
+        scores[~live] = 0
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {"job_id": records[ordinal]["job_id"], "job_title": records[ordinal]["job_title"], "score": round(float(scores[ordinal]), 4)}
+            for ordinal in top if scores[ordinal] > 0
+        ]
+
+    def profile(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The stored profile of a job"""
+        ordinal = self._positions.get(job_id)
+        return None if ordinal is None else self._records[ordinal]["profile"]
+
+
+async def score_matches(scorecard_generator: Any,
+                        index: JobIndex,
+                        resume_profile: Dict[str, Any],
+                        matches: List[Dict[str, Any]],
+                        max_concurrency: int = MATCH_SCORE_CONCURRENCY,
+                        deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Scores a shortlist with the scorecard agent, at most `max_concurrency` calls at a time, best readiness first"""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    resume = dumps(resume_profile)
+
+    async def score(match: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            scorecard = await scorecard_generator.ainvoke(
+                {"resume_profile": resume, "job_description_profile": dumps(index.profile(match["job_id"]))},
+                deadline=deadline
+            )
+        return {**match, "scorecard": scorecard.model_dump()}
+
+    scored = await asyncio.gather(*[score(match) for match in matches])
+    return sorted(scored, key=lambda match: -(match["scorecard"].get("readiness_score") or 0))
@@ -38,9 +38,16 @@ class <Vendor Name>(Enum):
     MaxTokensKey = "The field name for maximum token output (e.g. `max_tokens`)"
     TopPKey = "The field name for Top P results (e.g. `top_p`)"
     RequestTimeoutKey = "The field name for the timeout request limit setting (e.g. `request_timeout` or `default_request_timeout`)"
+    # Shared HTTP connection pool injection (see models/http.py). Use "" when the interface does not support it
+    HTTPClientInjection = "`client` to pass httpx clients, `transport` to pass {'transport': ...} client keyword arguments, or ''"
+    HTTPClientKey = "The field name for the sync HTTP client or its keyword arguments (e.g. `http_client`)"
+    AsyncHTTPClientKey = "The field name for the async HTTP client or its keyword arguments (e.g. `http_async_client`)"
+    # Structured output method passed to `with_structured_output`; prefer the most constrained one the interface supports
+    StructuredOutputMethod = "`json_schema` (schema-constrained decoding), `function_calling` (a forced tool call) or `json_mode` (any JSON)"
 
 To make sure the model_factory sees a vendor it must be added to the `MODEL_VENDORS` list at the end of this file.  
 """
+import os
 from enum import Enum
 
 # -- Vendor Card Template ----------------------------------
@@ -83,6 +90,11 @@ class OpenAI(Enum):
     MaxTokensKey = "max_tokens"
     TopPKey = "top_p"
     RequestTimeoutKey = "request_timeout"
+    HTTPClientInjection = "client"
+    HTTPClientKey = "http_client"
+    AsyncHTTPClientKey = "http_async_client"
+    # Native structured outputs: decoding is constrained to the JSON schema
+    StructuredOutputMethod = "json_schema"
 
 # -- Anthropic ------------------------------------------------
 ANTHROPIC_MODELS = [
@@ -115,6 +127,12 @@ class Anthropic(Enum):
     MaxTokensKey = "max_tokens"
     TopPKey = "top_p"
     RequestTimeoutKey = "default_request_timeout"
+    # ChatAnthropic builds its own (process-wide cached) httpx clients and does not accept injected ones
+    HTTPClientInjection = ""
+    HTTPClientKey = ""
+    AsyncHTTPClientKey = ""
+    # ChatAnthropic always uses a forced tool call for structured output
+    StructuredOutputMethod = "function_calling"
 
 # -- Google ------------------------------------------------
 GOOGLE_MODELS = [
@@ -144,6 +162,11 @@ class Google(Enum):
     MaxTokensKey = "max_output_tokens"
     TopPKey = "top_p"
     RequestTimeoutKey = "timeout"
+    # ChatGoogleGenerativeAI talks to the API through the Google client library, not httpx
+    HTTPClientInjection = ""
+    HTTPClientKey = ""
+    AsyncHTTPClientKey = ""
+    StructuredOutputMethod = "function_calling"
 
 OLLAMA_MODELS = [
     {VendorLookup.ModelIDKey.value: "llama3.1", VendorLookup.ModelDisplayNameKey.value: "Llama 3.1"}
@@ -172,8 +195,49 @@ class Ollama(Enum):
     MaxTokensKey = ""
     TopPKey = "top_p"
     RequestTimeoutKey = "timeout"
+    HTTPClientInjection = "transport"
+    HTTPClientKey = "sync_client_kwargs"
+    AsyncHTTPClientKey = "async_client_kwargs"
+    StructuredOutputMethod = "json_schema"
 
-MODEL_VENDORS = [OpenAI, Anthropic, Google, Ollama]
+# -- Stub ------------------------------------------------
+## Offline model for load tests and local development (see models/stub.py)
+STUB_MODELS = [
+    {VendorLookup.ModelIDKey.value: "stub", VendorLookup.ModelDisplayNameKey.value: "Stub"}
+]
+class Stub(Enum):
+    APIKey = ""
+    VendorID = "stub"
+    DisplayName = "Stub"
+    LangchainPackage = "resume2practice"
+    LangchainModuleName = "resume2practice.models.stub"
+    LangchainInterfaceClass = "StubChatModel"
+    APIKeyNotFoundError = "The stub model does not use an API key."
+    RateLimitError = "Stub rate limit exceeded. Please try again later."
+    AuthenticationError = "Stub authentication failed."
+    APIError = "Stub API error: {error_msg}"
+    TimeoutError = "Stub request timed out. Please try again."
+    Card = {
+        VendorLookup.VendorIDKey.value: VendorID,
+        VendorLookup.VendorDisplayNameKey.value: DisplayName,
+        VendorLookup.ModelsKey.value: STUB_MODELS
+    }
+    ModelNameKey = "model"
+    ModelAPIKey = ""
+    TemperatureKey = "temperature"
+    MaxTokensKey = "max_tokens"
+    TopPKey = "top_p"
+    RequestTimeoutKey = "timeout"
+    HTTPClientInjection = ""
+    HTTPClientKey = ""
+    AsyncHTTPClientKey = ""
+    StructuredOutputMethod = "json_schema"
+
+# The stub vendor is only available when asked for (the bench harness and tests enable it), so a
+# misconfigured deployment cannot serve canned output
+ENABLE_STUB_VENDOR = os.environ.get("ENABLE_STUB_VENDOR", "false").lower() in ("1", "true")
+
+MODEL_VENDORS = [OpenAI, Anthropic, Google, Ollama] + ([Stub] if ENABLE_STUB_VENDOR else [])
 
 AVAILABLE_VENDORS = [
     vendor.Card.value for vendor in MODEL_VENDORS
@@ -4,8 +4,10 @@ Factory module for creating LLM instances based on vendor and model.
 """
 
 import os
+import asyncio
 import importlib
 import logging
+import threading
 from enum import Enum
 from typing import Dict, Any, Optional
 
@@ -15,6 +17,9 @@ from resume2practice.models import MODEL_VENDORS, VendorLookup
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Structured output method used for every vendor instead of the vendor's own `StructuredOutputMethod` when set
+STRUCTURED_OUTPUT_METHOD = os.environ.get("STRUCTURED_OUTPUT_METHOD", "")
+
 class ModelFactory:
     """Factory class for creating language model instances."""
     
@@ -28,6 +33,10 @@ class ModelFactory:
         
         # Cache of instantiated models to avoid recreating them
         self._model_cache = {}
+        
+        # Shared HTTP connection pools, one per vendor, injected into every model of that vendor
+        self._http_pools = {}
+        self._http_pools_lock = threading.Lock()
 
     def get_model(self, 
                  vendor: str, 
@@ -100,9 +109,9 @@ class ModelFactory:
         except (AttributeError, ImportError, ModuleNotFoundError) as ae:
             raise ModelInitializationError(f"Error while importing {vendor.LangchainPackage.value}: {str(ae)}")
         
-        # Get API key
-        api_key = os.getenv(vendor.APIKey.value)
-        if not api_key:
+        # Get API key (vendors without one, such as local models, leave `APIKey` empty)
+        api_key = os.getenv(vendor.APIKey.value) if vendor.APIKey.value != "" else None
+        if vendor.APIKey.value != "" and not api_key:
             raise APIKeyError(vendor.APIKeyNotFoundError.value)
         
          # Extract settings with validation
@@ -127,6 +136,7 @@ class ModelFactory:
             model_config[vendor.ModelAPIKey.value] = api_key
         if vendor.MaxTokensKey.value != "":
             model_config[vendor.MaxTokensKey.value] = max_tokens
+        model_config.update(self._http_client_config(vendor))
         # Create model
         return chat_model(**model_config)
 
@@ -144,6 +154,84 @@ class ModelFactory:
         logger.error(f"Error initializing {vendor.DisplayName.value} model: {str(error)}")
         raise handle_vendor_exception(error, vendor)
     
+    def _get_http_pool(self, vendor: Enum) -> Any:
+        """Returns the vendor's shared HTTP pool, creating it on first use"""
+        with self._http_pools_lock:
+            pool = self._http_pools.get(vendor.VendorID.value)
+            if pool is None:
+                from resume2practice.models.http import VendorHTTPPool
+                pool = VendorHTTPPool(vendor.VendorID.value)
+                self._http_pools[vendor.VendorID.value] = pool
+            return pool
+
+    def _http_client_config(self, vendor: Enum) -> Dict[str, Any]:
+        """
+        Chat model settings that route the vendor SDK through the shared HTTP pool.
+        
+        Args:
+            vendor: The vendor enum
+            
+        Returns:
+            Settings to merge into the model configuration (empty if the vendor does not support injection)
+        """
+        injection = vendor.HTTPClientInjection.value
+        if injection == "":
+            return {}
+        pool = self._get_http_pool(vendor)
+        if injection == "client":
+            return {
+                vendor.HTTPClientKey.value: pool.client,
+                vendor.AsyncHTTPClientKey.value: pool.async_client
+            }
+        # The SDK builds its own clients from keyword arguments; share the pooled transports instead
+        return {
+            vendor.HTTPClientKey.value: {"transport": pool.transport},
+            vendor.AsyncHTTPClientKey.value: {"transport": pool.async_transport}
+        }
+
+    def structured_output_method(self, vendor: str) -> str:
+        """The `with_structured_output` method to use with models of `vendor`"""
+        if STRUCTURED_OUTPUT_METHOD:
+            return STRUCTURED_OUTPUT_METHOD
+        vendor_name = vendor.lower()
+        if vendor_name not in self._vendor_lookup:
+            raise ModelInitializationError(f"Unsupported vendor: {vendor_name}")
+        return self._vendor_lookup[vendor_name].StructuredOutputMethod.value
+
+    def http_pool_stats(self) -> Dict[str, Any]:
+        """Pool utilization and connection reuse counts of each vendor's shared HTTP pool"""
+        with self._http_pools_lock:
+            pools = dict(self._http_pools)
+        return {vendor_id: pool.stats() for vendor_id, pool in pools.items()}
+
+    async def aclose(self) -> None:
+        """Closes the shared HTTP pools"""
+        with self._http_pools_lock:
+            pools, self._http_pools = list(self._http_pools.values()), {}
+        for pool in pools:
+            await pool.aclose()
+
+    async def warmup_connections(self) -> None:
+        """
+        Opens a connection to the vendor of every cached model by sending it a minimal prompt.
+        
+        This costs one tiny completion per model, so it is only used by the opt-in warm-up phase.
+        
+        Raises:
+            ModelInitializationError: If a vendor cannot be reached
+            APIKeyError: If an API key is invalid
+        """
+        async def ping(cache_key: str, model: Any) -> None:
+            vendor = self._vendor_lookup[cache_key.split(":", 1)[0]]
+            try:
+                await model.ainvoke("ping")
+            except Exception as e:
+                self._handle_vendor_error(e, vendor)
+
+        await asyncio.gather(*[
+            ping(cache_key, model) for cache_key, model in list(self._model_cache.items())
+        ])
+
     def clear_cache(self) -> None:
         """Clear the model cache."""
         self._model_cache.clear()
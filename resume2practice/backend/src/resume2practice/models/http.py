@@ -0,0 +1,191 @@
+"""Shared HTTP connection pools for model vendors.
+
+`ModelFactory` owns one `VendorHTTPPool` per vendor and injects it into every chat model it builds for
+that vendor, so all agents using a vendor share the same keep-alive connections instead of each SDK
+client opening its own. The pool lives in the transports; the sync and async `httpx` clients are thin
+wrappers around them. Transports count requests, newly opened connections and requests in flight so
+connection reuse and pool utilization can be reported, through public `httpx` interfaces only.
+"""
+import logging
+import os
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterator
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+HTTP_MAX_CONNECTIONS = int(os.environ.get("VENDOR_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("VENDOR_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("VENDOR_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.environ.get("VENDOR_HTTP_TIMEOUT", "60"))
+HTTP2 = os.environ.get("VENDOR_HTTP2", "false").lower() == "true"
+
+
+class _ConnectionCounter:
+    """Counts requests, the connections opened to serve them and the requests in flight.
+
+    Only public `httpx` interfaces are used: every response names the connection that served it in its
+    `network_stream` extension, and a connection's stream object lives exactly as long as the pool
+    keeps the connection open.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.in_flight = 0
+        self._streams: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def started(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+
+    def connected(self, response: httpx.Response) -> None:
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            return
+        with self._lock:
+            if stream not in self._streams:
+                self._streams.add(stream)
+                self.new_connections += 1
+
+    def finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self, max_connections: int) -> Dict[str, Any]:
+        with self._lock:
+            open_connections = len(self._streams)
+            # An HTTP/1.1 connection serves one request at a time; with HTTP/2 several share one
+            active = min(self.in_flight, open_connections)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.new_connections,
+                "connections_reused": max(0, self.requests - self.new_connections),
+                "open_connections": open_connections,
+                "active_connections": active,
+                "max_connections": max_connections,
+                "utilization": active / max_connections if max_connections else 0.0
+            }
+
+
+class _CountedStream(httpx.SyncByteStream):
+    """Response body that reports to the counter when it is closed"""
+
+    def __init__(self, stream: httpx.SyncByteStream, counter: _ConnectionCounter):
+        self._stream = stream
+        self._counter = counter
+        self._closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._counter.finished()
+
+
+class _CountedAsyncStream(httpx.AsyncByteStream):
+    """Async response body that reports to the counter when it is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, counter: _ConnectionCounter):
+        self._stream = stream
+        self._counter = counter
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._counter.finished()
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counter = _ConnectionCounter()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.counter.started()
+        try:
+            response = super().handle_request(request)
+        except BaseException:
+            self.counter.finished()
+            raise
+        self.counter.connected(response)
+        response.stream = _CountedStream(response.stream, self.counter)
+        return response
+
+
+class InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counter = _ConnectionCounter()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.counter.started()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self.counter.finished()
+            raise
+        self.counter.connected(response)
+        response.stream = _CountedAsyncStream(response.stream, self.counter)
+        return response
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("VENDOR_HTTP2 is set but the `h2` package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+class VendorHTTPPool:
+    """One sync and one async HTTP client (and their connection pools) for a single vendor"""
+
+    def __init__(self,
+                 vendor_id: str,
+                 max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+                 timeout: float = HTTP_TIMEOUT,
+                 http2: bool = HTTP2):
+        self.vendor_id = vendor_id
+        self.max_connections = max_connections
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        http2 = http2 and _http2_available()
+        self.transport = InstrumentedTransport(limits=limits, http2=http2)
+        self.async_transport = InstrumentedAsyncTransport(limits=limits, http2=http2)
+        self.client = httpx.Client(transport=self.transport, timeout=timeout)
+        self.async_client = httpx.AsyncClient(transport=self.async_transport, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sync": self.transport.counter.stats(self.max_connections),
+            "async": self.async_transport.counter.stats(self.max_connections)
+        }
+
+    async def aclose(self) -> None:
+        self.client.close()
+        await self.async_client.aclose()
@@ -0,0 +1,77 @@
+"""Schema descriptions for system prompts, generated from the Pydantic models in `schema.py`.
+
+Prompts describe the JSON object the model must output. Generating that description from the models
+keeps prompts in sync with what is validated, and lets the prompt size be chosen:
+
+- `compact`: one line per model in a TypeScript-like notation, e.g.
+  `ResumeProfile = {name: string, skills: string[]}`. Field names carry the meaning, so descriptions
+  are left out.
+- `verbose`: one line per field with its type and description.
+
+`PROMPT_SCHEMA_STYLE` selects the style used by the role prompts (default `compact`).
+"""
+import os
+import typing
+from typing import Any, List, Type
+
+from pydantic import BaseModel
+
+# Configuration
+PROMPT_SCHEMA_STYLE = os.environ.get("PROMPT_SCHEMA_STYLE", "compact")
+PROMPT_SCHEMA_STYLES = ("compact", "verbose")
+
+_SCALARS = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+
+def _type_name(annotation: Any) -> str:
+    """Short JSON type name of a field annotation"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        suffix = " | null" if len(args) < len(typing.get_args(annotation)) else ""
+        return " | ".join(_type_name(arg) for arg in args) + suffix
+    if origin in (list, List):
+        (item,) = typing.get_args(annotation) or (str,)
+        return f"{_type_name(item)}[]"
+    if origin in (dict, typing.Dict):
+        return "object"
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation.__name__
+    return _SCALARS.get(annotation, "string")
+
+
+def _nested_models(model: Type[BaseModel]) -> List[Type[BaseModel]]:
+    """Models referenced by the fields of `model`, dependencies first"""
+    found: List[Type[BaseModel]] = []
+
+    def visit(annotation: Any) -> None:
+        for arg in typing.get_args(annotation):
+            visit(arg)
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel) and annotation not in found:
+            for field in annotation.model_fields.values():
+                visit(field.annotation)
+            found.append(annotation)
+
+    for field in model.model_fields.values():
+        visit(field.annotation)
+    return found
+
+
+def describe_model(model: Type[BaseModel], style: str = PROMPT_SCHEMA_STYLE) -> str:
+    """Describes the JSON object of `model` (and the models it references) for a prompt"""
+    if style not in PROMPT_SCHEMA_STYLES:
+        raise ValueError(f"Unsupported prompt schema style: {style}")
+    lines = []
+    # The output object first, then the models it references
+    for current in [model] + _nested_models(model):
+        fields = current.model_fields.items()
+        if style == "compact":
+            lines.append(
+                f"{current.__name__} = {{" + ", ".join(f"{name}: {_type_name(field.annotation)}" for name, field in fields) + "}"
+            )
+        else:
+            lines.append(f"{current.__name__}:")
+            for name, field in fields:
+                description = f": {field.description}" if field.description else ""
+                lines.append(f"  - {name} ({_type_name(field.annotation)}){description}")
+    return "\n".join(lines)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, TypedDict, Optional
+from typing import Any, Dict, List, TypedDict, Optional
 
 class ResumeProfile(BaseModel):
   name: str = Field(None, description="Name of the applicant")
@@ -23,7 +23,7 @@ class Scorecard(BaseModel):
   strengths: list[str] = Field(None, description="Strengths of the applicant")
   weaknesses: list[str] = Field(None, description="Weaknesses of the applicant")
   opportunity_for_growth: str = Field(None, description="Opportunity for growth of the applicant")
-  readiness_score: float = Field(None, description="Overall score of the applicant")
+  readiness_score: float = Field(None, description="Overall score of the applicant, between 0.0 and 10.0")
 
 class ScorecardIntake(BaseModel):
   questions: List[str] = Field(None, description="List of questions to ask for further clarification")
@@ -39,9 +39,13 @@ class TaskList(BaseModel):
   tasks: List[Task] = Field(None, description="List of tasks")
 
 class TaskGeneratorState(TypedDict):
+  # Structured results are kept as plain dicts (`model_dump()` of the annotated model) so they
+  # checkpoint and serialize natively without JSON-in-JSON round trips
   resume: str
   job_description: str
-  resume_profile: ResumeProfile
-  job_description_profile: JobDescriptionProfile
-  scorecard: Scorecard
-  task_list: TaskList
\ No newline at end of file
+  intake_questions: List[str]  # Intake questions left to ask after the intake policy
+  additional_context: str  # Answers to the intake questions
+  resume_profile: Dict[str, Any]  # ResumeProfile
+  job_description_profile: Dict[str, Any]  # JobDescriptionProfile
+  scorecard: Dict[str, Any]  # Scorecard
+  task_list: Dict[str, Any]  # TaskList
\ No newline at end of file
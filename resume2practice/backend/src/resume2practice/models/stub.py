@@ -0,0 +1,187 @@
+"""Offline stub chat model for load tests and local development.
+
+`StubChatModel` never calls a vendor. It answers structured-output requests with deterministic JSON
+for the requested schema, derived from the prompt so results can be checked per session:
+
+- string fields `name` and `job_title` are set to the first line of the human message,
+- other string fields are `"<field>: <subject>"`, where the subject is built from the `name` and
+  `job_title` values found in JSON objects inside the human message (or its first line),
+- list fields get two entries and numbers are `5.0`.
+
+For batch prompts, whose human message wraps several documents in `<document index="N">` tags, a
+list field of models gets one entry per document, filled from that document alone.
+
+The vendor is only registered with `ENABLE_STUB_VENDOR=1`; select it with
+`LLM_VENDOR_ID=stub LLM_MODEL_ID=stub`. `STUB_MODEL_LATENCY_MS` adds a simulated
+generation latency to every call. With `STUB_MODEL_MALFORMED_EVERY=N`, every Nth structured response
+is near-valid instead of valid: wrapped in a code fence, with a trailing comma and its first list
+field written as one comma-separated string. This exercises the local repair of structured output.
+"""
+import asyncio
+import itertools
+import json
+import os
+import re
+import time
+import typing
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Type
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableMap, RunnablePassthrough
+from pydantic import BaseModel
+
+_CHUNK_SIZE = 16
+_RESPONSES = itertools.count(1)
+_DOCUMENT = re.compile(r'<document index="\d+">\n?(.*?)\n?</document>', re.DOTALL)
+
+
+def _first_line(text: str) -> str:
+    return next((line.strip() for line in text.splitlines() if line.strip()), "")
+
+
+def _subject(text: str) -> str:
+    """Describes the session a prompt belongs to, from the profiles embedded in it"""
+    decoder = json.JSONDecoder()
+    found: Dict[str, str] = {}
+    index = text.find("{")
+    while index != -1:
+        try:
+            value, end = decoder.raw_decode(text, index)
+        except json.JSONDecodeError:
+            index = text.find("{", index + 1)
+            continue
+        if isinstance(value, dict):
+            for key in ("name", "job_title"):
+                if isinstance(value.get(key), str):
+                    found.setdefault(key, value[key])
+        index = text.find("{", end)
+    if found:
+        return " / ".join(found[key] for key in ("name", "job_title") if key in found)
+    return _first_line(text)
+
+
+def _fill(schema: Type[BaseModel], first_line: str, subject: str) -> Dict[str, Any]:
+    """Builds a deterministic instance of `schema` as a dict"""
+    result: Dict[str, Any] = {}
+    for name, field in schema.model_fields.items():
+        result[name] = _fill_value(name, field.annotation, first_line, subject)
+    return result
+
+
+def _fill_batch(schema: Type[BaseModel], documents: List[str]) -> Dict[str, Any]:
+    """Builds an instance of a batch `schema`, with one entry per document in its list of models"""
+    result = _fill(schema, _first_line(documents[0]), _subject(documents[0]))
+    for name, field in schema.model_fields.items():
+        (item,) = typing.get_args(field.annotation) or (None,)
+        if typing.get_origin(field.annotation) in (list, List) and isinstance(item, type) and issubclass(item, BaseModel):
+            result[name] = [_fill(item, _first_line(document), _subject(document)) for document in documents]
+    return result
+
+
+def _fill_value(name: str, annotation: Any, first_line: str, subject: str) -> Any:
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+        origin = typing.get_origin(annotation)
+    if origin in (list, List):
+        (item,) = typing.get_args(annotation) or (str,)
+        return [_fill_value(f"{name} {i}", item, first_line, subject) for i in (1, 2)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _fill(annotation, first_line, subject)
+    if annotation in (float, int):
+        return annotation(5)
+    if annotation is bool:
+        return True
+    if name in ("name", "job_title"):
+        return first_line
+    return f"{name}: {subject}"
+
+
+def _malformed(result: Dict[str, Any]) -> str:
+    """Near-valid JSON for `result`, as models sometimes produce it"""
+    for name, value in result.items():
+        if isinstance(value, list) and all(isinstance(entry, str) for entry in value):
+            result = dict(result, **{name: ", ".join(value)})
+            break
+    return f"```json\n{json.dumps(result)[:-1]},}}\n```"
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model that returns canned structured output without any network calls"""
+    model: str = "stub"
+    temperature: float = 0.0
+    top_p: float = 1.0
+    max_tokens: int = 4000
+    timeout: Optional[float] = None
+    latency_ms: float = float(os.environ.get("STUB_MODEL_LATENCY_MS", "0"))
+    malformed_every: int = int(os.environ.get("STUB_MODEL_MALFORMED_EVERY", "0"))
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def with_structured_output(self, schema: Any, *, method: str = "json_schema", include_raw: bool = False,
+                               **kwargs: Any) -> Any:
+        # The schema travels to `_generate`/`_stream` as a bound keyword argument
+        llm = self.bind(stub_schema=schema)
+        parser = PydanticOutputParser(pydantic_object=schema)
+        if not include_raw:
+            return llm | parser
+        # Same output shape as the vendor interfaces: {"raw": ..., "parsed": ..., "parsing_error": ...}
+        parse = RunnablePassthrough.assign(parsed=lambda output: parser.invoke(output["raw"]), parsing_error=lambda _: None)
+        fallback = RunnablePassthrough.assign(parsed=lambda _: None)
+        return RunnableMap(raw=llm) | parse.with_fallbacks([fallback], exception_key="parsing_error")
+
+    def _respond(self, messages: List[BaseMessage], stub_schema: Optional[Type[BaseModel]]) -> str:
+        text = messages[-1].content if messages else ""
+        text = text if isinstance(text, str) else json.dumps(text)
+        first_line = _first_line(text)
+        if stub_schema is None:
+            return f"stub response: {first_line}"
+        documents = _DOCUMENT.findall(text)
+        if documents:
+            result = _fill_batch(stub_schema, documents)
+        else:
+            result = _fill(stub_schema, first_line, _subject(text))
+        if self.malformed_every and next(_RESPONSES) % self.malformed_every == 0:
+            return _malformed(result)
+        return json.dumps(result)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, stub_schema: Optional[Type[BaseModel]] = None,
+                  **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        content = self._respond(messages, stub_schema)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, stub_schema: Optional[Type[BaseModel]] = None,
+                         **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        content = self._respond(messages, stub_schema)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, stub_schema: Optional[Type[BaseModel]] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        content = self._respond(messages, stub_schema)
+        chunks = [content[i:i + _CHUNK_SIZE] for i in range(0, len(content), _CHUNK_SIZE)] or [""]
+        for chunk in chunks:
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000 / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, stub_schema: Optional[Type[BaseModel]] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        content = self._respond(messages, stub_schema)
+        chunks = [content[i:i + _CHUNK_SIZE] for i in range(0, len(content), _CHUNK_SIZE)] or [""]
+        for chunk in chunks:
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000 / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
@@ -0,0 +1,282 @@
+"""On-demand profiling of live requests: sampled CPU stacks, event loop lag and memory snapshots.
+
+Everything here is off unless configured, so it can stay in production builds:
+
+- `PROFILING_SAMPLE_RATE` profiles that fraction of `/analyze` and `/resume` requests. A request
+  sent with `X-Profile: <PROFILING_TOKEN>` is always profiled. While a profiled request runs, a
+  background thread samples the stack of every thread every `PROFILING_INTERVAL_MS`
+  (`sys._current_frames()`; the profiled code itself is not instrumented). When it finishes, the
+  samples are written to `PROFILING_DIR` as collapsed stacks (`frame;frame;frame count` per line),
+  which `flamegraph.pl`, speedscope and most flame graph viewers read. The root frame of each stack
+  names the thread: `loop` (the event loop: LangGraph, JSON handling), `worker` (`asyncio.to_thread`
+  work such as pypdf) or the thread's name. An event loop blocked in `select` is waiting on I/O,
+  i.e. on the vendors, and shows up as `(idle)`.
+- An event loop lag monitor measures how late the loop wakes up from a timed sleep. Lag is the time
+  the loop was blocked by synchronous work. `GET /metrics` reports it, and each profile records the
+  worst lag during its request.
+- `GET /debug/memory` starts `tracemalloc` on first use and returns the top allocation sites, with
+  the growth since the previous snapshot. `DELETE /debug/memory` stops it again.
+
+The `/debug` endpoints need `Authorization: Bearer <PROFILING_TOKEN>` and answer 404 while no token
+is configured. Profiles are sampled whole-process, so they include the work of requests running
+concurrently with the profiled one.
+"""
+import asyncio
+import collections
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN") or None
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_INTERVAL_MS = float(os.environ.get("PROFILING_INTERVAL_MS", "5"))
+PROFILING_DIR = os.environ.get("PROFILING_DIR", "profiles")
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", "200"))
+# How often the event loop lag monitor wakes up
+LOOP_LAG_INTERVAL_MS = float(os.environ.get("LOOP_LAG_INTERVAL_MS", "100"))
+PROFILED_PATHS = ("/analyze", "/resume", "/resume/stream")
+PROFILING_ENABLED = PROFILING_TOKEN is not None or PROFILING_SAMPLE_RATE > 0
+
+# Frames the event loop sits in while it waits for I/O, and idle threads while they wait for work
+_IDLE_FRAMES = frozenset(("select", "poll", "epoll", "kqueue", "control"))
+_WAITING_FRAMES = frozenset((
+    "threading:wait", "threading:_wait_for_tstate_lock", "queue:get", "concurrent.futures.thread:_worker"
+))
+
+
+def authorized(header: Optional[str]) -> bool:
+    """Whether an `Authorization` header carries the profiling token"""
+    if PROFILING_TOKEN is None or not header or not header.startswith("Bearer "):
+        return False
+    return hmac.compare_digest(header[len("Bearer "):].encode(), PROFILING_TOKEN.encode())
+
+
+class Profile:
+    """Stack samples and loop lag collected while one request ran"""
+
+    def __init__(self, path: str):
+        self.id = uuid4().hex[:12]
+        self.path = path
+        self.started = time.time()
+        self.duration = 0.0
+        self.samples = 0
+        self.max_loop_lag = 0.0
+        self.stacks: Dict[str, int] = collections.Counter()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "path": self.path,
+            "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "duration_ms": round(self.duration * 1000, 1),
+            "samples": self.samples,
+            "max_loop_lag_ms": round(self.max_loop_lag * 1000, 1)
+        }
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads while at least one profile is active"""
+
+    def __init__(self, interval_ms: float = PROFILING_INTERVAL_MS, directory: str = PROFILING_DIR,
+                 max_files: int = PROFILING_MAX_FILES):
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self.max_files = max_files
+        self._active: List[Profile] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+        self._names: Dict[Any, str] = {}
+        self.recent: Deque[Dict[str, Any]] = collections.deque(maxlen=max_files)
+
+    def start(self, path: str) -> Profile:
+        profile = Profile(path)
+        with self._lock:
+            if self._loop_thread_id is None:
+                self._loop_thread_id = threading.get_ident()
+            self._active.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: Profile) -> None:
+        profile.duration = time.time() - profile.started
+        with self._lock:
+            self._active.remove(profile)
+
+    def _frame_name(self, code: Any, module: str) -> str:
+        # Frame names are cached per code object, which keeps a sample to a few dictionary lookups
+        name = self._names.get(code)
+        if name is None:
+            name = self._names[code] = f"{module}:{code.co_name}"
+        return name
+
+    def _fold(self, thread_id: int, frame: Any, names: Dict[int, str]) -> Optional[str]:
+        """The collapsed stack of a thread, or None for a thread that waits for work"""
+        stack = []
+        idle = frame.f_code.co_name in _IDLE_FRAMES
+        if thread_id != self._loop_thread_id and self._frame_name(frame.f_code, frame.f_globals.get("__name__", "?")) in _WAITING_FRAMES:
+            return None
+        while frame is not None:
+            stack.append(self._frame_name(frame.f_code, frame.f_globals.get("__name__", "?")))
+            frame = frame.f_back
+        if thread_id == self._loop_thread_id:
+            root = "loop"
+        else:
+            name = names.get(thread_id, "thread")
+            root = "worker" if name.startswith("asyncio_") else name
+        stack.append(root)
+        if idle and root == "loop":
+            return "loop;(idle)"
+        return ";".join(reversed(stack))
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active)
+                if not active:
+                    self._thread = None
+                    return
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = [
+                stack for thread_id, frame in sys._current_frames().items()
+                if thread_id != own and (stack := self._fold(thread_id, frame, names)) is not None
+            ]
+            for profile in active:
+                profile.samples += 1
+                for stack in stacks:
+                    profile.stacks[stack] += 1
+
+    def write(self, profile: Profile) -> str:
+        """Writes a profile's collapsed stacks and returns the file name; old files beyond `max_files` are removed"""
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.fromtimestamp(profile.started, timezone.utc).strftime("%Y%m%dT%H%M%S")
+        name = f"{stamp}-{profile.path.strip('/').replace('/', '_')}-{profile.id}.collapsed"
+        with open(os.path.join(self.directory, name), "w") as handle:
+            handle.writelines(f"{stack} {count}\n" for stack, count in profile.stacks.items())
+        self.recent.append({**profile.summary(), "file": name})
+        files = sorted(entry for entry in os.listdir(self.directory) if entry.endswith(".collapsed"))
+        for old in files[:max(0, len(files) - self.max_files)]:
+            os.remove(os.path.join(self.directory, old))
+        return name
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a timed sleep"""
+
+    def __init__(self, profiler: SamplingProfiler, interval_ms: float = LOOP_LAG_INTERVAL_MS):
+        self.profiler = profiler
+        self.interval = interval_ms / 1000
+        self._lags: Deque[float] = collections.deque(maxlen=600)
+        self._max = 0.0
+
+    async def run(self) -> None:
+        while True:
+            # Wake up more often while a request is profiled, to attach finer lag measurements
+            interval = min(self.interval, self.profiler.interval * 4) if self.profiler._active else self.interval
+            start = time.monotonic()
+            await asyncio.sleep(interval)
+            lag = max(0.0, time.monotonic() - start - interval)
+            self._lags.append(lag)
+            self._max = max(self._max, lag)
+            for profile in list(self.profiler._active):
+                profile.max_loop_lag = max(profile.max_loop_lag, lag)
+
+    def stats(self) -> Dict[str, float]:
+        """Lag over the last samples (about a minute at the default interval) and the worst seen"""
+        lags = sorted(self._lags)
+        if not lags:
+            return {"samples": 0}
+        return {
+            "samples": len(lags),
+            "p50_ms": round(lags[len(lags) // 2] * 1000, 2),
+            "p99_ms": round(lags[min(len(lags) - 1, int(0.99 * len(lags)))] * 1000, 2),
+            "max_ms": round(self._max * 1000, 2)
+        }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles a sample of requests to `PROFILED_PATHS`"""
+
+    def __init__(self, app: Any, profiler: SamplingProfiler, sample_rate: float = PROFILING_SAMPLE_RATE):
+        self.app = app
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+
+    def _sampled(self, scope: Dict[str, Any]) -> bool:
+        if scope["type"] != "http" or scope["path"] not in PROFILED_PATHS:
+            return False
+        if PROFILING_TOKEN is not None:
+            for name, value in scope["headers"]:
+                if name == b"x-profile" and hmac.compare_digest(value, PROFILING_TOKEN.encode()):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if not self._sampled(scope):
+            await self.app(scope, receive, send)
+            return
+        profile = self.profiler.start(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.stop(profile)
+            try:
+                name = await asyncio.to_thread(self.profiler.write, profile)
+                logger.info(f"Profiled {scope['path']} in {profile.duration * 1000:.0f}ms: {name}")
+            except OSError as ex:
+                logger.error(f"Could not write the profile of {scope['path']}: {str(ex)}")
+
+
+class MemorySnapshots:
+    """`tracemalloc` snapshots on demand, compared with the previous one"""
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._previous = None
+            return {"tracing": True, "started": True, "detail": "Tracing started; request again for a snapshot"}
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        result = {
+            "tracing": True,
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "top": [
+                {"location": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:top]
+            ]
+        }
+        if self._previous is not None:
+            result["growth"] = [
+                {"location": str(stat.traceback), "size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+                for stat in snapshot.compare_to(self._previous, "lineno")[:top]
+            ]
+        self._previous = snapshot
+        return result
+
+    def stop(self) -> Dict[str, Any]:
+        tracemalloc.stop()
+        self._previous = None
+        return {"tracing": False}
@@ -0,0 +1,193 @@
+"""Persistent store of finished sessions: scorecards and task lists, retrievable by `thread_id`.
+
+The checkpointer keeps a session's final state only as long as its thread lives, and the frontend
+keeps results in its session store, so neither is a record to come back to. When a run finishes
+(`/resume`, `/resume/stream`, `/fork`) its result is also written here, outside of the graph, as one
+JSON document per thread in a SQLite database shared by all workers.
+
+- `GET /results/{thread_id}` returns the stored document with an `ETag` (a digest of the document).
+  A request with a matching `If-None-Match` gets 304 without a body.
+- `GET /results` exports documents as newline-delimited JSON, oldest first, filtered by `job_id` and
+  by creation date (`since` / `until`, UTC dates, inclusive). Pages hold `limit` documents; the
+  response carries `X-Next-Cursor` while there are more, to be sent back as `cursor`.
+
+Each result has a `job_id`: the one sent to `/analyze`, the one of the session a fork was made from,
+or else the digest of the job description, so sessions against the same posting share it. Rows are
+indexed by `job_id` and by creation time, and pages are read by keyset, so an export costs the same
+per page however far it has got.
+"""
+import base64
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional, Tuple
+
+from resume2practice.agent.state import input_digest, is_released
+from resume2practice.serialization import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+RESULT_STORE_PATH = os.environ.get("RESULT_STORE_PATH", "results.sqlite3")
+RESULT_EXPORT_MAX_LIMIT = int(os.environ.get("RESULT_EXPORT_MAX_LIMIT", "1000"))
+
+# State keys kept in a stored result
+_RESULT_KEYS = ("resume_profile", "job_description_profile", "scorecard", "task_list")
+
+
+def job_key(job_description: Optional[str]) -> Optional[str]:
+    """The default `job_id` of a session: the digest of its job description (already one when released)"""
+    if not job_description:
+        return None
+    return job_description if is_released(job_description) else input_digest(job_description)
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Whether an `If-None-Match` header matches `etag` (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def encode_cursor(created_at: float, thread_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at!r}:{thread_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Raises ValueError for a cursor this store did not produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, thread_id = raw.split(":", 1)
+        return float(created_at), thread_id
+    except (ValueError, UnicodeDecodeError) as ex:
+        raise ValueError(f"Invalid cursor: {cursor}") from ex
+
+
+class ResultStore:
+    """SQLite-backed store of finished results, shared by all worker processes on a host"""
+
+    def __init__(self, path: str = RESULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        connection = self._connection()
+        # A row without a body only records the job a running session belongs to
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " thread_id TEXT PRIMARY KEY,"
+            " job_id TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " etag TEXT,"
+            " body BLOB)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS results_job ON results (job_id, created_at, thread_id)")
+        connection.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created_at, thread_id)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection, opening it on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def assign_job(self, thread_id: str, job_id: str) -> None:
+        """Records the `job_id` a session belongs to, before it has a result"""
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO results (thread_id, job_id, created_at, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (thread_id) DO UPDATE SET job_id = excluded.job_id",
+            (thread_id, job_id, now, now)
+        )
+
+    def save(self, thread_id: str, state: Dict[str, Any], source_thread_id: Optional[str] = None) -> str:
+        """Stores the result in a finished run's state and returns its ETag"""
+        connection = self._connection()
+        known = dict(connection.execute(
+            "SELECT thread_id, job_id FROM results WHERE thread_id IN (?, ?)", (thread_id, source_thread_id or thread_id)
+        ).fetchall())
+        job_id = known.get(thread_id) or known.get(source_thread_id) or job_key(state.get("job_description"))
+        existing = connection.execute(
+            "SELECT created_at FROM results WHERE thread_id = ? AND body IS NOT NULL", (thread_id,)
+        ).fetchone()
+        now = time.time()
+        created_at = existing[0] if existing else now
+        document = {
+            "thread_id": thread_id,
+            "job_id": job_id,
+            "created_at": datetime.fromtimestamp(created_at, timezone.utc).isoformat(),
+            **{key: state.get(key) for key in _RESULT_KEYS}
+        }
+        if source_thread_id is not None:
+            document["source_thread_id"] = source_thread_id
+        body = dumps_bytes(document)
+        etag = _etag(body)
+        connection.execute(
+            "INSERT OR REPLACE INTO results (thread_id, job_id, created_at, updated_at, etag, body) VALUES (?, ?, ?, ?, ?, ?)",
+            (thread_id, job_id, created_at, now, etag, body)
+        )
+        return etag
+
+    def get(self, thread_id: str) -> Optional[Tuple[bytes, str, float]]:
+        """The stored document of a thread as `(body, etag, updated_at)`, or None"""
+        row = self._connection().execute(
+            "SELECT body, etag, updated_at FROM results WHERE thread_id = ? AND body IS NOT NULL", (thread_id,)
+        ).fetchone()
+        return None if row is None else (bytes(row[0]), row[1], row[2])
+
+    def export(self,
+               job_id: Optional[str] = None,
+               since: Optional[date] = None,
+               until: Optional[date] = None,
+               limit: int = 100,
+               cursor: Optional[str] = None) -> Tuple[List[bytes], Optional[str]]:
+        """A page of stored documents, oldest first, and the cursor of the next page (None on the last)"""
+        limit = max(1, min(limit, RESULT_EXPORT_MAX_LIMIT))
+        clauses, parameters = ["body IS NOT NULL"], []
+        if job_id is not None:
+            clauses.append("job_id = ?")
+            parameters.append(job_id)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            parameters.append(_timestamp(since))
+        if until is not None:
+            clauses.append("created_at < ?")
+            parameters.append(_timestamp(until + timedelta(days=1)))
+        if cursor is not None:
+            clauses.append("(created_at, thread_id) > (?, ?)")
+            parameters.extend(decode_cursor(cursor))
+        rows = self._connection().execute(
+            f"SELECT body, created_at, thread_id FROM results WHERE {' AND '.join(clauses)}"
+            " ORDER BY created_at, thread_id LIMIT ?",
+            (*parameters, limit + 1)
+        ).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1][1], rows[limit - 1][2]) if len(rows) > limit else None
+        return [bytes(row[0]) for row in rows[:limit]], next_cursor
+
+    def stats(self) -> Dict[str, Any]:
+        results, stored_bytes = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM results WHERE body IS NOT NULL"
+        ).fetchone()
+        return {"path": self.path, "results": results, "bytes": stored_bytes}
+
+
+def _timestamp(day: date) -> float:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()
+
+
+def http_date(timestamp: float) -> str:
+    """A timestamp as an HTTP date, for `Last-Modified`"""
+    return formatdate(timestamp, usegmt=True)
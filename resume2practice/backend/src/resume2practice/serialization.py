@@ -0,0 +1,34 @@
+"""JSON encoding helpers.
+
+Payloads are kept as native dicts and lists everywhere inside the service and are serialized exactly
+once, at the edge (HTTP responses, stream events, prompts). `orjson` is used when it is installed and
+the standard library `json` module otherwise.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serializes `obj` to compact UTF-8 encoded JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """Serializes `obj` to a compact JSON string"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: str | bytes) -> Any:
+    """Parses a JSON document"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
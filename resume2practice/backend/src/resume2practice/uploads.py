@@ -0,0 +1,195 @@
+"""Streaming PDF uploads with early validation and a size limit.
+
+`POST /uploads` takes a PDF as the raw request body (chunked or with a `Content-Length`) and writes it
+to `UPLOAD_DIR` as it arrives, so a worker holds one chunk of it in memory at a time whatever the file
+size. The upload is rejected as soon as the problem is known:
+
+- a declared `Content-Length` above `UPLOAD_MAX_BYTES` before any of the body is read (413),
+- a body that does not start with the PDF signature after its first bytes (415),
+- a body that grows past `UPLOAD_MAX_BYTES` while streaming (413).
+
+The SHA-256 digest is computed while the bytes flow and is the upload's id, so the same document
+uploaded twice is stored once. `/analyze` then takes `resume_upload_id` / `job_description_upload_id`
+instead of the file. Uploads are deleted after `UPLOAD_TTL_SECONDS`.
+
+`UploadLimitMiddleware` applies the same limit to multipart `/analyze` requests, whose body is otherwise
+parsed in full before the handler runs: by `Content-Length` when there is one, else while the chunked
+body is received.
+"""
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, Optional
+from uuid import uuid4
+
+from starlette.exceptions import HTTPException
+
+from resume2practice.serialization import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads")
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_TTL_SECONDS = float(os.environ.get("UPLOAD_TTL_SECONDS", "3600"))
+
+PDF_SIGNATURE = b"%PDF-"
+_UPLOAD_ID = re.compile(r"[0-9a-f]{64}")
+# Expired uploads are looked for at most this often
+_PRUNE_INTERVAL_SECONDS = 60.0
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds `UPLOAD_MAX_BYTES`"""
+    pass
+
+
+class UnsupportedUpload(ValueError):
+    """Raised when an upload is not a PDF document"""
+    pass
+
+
+def check_pdf_signature(head: bytes) -> None:
+    """Raises `UnsupportedUpload` unless `head` (the first bytes of a file) is the start of a PDF"""
+    if not head.startswith(PDF_SIGNATURE):
+        raise UnsupportedUpload("Only PDF documents are accepted")
+
+
+def check_pdf_file(file: BinaryIO, max_bytes: int = UPLOAD_MAX_BYTES) -> None:
+    """Checks the signature and size of an uploaded file object without reading it into memory"""
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    if size > max_bytes:
+        raise UploadTooLarge(f"Uploads are limited to {max_bytes} bytes")
+    check_pdf_signature(file.read(len(PDF_SIGNATURE)))
+    file.seek(0)
+
+
+class UploadStore:
+    """Content-addressed directory of uploaded PDF documents"""
+
+    def __init__(self, directory: str = UPLOAD_DIR, max_bytes: int = UPLOAD_MAX_BYTES, ttl_seconds: float = UPLOAD_TTL_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._pruned = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    async def save(self, chunks: AsyncIterator[bytes], declared_length: Optional[int] = None) -> Dict[str, Any]:
+        """Streams an upload to disk and returns its `upload_id` (SHA-256 digest) and size"""
+        if declared_length is not None and declared_length > self.max_bytes:
+            raise UploadTooLarge(f"Uploads are limited to {self.max_bytes} bytes")
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        temporary = os.path.join(self.directory, f".{uuid4().hex}.part")
+        try:
+            with open(temporary, "wb") as handle:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLarge(f"Uploads are limited to {self.max_bytes} bytes")
+                    if len(head) < len(PDF_SIGNATURE):
+                        head += chunk[:len(PDF_SIGNATURE)]
+                        if len(head) >= len(PDF_SIGNATURE):
+                            check_pdf_signature(head)
+                    digest.update(chunk)
+                    handle.write(chunk)
+            if size == 0:
+                raise UnsupportedUpload("The upload is empty")
+            check_pdf_signature(head)
+            upload_id = digest.hexdigest()
+            os.replace(temporary, os.path.join(self.directory, upload_id))
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self._prune()
+        return {"upload_id": upload_id, "bytes": size}
+
+    def path(self, upload_id: str) -> Optional[str]:
+        """The file of an upload, or None if the id is unknown or has expired"""
+        if not _UPLOAD_ID.fullmatch(upload_id or ""):
+            return None
+        path = os.path.join(self.directory, upload_id)
+        return path if os.path.isfile(path) else None
+
+    def _prune(self) -> None:
+        """Deletes uploads older than `ttl_seconds`"""
+        now = time.time()
+        if now - self._pruned < _PRUNE_INTERVAL_SECONDS:
+            return
+        self._pruned = now
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > self.ttl_seconds:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # Deleted by another worker meanwhile
+                pass
+
+
+class RequestBodyTooLarge(HTTPException):
+    """Raised while a request body is read once it has grown past the limit"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Request bodies are limited to {max_bytes} bytes")
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware that rejects requests to `paths` whose body is larger than `max_bytes`.
+
+    A declared `Content-Length` is checked before the body is read. Chunked bodies, which have none,
+    are counted as they are received, and reading them fails with 413 once they pass the limit.
+    """
+
+    def __init__(self, app: Any, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = frozenset(paths)
+
+    async def _reject(self, send: Any) -> None:
+        body = dumps_bytes({"detail": f"Request bodies are limited to {self.max_bytes} bytes"})
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            await self._reject(send)
+            return
+        received = 0
+        started = False
+
+        async def limited_receive() -> Dict[str, Any]:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise RequestBodyTooLarge(self.max_bytes)
+            return message
+
+        async def tracked_send(message: Dict[str, Any]) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except RequestBodyTooLarge:
+            # Raised outside of a route's exception handling, e.g. while the body was streamed
+            if not started:
+                await self._reject(send)
@@ -0,0 +1,21 @@
+"""Shared fixtures: workflows built on the offline stub model, so no test calls a vendor."""
+import os
+
+# Read when the model registry and the stub model are imported
+os.environ["ENABLE_STUB_VENDOR"] = "1"
+os.environ.setdefault("STUB_MODEL_LATENCY_MS", "5")
+
+import pytest
+
+from resume2practice.bench import stub_workflow as build_stub_workflow
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def stub_workflow():
+    """Builds a `Resume2Practice` on the stub model; keyword arguments go to its constructor"""
+    return build_stub_workflow
@@ -0,0 +1,51 @@
+"""Admin endpoints answer 404 unless the request carries the configured admin token."""
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+TOKEN = "admin-test-token"
+
+
+@pytest.fixture(scope="module")
+def api():
+    with tempfile.TemporaryDirectory() as directory:
+        # Read when the modules are first imported
+        os.environ.update(
+            LLM_VENDOR_ID="stub",
+            LLM_MODEL_ID="stub",
+            RESULT_STORE_PATH=os.path.join(directory, "results.sqlite3"),
+            UPLOAD_DIR=os.path.join(directory, "uploads"),
+            JOB_INDEX_PATH=os.path.join(directory, "job_index")
+        )
+        from resume2practice import app as app_module
+        with TestClient(app_module.app) as client:
+            yield app_module, client
+
+
+@pytest.mark.parametrize("configured, header, expected", [
+    (None, f"Bearer {TOKEN}", 404),
+    (TOKEN, None, 404),
+    (TOKEN, "Bearer wrong", 404),
+    (TOKEN, f"Bearer {TOKEN}", 200)
+])
+def test_result_export_needs_the_admin_token(api, monkeypatch, configured, header, expected):
+    app_module, client = api
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", configured)
+    headers = {"Authorization": header} if header else {}
+    assert client.get("/results", headers=headers).status_code == expected
+
+
+def test_adding_jobs_needs_the_admin_token(api, monkeypatch):
+    app_module, client = api
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", TOKEN)
+    jobs = {"jobs": [{"job_id": "platform-1", "job_description": "Staff Engineer\nOwn the payments platform."}]}
+    assert client.post("/jobs", json=jobs).status_code == 404
+
+    admitted = app_module.app.state.admission.stats()["admitted"]["batch"]
+    response = client.post("/jobs", json=jobs, headers={"Authorization": f"Bearer {TOKEN}"})
+    assert response.status_code == 200
+    assert response.json()["added"] == 1
+    # Profiling the text ran as batch work under admission control
+    assert app_module.app.state.admission.stats()["admitted"]["batch"] == admitted + 1
@@ -0,0 +1,55 @@
+"""Admission control sheds or displaces each request at most once."""
+import asyncio
+
+import pytest
+
+from resume2practice.admission import AdmissionController, Overloaded, Priority
+
+
+async def fill(controller: AdmissionController, priority: Priority, count: int) -> list:
+    """Queues `count` waiters of `priority` behind the busy slots"""
+    waiters = [asyncio.create_task(controller.acquire(priority)) for _ in range(count)]
+    await asyncio.sleep(0)
+    return waiters
+
+
+@pytest.mark.anyio
+async def test_pre_check_does_not_displace_waiters():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, wait_slo_seconds=1000)
+    await controller.acquire(Priority.NEW)
+    waiters = await fill(controller, Priority.BATCH, 2)
+
+    # The queue is full but holds lower priority work, so the request would not be shed
+    assert controller.would_shed(Priority.INTERACTIVE) is None
+    controller.check(Priority.INTERACTIVE)
+    assert not any(waiter.done() for waiter in waiters)
+    assert controller.stats()["shed"]["batch"] == 0
+
+    # Queuing displaces exactly one waiter, the newest of the lowest priority
+    acquired = asyncio.create_task(controller.acquire(Priority.INTERACTIVE))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert [waiter.done() for waiter in waiters] == [False, True]
+    with pytest.raises(Overloaded):
+        waiters[1].result()
+    assert controller.stats()["shed"] == {"interactive": 0, "new": 0, "batch": 1}
+
+    for task in (acquired, waiters[0]):
+        controller.release()
+        await task
+    assert controller.stats()["queued"] == {"interactive": 0, "new": 0, "batch": 0}
+
+
+@pytest.mark.anyio
+async def test_shed_request_is_counted_once():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, wait_slo_seconds=1000)
+    await controller.acquire(Priority.NEW)
+    waiters = await fill(controller, Priority.INTERACTIVE, 1)
+
+    assert isinstance(controller.would_shed(Priority.BATCH), Overloaded)
+    assert controller.stats()["shed"]["batch"] == 0
+    with pytest.raises(Overloaded):
+        await controller.acquire(Priority.BATCH)
+    assert controller.stats()["shed"]["batch"] == 1
+    assert not waiters[0].done()
+    waiters[0].cancel()
@@ -0,0 +1,51 @@
+"""Checkpoints stay readable: the compression dictionaries never change, and old codecs still decode."""
+import base64
+import hashlib
+import json
+import os
+
+import pytest
+
+from resume2practice.agent.checkpoint import _DICTIONARIES, _DICTIONARY_VERSION, CompressedSerializer
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# A checkpoint written with a dictionary can only be read with the same bytes. Never update these
+# digests: add a dictionary version instead.
+DICTIONARY_SHA256 = {
+    1: "afd85989e1002c71792228d35fd08c9687da54d204a368a6fb9493e6fc4927cf",
+    2: "2cdbca3fc6debc371b96a3b97fa4314aa6c73f8f126a647fa9e82348a0a3ca8e"
+}
+
+
+def load_fixture(name: str) -> dict:
+    with open(os.path.join(FIXTURES, name)) as handle:
+        return json.load(handle)
+
+
+def test_dictionaries_are_frozen():
+    assert {version: hashlib.sha256(dictionary).hexdigest() for version, dictionary in _DICTIONARIES.items()} == DICTIONARY_SHA256
+
+
+@pytest.mark.parametrize("compression", ["zstd", "zlib"])
+def test_version_1_checkpoints_still_decode(compression):
+    """`checkpoint_v1.json` holds a value as written by the first release of the compressed serializer"""
+    fixture = load_fixture("checkpoint_v1.json")
+    stored = fixture[compression]
+    assert stored["type"] == f"msgpack+{compression}1"
+    value = CompressedSerializer().loads_typed((stored["type"], base64.b64decode(stored["data"])))
+    assert value == fixture["value"]
+
+
+@pytest.mark.parametrize("compression", ["zstd", "zlib"])
+def test_values_are_written_with_the_latest_dictionary(compression):
+    value = load_fixture("checkpoint_v1.json")["value"]
+    serde = CompressedSerializer(compression)
+    type_, data = serde.dumps_typed(value)
+    assert type_ == f"msgpack+{compression}{_DICTIONARY_VERSION}"
+    assert serde.loads_typed((type_, data)) == value
+
+
+def test_unknown_dictionary_version_is_rejected():
+    with pytest.raises(ValueError):
+        CompressedSerializer().loads_typed(("msgpack+zstd99", b""))
@@ -0,0 +1,64 @@
+"""Every language model step runs exactly once per session, and forks rerun only what follows them."""
+import asyncio
+from typing import Any, Dict
+from uuid import uuid4
+
+import pytest
+
+from resume2practice.agent.graphs import LLM_NODES
+from resume2practice.agent.intake import IntakePolicy
+from resume2practice.bench.nodes import llm_calls, session
+
+SESSIONS = 6
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("slim_state", [False, True])
+@pytest.mark.parametrize("max_questions", [5, 0])
+async def test_each_step_runs_once_per_session(stub_workflow, slim_state, max_questions):
+    workflow = stub_workflow(slim_state=slim_state, intake_policy=IntakePolicy(max_questions=max_questions))
+    await asyncio.gather(*[session(workflow, index) for index in range(SESSIONS)])
+
+    assert workflow.node_stats() == {node: SESSIONS for node in LLM_NODES}
+    assert sum(llm_calls(workflow).values()) == len(LLM_NODES) * SESSIONS
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("node, expected", [
+    ("scorecard_generator", {"scorecard_generator": 1, "task_generator": 1}),
+    ("task_generator", {"task_generator": 1})
+])
+async def test_fork_reruns_only_the_steps_from_the_fork_point(stub_workflow, node, expected):
+    workflow = stub_workflow()
+    sources = await asyncio.gather(*[session(workflow, index) for index in range(SESSIONS)])
+    runs, calls = workflow.node_stats(), sum(llm_calls(workflow).values())
+
+    async def fork(source: Dict[str, Any]) -> None:
+        config = {"configurable": {"thread_id": str(uuid4())}}
+        await workflow.afork(source, config, node)
+        state = await workflow.ainvoke(context=None, config=config)
+        assert state["task_list"] is not None
+
+    await asyncio.gather(*[fork(source) for source in sources])
+    forked = {step: count - runs[step] for step, count in workflow.node_stats().items()}
+    assert forked == {step: expected.get(step, 0) * SESSIONS for step in LLM_NODES}
+    assert sum(llm_calls(workflow).values()) - calls == sum(expected.values()) * SESSIONS
+
+
+@pytest.mark.anyio
+async def test_closing_the_task_stream_awaits_the_cancelled_generations():
+    from resume2practice.agent.nodes import TaskGenerator
+
+    generator = TaskGenerator(vendor="stub", model_id="stub", parallel=True, max_concurrency=1)
+    context = {
+        "job_description_profile": "Role 0000\nBuild systems.",
+        "scorecard": {"weaknesses": [f"Gap {index}" for index in range(4)]}
+    }
+    stream = generator.astream_tasks(context)
+    await stream.__anext__()
+    generations = [
+        task for task in asyncio.all_tasks() if task.get_coro().__qualname__.endswith("_agenerate_per_gap.<locals>.generate")
+    ]
+    assert generations
+    await stream.aclose()
+    assert all(task.done() for task in generations)
@@ -0,0 +1,75 @@
+"""Interleaved sessions on one workflow instance stay isolated from each other.
+
+Every session's inputs name it (`Candidate 0007` / `Role 0007`) and the stub model echoes those names
+into every generated field, so a session that read another session's checkpoint, or a run that
+interleaved with another run on the same thread, shows up as a mismatch.
+"""
+import asyncio
+import random
+from typing import Any, Dict, List
+from uuid import uuid4
+
+import pytest
+from langgraph.types import Command
+
+SESSIONS = 40
+MAX_CONCURRENT_RUNS = 8
+
+
+async def stream_resume(workflow: Any, command: Command, config: Dict[str, Any]) -> Dict[str, Any]:
+    state: Dict[str, Any] = {}
+    async for mode, chunk in workflow.astream(context=command, config=config):
+        if mode == "values":
+            state = chunk
+    return state
+
+
+async def run_session(workflow: Any, index: int) -> List[Dict[str, Any]]:
+    name, role = f"Candidate {index:04d}", f"Role {index:04d}"
+    config = {"configurable": {"thread_id": str(uuid4())}}
+    response = await workflow.ainvoke(
+        context={"resume": f"{name}\nExperienced engineer.", "job_description": f"{role}\nBuild systems."},
+        config=config
+    )
+    for question in response["__interrupt__"][0].value["questions"]:
+        assert f"{name} / {role}" in question
+    await asyncio.sleep(random.uniform(0, 0.02))
+
+    command = Command(resume=f"Answers from {name}")
+    if index % 2:
+        states = [await stream_resume(workflow, command, config)]
+    elif index % 10 == 0:
+        # Duplicate resume: the second run waits for the first and then finds the thread complete
+        states = list(await asyncio.gather(
+            workflow.ainvoke(context=command, config=config),
+            workflow.ainvoke(context=command, config=config)
+        ))
+    else:
+        states = [await workflow.ainvoke(context=command, config=config)]
+    for state in states:
+        assert f"{name} / {role}" in state["scorecard"]["gap_analysis"]
+        for task in state["task_list"]["tasks"]:
+            assert role in task["task_summary"]
+
+    snapshot = await workflow.graph.aget_state(config)
+    assert name in snapshot.values["resume"]
+    return states
+
+
+@pytest.mark.anyio
+async def test_interleaved_sessions_stay_isolated(stub_workflow):
+    workflow = stub_workflow(max_concurrent_runs=MAX_CONCURRENT_RUNS)
+    await asyncio.gather(*[run_session(workflow, index) for index in range(SESSIONS)])
+
+    stats = workflow.run_stats()
+    assert 1 < stats["peak"] <= MAX_CONCURRENT_RUNS
+    assert stats["active"] == 0
+
+
+@pytest.mark.anyio
+async def test_unbounded_workflow_only_serializes_runs_per_thread(stub_workflow):
+    workflow = stub_workflow(max_concurrent_runs=None)
+    await asyncio.gather(*[run_session(workflow, index) for index in range(10)])
+
+    assert workflow.run_stats()["max"] is None
+    assert workflow.run_stats()["peak"] > 1
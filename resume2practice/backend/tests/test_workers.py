@@ -0,0 +1,40 @@
+"""A session analyzed on one backend worker resumes on another through the shared SQLite checkpoints."""
+import socket
+
+import httpx
+import pytest
+
+from resume2practice.bench.workers import run_session, start_workers, wait_ready
+
+
+def free_port_pair() -> int:
+    """A port such that it and the next one are free"""
+    while True:
+        with socket.socket() as first:
+            first.bind(("127.0.0.1", 0))
+            port = first.getsockname()[1]
+            with socket.socket() as second:
+                try:
+                    second.bind(("127.0.0.1", port + 1))
+                except OSError:
+                    continue
+                return port
+
+
+@pytest.mark.anyio
+async def test_session_resumes_on_another_worker(tmp_path):
+    port = free_port_pair()
+    urls = [f"http://127.0.0.1:{port}", f"http://127.0.0.1:{port + 1}"]
+    processes = start_workers(2, str(tmp_path), "0", base_port=port)
+    try:
+        async with httpx.AsyncClient(timeout=60) as client:
+            await wait_ready(client, urls, processes)
+            for index in range(3):
+                result = await run_session(client, urls[index % 2], urls[(index + 1) % 2], index)
+                assert f"Candidate {index:04d} / Role {index:04d}" in result["scorecard"]["gap_analysis"]
+                assert result["task_list"]["tasks"]
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
@@ -1,10 +1,12 @@
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-import requests
+from backend_client import BACKEND_URL, BackendError, JobRunner, backend_client
+from session_store import create_session_store
 import uuid
 import os
+import requests
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 import logging
-import json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,42 +16,120 @@ app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
 # Configuration
-BACKEND_URL = os.environ.get('BACKEND_URL', 'http://backend:5000')
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf'}
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+PDF_SIGNATURE = b'%PDF-'
+
+# Werkzeug refuses larger requests before parsing them: two documents plus the form fields
+app.config['MAX_CONTENT_LENGTH'] = 2 * UPLOAD_MAX_BYTES + 64 * 1024
 
 # Ensure upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# In-memory storage for large data (use Redis in production)
-session_storage = {}
+# Storage for large data kept outside of the Flask session (see session_store.py)
+session_store = create_session_store()
+
+# Background backend calls; their state is kept in the session store so any worker can report it
+job_runner = JobRunner(session_store)
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def upload_pdf(file):
+    """Checks an uploaded PDF and streams it on to the backend; returns its upload id or raises ValueError"""
+    if not (file and file.filename and allowed_file(file.filename)):
+        raise ValueError('Only PDF files are allowed.')
+    # Browsers label PDFs inconsistently (application/pdf, application/x-pdf, application/octet-stream),
+    # so the signature decides. Werkzeug spools large files to a temporary file; check them there
+    stream = file.stream
+    if stream.read(len(PDF_SIGNATURE)) != PDF_SIGNATURE:
+        raise ValueError('The file is not a PDF document.')
+    stream.seek(0, os.SEEK_END)
+    if stream.tell() > UPLOAD_MAX_BYTES:
+        raise RequestEntityTooLarge()
+    stream.seek(0)
+    return backend_client.upload(stream)
+
 def generate_thread_id():
     """Generate a unique thread ID for the session"""
     return str(uuid.uuid4())
 
 def store_session_data(session_id, key, data):
     """Store large data outside of Flask session"""
-    if session_id not in session_storage:
-        session_storage[session_id] = {}
-    session_storage[session_id][key] = data
+    session_store.set(session_id, key, data)
 
 def get_session_data(session_id, key, default=None):
     """Retrieve data from session storage"""
-    return session_storage.get(session_id, {}).get(key, default)
+    return session_store.get(session_id, key, default)
 
 @app.route('/')
 def index():
     """Main page for resume and job description input"""
     return render_template('index.html')
 
+def _run_analyze(job, session_id, form_data):
+    """Background job: send the resume and job description to the backend and collect the questions"""
+    backend_path = "/analyze"
+    logger.info(f"Making request to backend: {BACKEND_URL}{backend_path}")
+    logger.info(f"Form data keys: {list(form_data.keys())}")
+    
+    response = backend_client.post(backend_path, data=form_data)
+    
+    logger.info(f"Backend response status: {response.status_code}")
+    logger.info(f"Backend response content (first 500 chars): {response.text[:500]}")
+    
+    if response.status_code != 200:
+        raise BackendError.from_response(response)
+    
+    try:
+        questions_data = response.json()
+    except ValueError as json_error:
+        logger.error(f"Raw response content: {response.text}")
+        raise BackendError(f'Failed to parse backend response: {str(json_error)}')
+    
+    # Store questions data in external storage instead of session
+    store_session_data(session_id, 'questions_data', questions_data)
+    
+    # When the backend had no questions to ask, the response already holds the final results
+    if isinstance(questions_data, dict) and questions_data.get('scorecard') is not None:
+        store_session_data(session_id, 'result_data', questions_data)
+        return {'redirect': '/results'}
+    
+    # Extract questions from the response
+    questions = []
+    if isinstance(questions_data, dict):
+        questions = questions_data.get('questions', [])
+    elif isinstance(questions_data, list):
+        questions = questions_data
+    
+    return {'questions': questions}
+
+def _run_submit_answers(job, session_id, payload):
+    """Background job: resume the backend workflow, relaying streamed progress into the job events"""
+    logger.info(f"Submitting answers to backend: {BACKEND_URL}/resume/stream")
+    logger.info(f"Payload: {payload}")
+    
+    result_data = None
+    for event in backend_client.stream_ndjson('/resume/stream', json=payload):
+        if 'error' in event:
+            raise BackendError(f"Backend error: {event['error']}")
+        if 'result' in event:
+            result_data = event['result']
+        else:
+            job.add_event(event)
+    
+    if not isinstance(result_data, dict):
+        raise BackendError('Backend workflow did not complete properly. No results returned.')
+    
+    # Store result data in external storage
+    store_session_data(session_id, 'result_data', result_data)
+    return {'redirect': '/results'}
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
-    """Handle the initial analysis request"""
+    """Handle the initial analysis request by submitting it as a background job"""
     try:
         # Generate thread ID and session ID for this session
         thread_id = generate_thread_id()
@@ -62,17 +142,15 @@ def analyze():
         form_data = {
             'thread_id': thread_id
         }
-        files = {}
         
-        # Handle resume input
+        # Handle resume input; files are streamed to the backend now and the job refers to them by upload id
         if 'resume_text' in request.form and request.form['resume_text'].strip():
             form_data['resume_text'] = request.form['resume_text']
         elif 'resume_file' in request.files:
-            resume_file = request.files['resume_file']
-            if resume_file and resume_file.filename and allowed_file(resume_file.filename):
-                files['resume_file'] = (resume_file.filename, resume_file.read(), resume_file.content_type)
-            else:
-                return jsonify({'error': 'Invalid resume file. Only PDF files are allowed.'}), 400
+            try:
+                form_data['resume_upload_id'] = upload_pdf(request.files['resume_file'])
+            except ValueError as e:
+                return jsonify({'error': f'Invalid resume file. {str(e)}'}), 400
         else:
             return jsonify({'error': 'Please provide a resume either as text or PDF file.'}), 400
         
@@ -80,80 +158,32 @@ def analyze():
         if 'job_description_text' in request.form and request.form['job_description_text'].strip():
             form_data['job_description_text'] = request.form['job_description_text']
         elif 'job_description_file' in request.files:
-            jd_file = request.files['job_description_file']
-            if jd_file and jd_file.filename and allowed_file(jd_file.filename):
-                files['job_description_file'] = (jd_file.filename, jd_file.read(), jd_file.content_type)
-            else:
-                return jsonify({'error': 'Invalid job description file. Only PDF files are allowed.'}), 400
+            try:
+                form_data['job_description_upload_id'] = upload_pdf(request.files['job_description_file'])
+            except ValueError as e:
+                return jsonify({'error': f'Invalid job description file. {str(e)}'}), 400
         else:
             return jsonify({'error': 'Please provide a job description either as text or PDF file.'}), 400
         
-        # Make request to backend
-        backend_url = f"{BACKEND_URL}/analyze"
-        logger.info(f"Making request to backend: {backend_url}")
-        logger.info(f"Form data keys: {list(form_data.keys())}")
-        logger.info(f"Files: {list(files.keys()) if files else 'None'}")
-        
-        try:
-            if files:
-                response = requests.post(backend_url, data=form_data, files=files, timeout=120)
-            else:
-                response = requests.post(backend_url, data=form_data, timeout=120)
-            
-            logger.info(f"Backend response status: {response.status_code}")
-            logger.info(f"Backend response headers: {dict(response.headers)}")
-            logger.info(f"Backend response content (first 500 chars): {response.text[:500]}")
-            
-        except requests.exceptions.RequestException as req_error:
-            logger.error(f"Request error: {str(req_error)}")
-            return jsonify({'error': f'Failed to connect to backend: {str(req_error)}'}), 500
-        
-        if response.status_code == 200:
-            try:
-                questions_data = response.json()
-                
-                # Handle case where backend returns a string instead of dict
-                if isinstance(questions_data, str):
-                    try:
-                        questions_data = json.loads(questions_data)
-                    except json.JSONDecodeError:
-                        logger.error(f"Failed to parse backend response as JSON: {questions_data}")
-                        return jsonify({'error': 'Invalid response format from backend'}), 500
-                
-                # Store questions data in external storage instead of session
-                store_session_data(session_id, 'questions_data', questions_data)
-                
-                # Extract questions from the response
-                questions = []
-                if isinstance(questions_data, dict):
-                    questions = questions_data.get('questions', [])
-                elif isinstance(questions_data, list):
-                    questions = questions_data
-                
-                return jsonify({
-                    'success': True,
-                    'questions': questions,
-                    'thread_id': thread_id
-                })
-                
-            except Exception as json_error:
-                logger.error(f"Error parsing backend response: {str(json_error)}")
-                logger.error(f"Raw response content: {response.text}")
-                return jsonify({'error': f'Failed to parse backend response: {str(json_error)}'}), 500
-        else:
-            logger.error(f"Backend error: {response.status_code} - {response.text}")
-            return jsonify({'error': f'Backend error: {response.text}'}), response.status_code
+        job = job_runner.submit(session_id, lambda job: _run_analyze(job, session_id, form_data))
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'thread_id': thread_id
+        }), 202
             
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request error: {str(e)}")
-        return jsonify({'error': f'Failed to connect to backend: {str(e)}'}), 500
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Files are limited to {UPLOAD_MAX_BYTES // (1024 * 1024)} MB.'}), 413
+    except BackendError as e:
+        logger.error(f"Upload to the backend failed: {str(e)}")
+        return jsonify({'error': str(e)}), e.status_code
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return jsonify({'error': f'An unexpected error occurred: {str(e)}'}), 500
 
 @app.route('/submit_answers', methods=['POST'])
 def submit_answers():
-    """Handle the submission of answers to questions"""
+    """Handle the submission of answers to questions by submitting it as a background job"""
     try:
         data = request.get_json()
         thread_id = session.get('thread_id')
@@ -177,49 +207,43 @@ def submit_answers():
         if not response_text.strip():
             response_text = "No additional information provided."
         
-        # Send to backend resume endpoint
-        backend_url = f"{BACKEND_URL}/resume"
         payload = {
             'thread_id': thread_id,
             'response': response_text
         }
-        
-        logger.info(f"Submitting answers to backend: {backend_url}")
-        logger.info(f"Payload: {payload}")
-        response = requests.post(backend_url, json=payload, timeout=120)
-        
-        logger.info(f"Resume backend response status: {response.status_code}")
-        logger.info(f"Resume backend response headers: {dict(response.headers)}")
-        logger.info(f"Resume backend response content: {response.text}")
-        
-        if response.status_code == 200:
-            result_data = response.json()
-            logger.info(f"Parsed result_data type: {type(result_data)}")
-            logger.info(f"Parsed result_data keys: {list(result_data.keys()) if isinstance(result_data, dict) else 'Not a dict'}")
-            
-            # Check if this is still returning questions instead of final results
-            if isinstance(result_data, dict) and 'questions' in result_data:
-                logger.error("Backend returned questions again instead of final results!")
-                logger.error(f"Questions returned: {result_data.get('questions', [])}")
-                return jsonify({'error': 'Backend workflow did not complete properly. Still returning questions.'}), 500
-            
-            # Store result data in external storage
-            store_session_data(session_id, 'result_data', result_data)
-            return jsonify({
-                'success': True,
-                'redirect': '/results'
-            })
-        else:
-            logger.error(f"Backend error: {response.status_code} - {response.text}")
-            return jsonify({'error': f'Backend error: {response.text}'}), response.status_code
+        job = job_runner.submit(session_id, lambda job: _run_submit_answers(job, session_id, payload))
+        return jsonify({
+            'success': True,
+            'job_id': job.id
+        }), 202
             
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request error: {str(e)}")
-        return jsonify({'error': f'Failed to connect to backend: {str(e)}'}), 500
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return jsonify({'error': f'An unexpected error occurred: {str(e)}'}), 500
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Poll a background job for new progress events and, once finished, its result"""
+    session_id = session.get('session_id')
+    job = job_runner.get(job_id, session_id) if session_id else None
+    if job is None:
+        return jsonify({'error': 'Job not found. Please start over.'}), 404
+    
+    since = request.args.get('since', 0, type=int)
+    snapshot = job.snapshot(since)
+    if job.status == 'error':
+        return jsonify(snapshot), job.status_code
+    return jsonify(snapshot)
+
+def fetch_stored_result(thread_id):
+    """The result the backend stored for a finished thread, or None"""
+    try:
+        response = backend_client.get(f"/results/{thread_id}")
+    except requests.RequestException as e:
+        logger.error(f"Could not fetch the stored result of thread {thread_id}: {str(e)}")
+        return None
+    return response.json() if response.status_code == 200 else None
+
 @app.route('/results')
 def results():
     """Display the final results (scorecard and tasks)"""
@@ -228,56 +252,15 @@ def results():
         return render_template('error.html', error="No active session found. Please start over.")
     
     result_data = get_session_data(session_id, 'result_data')
+    if not result_data and session.get('thread_id'):
+        # The session store is not durable; finished results are kept by the backend's result store
+        result_data = fetch_stored_result(session['thread_id'])
     if not result_data:
         return render_template('error.html', error="No results found. Please start over.")
     
-    # Debug logging
-    logger.info(f"Result data type: {type(result_data)}")
-    logger.info(f"Result data keys: {list(result_data.keys()) if isinstance(result_data, dict) else 'Not a dict'}")
-    
-    # Handle case where result_data might be a string (JSON)
-    if isinstance(result_data, str):
-        try:
-            result_data = json.loads(result_data)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse result_data as JSON: {result_data}")
-            return render_template('error.html', error="Invalid result data format.")
-    
-    # Extract scorecard and task_list with safe defaults
-    scorecard_raw = result_data.get('scorecard', {})
-    task_list_raw = result_data.get('task_list', {})
-    
-    # Debug logging for scorecard
-    logger.info(f"Scorecard raw type: {type(scorecard_raw)}")
-    logger.info(f"Scorecard raw content: {scorecard_raw}")
-    
-    # Handle scorecard - might be a string (JSON) or dict
-    scorecard = {}
-    if isinstance(scorecard_raw, str):
-        try:
-            scorecard = json.loads(scorecard_raw)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse scorecard as JSON: {scorecard_raw}")
-            scorecard = {}
-    elif isinstance(scorecard_raw, dict):
-        scorecard = scorecard_raw
-    else:
-        logger.error(f"Unexpected scorecard type: {type(scorecard_raw)}")
-        scorecard = {}
-    
-    # Handle task_list - might be a string (JSON) or dict
-    task_list = {}
-    if isinstance(task_list_raw, str):
-        try:
-            task_list = json.loads(task_list_raw)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse task_list as JSON: {task_list_raw}")
-            task_list = {}
-    elif isinstance(task_list_raw, dict):
-        task_list = task_list_raw
-    else:
-        logger.error(f"Unexpected task_list type: {type(task_list_raw)}")
-        task_list = {}
+    # The backend returns the scorecard and task list as native JSON objects
+    scorecard = result_data.get('scorecard')
+    task_list = result_data.get('task_list')
     
     # Ensure scorecard has required fields with defaults
     if not scorecard or not isinstance(scorecard, dict):
@@ -331,7 +314,8 @@ def debug_last_response():
         'result_data': result_data,
         'questions_data_type': str(type(questions_data)),
         'questions_data': questions_data,
-        'session_storage_keys': list(session_storage.get(session_id, {}).keys()) if session_id in session_storage else []
+        'session_storage_keys': session_store.keys(session_id),
+        'session_store': session_store.stats()
     })
 
 @app.route('/debug_session')
@@ -346,13 +330,14 @@ def debug_session():
         'session_id': session_id,
         'result_data_type': str(type(result_data)),
         'result_data': result_data,
-        'session_storage_keys': list(session_storage.get(session_id, {}).keys())
+        'session_storage_keys': session_store.keys(session_id),
+        'session_store': session_store.stats()
     })
 
 @app.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({'status': 'ok'})
+    return jsonify({'status': 'ok', 'jobs': job_runner.stats()})
 
 @app.errorhandler(404)
 def not_found_error(error):
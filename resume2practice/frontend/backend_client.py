@@ -0,0 +1,229 @@
+"""Shared HTTP client and background job runner for talking to the backend.
+
+A single pooled `requests.Session` is shared by every request handler so connections to the
+backend are kept alive and reused instead of being opened per call. Long-running backend calls
+are executed on a bounded thread pool as jobs; Flask handlers only submit a job and return, and
+the browser polls the job for progress events and the final result. Job state lives in the
+session store, so with several worker processes (and `SESSION_STORE=sqlite`) any of them can
+answer a poll.
+"""
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+BACKEND_URL = os.environ.get('BACKEND_URL', 'http://backend:5000')
+BACKEND_POOL_SIZE = int(os.environ.get('BACKEND_POOL_SIZE', '100'))
+BACKEND_MAX_RETRIES = int(os.environ.get('BACKEND_MAX_RETRIES', '3'))
+BACKEND_CONNECT_TIMEOUT = float(os.environ.get('BACKEND_CONNECT_TIMEOUT', '5'))
+BACKEND_READ_TIMEOUT = float(os.environ.get('BACKEND_READ_TIMEOUT', '120'))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '256'))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+
+class BackendClient:
+    """Pooled, keep-alive HTTP client for the backend API"""
+
+    def __init__(self,
+                 base_url: str = BACKEND_URL,
+                 pool_size: int = BACKEND_POOL_SIZE,
+                 max_retries: int = BACKEND_MAX_RETRIES,
+                 connect_timeout: float = BACKEND_CONNECT_TIMEOUT,
+                 read_timeout: float = BACKEND_READ_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        # POST is not in the default allowed methods, so requests that may have reached the backend
+        # are never replayed (that would start a second LLM run); only failed connects are retried.
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        # The response only arrives once the run is done, so tell the backend to give up when we do
+        headers = kwargs.setdefault('headers', {})
+        headers.setdefault('X-Request-Timeout', str(self.timeout[1]))
+        return self.session.post(f"{self.base_url}{path}", **kwargs)
+
+    def upload(self, stream: BinaryIO, content_type: str = 'application/pdf') -> str:
+        """Streams a file to the backend's `/uploads` and returns its upload id"""
+        def chunks() -> Iterator[bytes]:
+            while chunk := stream.read(UPLOAD_CHUNK_BYTES):
+                yield chunk
+        # A generator body goes out with chunked transfer encoding, one chunk in memory at a time
+        response = self.session.post(
+            f"{self.base_url}/uploads", data=chunks(), headers={'Content-Type': content_type}, timeout=self.timeout
+        )
+        if response.status_code != 201:
+            raise BackendError.from_response(response)
+        return response.json()['upload_id']
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(f"{self.base_url}{path}", **kwargs)
+
+    def stream_ndjson(self, path: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """POSTs to a streaming endpoint and yields each newline-delimited JSON event"""
+        kwargs.setdefault('timeout', self.timeout)
+        with self.session.post(f"{self.base_url}{path}", stream=True, **kwargs) as response:
+            if response.status_code != 200:
+                raise BackendError.from_response(response)
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+
+class BackendError(Exception):
+    """Raised when the backend answers with an error status"""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> 'BackendError':
+        if response.status_code == 429:
+            # Shed by the backend's admission control; pass its retry hint on to the user
+            retry_after = response.headers.get('Retry-After', '')
+            return cls(f"The service is busy. Please try again in {retry_after or 'a few'} seconds.", 429)
+        return cls(f'Backend error: {response.text}', response.status_code)
+
+
+class Job:
+    """A backend call running in the background, with the progress events it has produced so far.
+
+    The job's state is written to the session store of its owner on every change, so any worker
+    process sharing the store can answer polls for it, not only the one running it.
+    """
+
+    def __init__(self, owner: str, store: SessionStore, job_id: Optional[str] = None, record: Optional[Dict[str, Any]] = None):
+        record = record or {}
+        self.id = job_id or str(uuid.uuid4())
+        self.owner = owner
+        self.status = record.get('status', 'pending')
+        self.events: List[Dict[str, Any]] = record.get('events', [])
+        self.result: Optional[Dict[str, Any]] = record.get('result')
+        self.error: Optional[str] = record.get('error')
+        self.status_code = record.get('status_code', 200)
+        self._store = store
+
+    @staticmethod
+    def store_key(job_id: str) -> str:
+        return f'job:{job_id}'
+
+    @classmethod
+    def load(cls, store: SessionStore, job_id: str, owner: str) -> Optional['Job']:
+        """Reads a job of `owner` back from the store, or None if it is unknown or has expired"""
+        record = store.get(owner, cls.store_key(job_id))
+        return cls(owner, store, job_id, record) if record is not None else None
+
+    def save(self) -> None:
+        self._store.set(self.owner, self.store_key(self.id), {
+            'status': self.status,
+            'events': self.events,
+            'result': self.result,
+            'error': self.error,
+            'status_code': self.status_code
+        })
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        self.save()
+
+    def snapshot(self, since: int = 0) -> Dict[str, Any]:
+        events = self.events[since:]
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'events': events,
+            'next': since + len(events),
+            'result': self.result,
+            'error': self.error
+        }
+
+
+class JobRunner:
+    """Runs backend calls on a bounded thread pool so request handlers return immediately.
+
+    Jobs expire with the session they belong to (`SESSION_TTL_SECONDS`).
+    """
+
+    def __init__(self, store: SessionStore, max_workers: int = JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='backend-job')
+        self._store = store
+        # Jobs run by this process, by status
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def submit(self, owner: str, fn: Callable[[Job], Dict[str, Any]]) -> Job:
+        """Schedules `fn(job)`; its return value becomes the job result"""
+        job = Job(owner, self._store)
+        job.save()
+        self._count(None, job.status)
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str, owner: str) -> Optional[Job]:
+        return Job.load(self._store, job_id, owner)
+
+    def _run(self, job: Job, fn: Callable[[Job], Dict[str, Any]]) -> None:
+        self._transition(job, 'running')
+        try:
+            job.result = fn(job)
+            status = 'done'
+        except BackendError as ex:
+            logger.error(f"Backend error in job {job.id}: {ex.status_code} - {str(ex)}")
+            job.error, job.status_code, status = str(ex), ex.status_code, 'error'
+        except requests.exceptions.RequestException as ex:
+            logger.error(f"Request error in job {job.id}: {str(ex)}")
+            job.error, job.status_code, status = f'Failed to connect to backend: {str(ex)}', 502, 'error'
+        except Exception as ex:
+            logger.error(f"Unexpected error in job {job.id}: {str(ex)}")
+            job.error, job.status_code, status = f'An unexpected error occurred: {str(ex)}', 500, 'error'
+        self._transition(job, status)
+
+    def _transition(self, job: Job, status: str) -> None:
+        previous, job.status = job.status, status
+        try:
+            job.save()
+        except Exception as ex:
+            logger.error(f"Could not save job {job.id}: {str(ex)}")
+        self._count(previous, status)
+
+    def _count(self, previous: Optional[str], status: str) -> None:
+        with self._lock:
+            if previous is not None:
+                self._counts[previous] -= 1
+            self._counts[status] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Jobs of this process: pending and running now, done and failed since it started"""
+        with self._lock:
+            return {status: self._counts[status] for status in ('pending', 'running', 'done', 'error')}
+
+
+# Shared instances
+backend_client = BackendClient()
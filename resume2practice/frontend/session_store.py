@@ -0,0 +1,249 @@
+"""Storage for per-session payloads too large for the Flask cookie session.
+
+Two implementations are provided:
+
+- `MemorySessionStore`: in-process LRU with a time-to-live and a total byte cap. Suitable for a
+  single worker process.
+- `SQLiteSessionStore`: a SQLite database file (WAL mode) that every worker process on the host can
+  share, so requests for one session may be served by any worker.
+
+Payloads are stored JSON-encoded; payloads above `COMPRESS_THRESHOLD` bytes are zlib-compressed.
+Use `create_session_store()` to build the store selected by the environment.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+SESSION_STORE = os.environ.get('SESSION_STORE', 'memory')
+SESSION_STORE_PATH = os.environ.get('SESSION_STORE_PATH', 'sessions.sqlite3')
+SESSION_STORE_MAX_BYTES = int(os.environ.get('SESSION_STORE_MAX_BYTES', str(256 * 1024 * 1024)))
+SESSION_TTL_SECONDS = int(os.environ.get('SESSION_TTL_SECONDS', '3600'))
+COMPRESS_THRESHOLD = int(os.environ.get('SESSION_COMPRESS_THRESHOLD', '1024'))
+
+_RAW = b'j'
+_COMPRESSED = b'z'
+
+
+def encode_payload(data: Any) -> bytes:
+    """Serializes a payload, compressing it when it is large"""
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    if len(raw) > COMPRESS_THRESHOLD:
+        return _COMPRESSED + zlib.compress(raw, 6)
+    return _RAW + raw
+
+
+def decode_payload(blob: bytes) -> Any:
+    """Reverses `encode_payload`"""
+    marker, body = blob[:1], blob[1:]
+    if marker == _COMPRESSED:
+        body = zlib.decompress(body)
+    return json.loads(body.decode('utf-8'))
+
+
+class SessionStore(ABC):
+    """Key/value storage scoped per session"""
+
+    @abstractmethod
+    def set(self, session_id: str, key: str, data: Any) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        pass
+
+    @abstractmethod
+    def keys(self, session_id: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Returns the store type, number of sessions and stored bytes"""
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU store bounded by total bytes, with a per-session time-to-live"""
+
+    def __init__(self, max_bytes: int = SESSION_STORE_MAX_BYTES, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # session_id -> (last access time, {key: encoded payload})
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def set(self, session_id: str, key: str, data: Any) -> None:
+        blob = encode_payload(data)
+        with self._lock:
+            _, entries = self._sessions.pop(session_id, (None, {}))
+            previous = entries.get(key)
+            if previous is not None:
+                self._bytes -= len(previous)
+            entries[key] = blob
+            self._bytes += len(blob)
+            self._sessions[session_id] = (time.monotonic(), entries)
+            self._evict()
+
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entries = self._touch(session_id)
+            blob = entries.get(key) if entries is not None else None
+        return decode_payload(blob) if blob is not None else default
+
+    def keys(self, session_id: str) -> List[str]:
+        with self._lock:
+            entries = self._touch(session_id)
+            return list(entries.keys()) if entries is not None else []
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._drop(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire()
+            return {
+                'type': 'memory',
+                'sessions': len(self._sessions),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions
+            }
+
+    def _touch(self, session_id: str) -> Optional[Dict[str, bytes]]:
+        """Returns the session's entries and marks it most recently used, dropping it if expired"""
+        item = self._sessions.get(session_id)
+        if item is None:
+            return None
+        accessed_at, entries = item
+        if time.monotonic() - accessed_at > self.ttl_seconds:
+            self._drop(session_id)
+            return None
+        self._sessions[session_id] = (time.monotonic(), entries)
+        self._sessions.move_to_end(session_id)
+        return entries
+
+    def _drop(self, session_id: str) -> None:
+        item = self._sessions.pop(session_id, None)
+        if item is not None:
+            self._bytes -= sum(len(blob) for blob in item[1].values())
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Sessions are kept in access order, so expired ones are at the front
+        while self._sessions:
+            session_id, (accessed_at, _) = next(iter(self._sessions.items()))
+            if accessed_at >= cutoff:
+                break
+            self._drop(session_id)
+
+    def _evict(self) -> None:
+        self._expire()
+        # Evict least recently used sessions until under the cap, but never the one just written
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            session_id = next(iter(self._sessions))
+            self._drop(session_id)
+            self._evictions += 1
+            logger.info(f"Evicted session {session_id} from session store (byte cap reached)")
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed store that can be shared by several worker processes on one host"""
+
+    def __init__(self, path: str = SESSION_STORE_PATH, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS session_data ("
+                " session_id TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value BLOB NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (session_id, key))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS session_data_updated_at ON session_data (updated_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection, opening it on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def set(self, session_id: str, key: str, data: Any) -> None:
+        blob = encode_payload(data)
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO session_data (session_id, key, value, updated_at) VALUES (?, ?, ?, ?)",
+            (session_id, key, blob, time.time())
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._expire(connection)
+
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        row = self._connection().execute(
+            "SELECT value FROM session_data WHERE session_id = ? AND key = ? AND updated_at >= ?",
+            (session_id, key, time.time() - self.ttl_seconds)
+        ).fetchone()
+        return decode_payload(row[0]) if row is not None else default
+
+    def keys(self, session_id: str) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT key FROM session_data WHERE session_id = ? AND updated_at >= ?",
+            (session_id, time.time() - self.ttl_seconds)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, session_id: str) -> None:
+        self._connection().execute("DELETE FROM session_data WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        connection = self._connection()
+        self._expire(connection)
+        sessions, stored_bytes = connection.execute(
+            "SELECT COUNT(DISTINCT session_id), COALESCE(SUM(LENGTH(value)), 0) FROM session_data"
+        ).fetchone()
+        return {
+            'type': 'sqlite',
+            'path': self.path,
+            'sessions': sessions,
+            'bytes': stored_bytes
+        }
+
+    def _expire(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "DELETE FROM session_data WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+        )
+
+
+def create_session_store() -> SessionStore:
+    """Builds the session store selected by the `SESSION_STORE` environment variable"""
+    if SESSION_STORE == 'sqlite':
+        return SQLiteSessionStore()
+    if SESSION_STORE != 'memory':
+        raise ValueError(f"Unsupported session store: {SESSION_STORE}")
+    return MemorySessionStore()